@@ -1,17 +1,28 @@
-from flask import Flask, request, jsonify, render_template, redirect, url_for, session, flash
+from flask import Flask, request, jsonify, render_template, redirect, url_for, session, flash, stream_with_context
 from flask_cors import CORS
 import os
+import gc
+import time
 import secrets
+import threading
 from dotenv import load_dotenv
-from src.recommendation_engine import RecommendationEngine
 from src.data_manager import DataManager
 from src.auth import AuthManager, login_required, optional_login
+from src.password_hashing import PasswordHasher, PasswordHashingBusy
+from src.response_cache import ResponseCache, build_token
+from src.serialization import OrjsonProvider, encoder_name, lean_recommendations
+from src.batch_recommendations import (BatchRecommender, MAX_BATCH_PROFILES, default_profile,
+                                       normalize_level, profile_arguments)
 
 load_dotenv()
 
 app = Flask(__name__)
 CORS(app)
 
+# JSON_PROVIDER=default keeps Flask's standard library encoder
+if os.getenv('JSON_PROVIDER', 'orjson') == 'orjson':
+    app.json = OrjsonProvider(app)
+
 # Force template reloading in development
 app.config['TEMPLATES_AUTO_RELOAD'] = True
 
@@ -68,8 +79,96 @@ if not os.path.exists('data/courses.db'):
 
 # Initialize components
 data_manager = DataManager()
-recommendation_engine = RecommendationEngine(data_manager)
-auth_manager = AuthManager(data_manager)
+# Hashes in progress are capped across all workers (and per client IP), so a burst of
+# logins is turned away with 503/429 instead of occupying every worker
+password_hasher = PasswordHasher(
+    max_pending=int(os.getenv('PASSWORD_HASH_MAX_PENDING', 2)),
+    max_per_client=int(os.getenv('PASSWORD_HASH_MAX_PER_IP', 1)),
+    lock_dir=os.getenv('PASSWORD_HASH_LOCK_DIR') or None
+)
+auth_manager = AuthManager(data_manager, password_hasher)
+
+def client_ip():
+    """Client address, taken from nginx's X-Real-IP when the request came through the local proxy"""
+    if request.remote_addr in ('127.0.0.1', '::1'):
+        return request.headers.get('X-Real-IP', request.remote_addr)
+    return request.remote_addr
+
+def password_hashing_busy_response(error):
+    """429 when one client has too many sign-ins queued, 503 when hashing is saturated"""
+    response = jsonify({'success': False, 'error': str(error)})
+    response.headers['Retry-After'] = '2'
+    return response, 429 if error.per_client else 503
+
+# Encoded /api/courses and /api/departments bodies for the current catalog version. ETags also
+# carry the encoder and build; without APP_BUILD a token made at startup stands in for the build
+# (preload_app makes it once in the master, so every worker sends the same ETags)
+response_cache = ResponseCache(build_token(encoder_name(app.json), os.getenv('APP_BUILD') or secrets.token_hex(8)))
+
+def encode_payload(version, payload):
+    """(version, encoded JSON body) for a cached response"""
+    return version, app.json.response(payload).get_data()
+
+def cached_json_response(name, version, build_payload):
+    """JSON response served from the per-version body cache; build_payload() returns (version, payload)"""
+    # The ETag only depends on the version, so a revalidation never loads or serializes the catalog
+    etags = response_cache.etags(name, version)
+    matched = next((etag for etag in etags if request.if_none_match.contains_weak(etag)), None)
+    if matched is not None:
+        response_cache.not_modified += 1
+        response = app.response_class(status=304)
+        response.set_etag(matched)
+    else:
+        cached = response_cache.get(name, version, lambda: encode_payload(*build_payload()))
+        encoding = response_cache.negotiate(len(cached.body()), request.accept_encodings.best_match)
+        response = app.response_class(cached.body(encoding), mimetype='application/json')
+        response.set_etag(cached.etag(encoding))
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    # Clients may keep the body but must revalidate it before use
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# The recommendation engine pulls in NumPy, SciPy, sklearn and NLTK; it is created on
+# first use so auth and catalog endpoints are served without loading the ML stack
+recommendation_engine = None
+_recommendation_engine_lock = threading.Lock()
+
+def get_recommendation_engine():
+    """Shared RecommendationEngine, imported and constructed on first call"""
+    global recommendation_engine
+    if recommendation_engine is None:
+        with _recommendation_engine_lock:
+            if recommendation_engine is None:
+                from src.recommendation_engine import RecommendationEngine
+                recommendation_engine = RecommendationEngine(data_manager, persist_similarities=True)
+    return recommendation_engine
+
+# Cohort runs are spread over a small pool forked in each worker by start_batch_pool()
+batch_recommender = BatchRecommender(get_recommendation_engine,
+                                     workers=int(os.getenv('RECOMMEND_BATCH_WORKERS', 2)))
+
+def start_batch_pool():
+    """Fork this worker's batch pool; gunicorn calls it from post_worker_init, before any threads start"""
+    return batch_recommender.start_pool()
+
+# Filled in by warm_up(); gunicorn runs it in the master before forking workers
+app.config['WARMUP_REPORT'] = None
+
+def warm_up():
+    """Build the catalog structures once and freeze them so forked workers share the pages"""
+    start = time.perf_counter()
+    report = get_recommendation_engine().warm_up()
+    # Frozen objects are never scanned by the garbage collector again, so workers
+    # don't dirty the copy-on-write pages that hold the shared catalog
+    gc.collect()
+    gc.freeze()
+    report['frozen_objects'] = gc.get_freeze_count()
+    report['total_seconds'] = round(time.perf_counter() - start, 3)
+    report['pid'] = os.getpid()
+    app.config['WARMUP_REPORT'] = report
+    return report
 
 # Session permanent is set during login
 
@@ -84,52 +183,103 @@ def index():
 @app.route('/advisor')
 @login_required
 def advisor():
-    print(f"Advisor route accessed - Session: {dict(session)}")
-    print(f"Is logged in: {auth_manager.is_logged_in()}")
     return render_template('index.html')
 
+# Page sizes for /api/courses?limit=
+COURSE_PAGE_SIZE = 100
+MAX_COURSE_PAGE_SIZE = 500
+
+# Cached bodies are built from one consistent read and returned with that read's own version
+def courses_payload():
+    """(catalog version, full catalog body) from one catalog snapshot"""
+    snapshot = data_manager.get_catalog_snapshot()
+    return snapshot.version, {"success": True, "courses": [dict(course) for course in snapshot.courses]}
+
+def courses_summary_payload():
+    """(catalog version, summary catalog body) read in one transaction"""
+    version, page = data_manager.versioned_read(lambda: data_manager.get_courses_page(summary=True))
+    return version, {"success": True, **page}
+
+def departments_payload():
+    """(departments version, departments body) read in one transaction"""
+    version, departments = data_manager.versioned_read(data_manager.get_all_departments, 'departments')
+    return version, {"success": True, "departments": departments}
+
 @app.route('/api/courses')
 def get_courses():
-    """Get all available elective courses"""
+    """Course catalog: full rows, a fields= projection or view=summary, optionally paginated by cursor"""
     try:
-        courses = data_manager.get_all_courses()
-        return jsonify({"success": True, "courses": courses})
+        view = request.args.get('view', 'full')
+        fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()]
+        after = request.args.get('cursor') or None
+        limit = request.args.get('limit', type=int)
+        if view not in ('full', 'summary'):
+            return jsonify({"success": False, "error": "view must be 'full' or 'summary'"}), 400
+        if view == 'summary' and fields:
+            return jsonify({"success": False, "error": "fields can't be combined with view=summary"}), 400
+        
+        # The whole catalog, full or summarized, is served from the per-version body cache
+        if after is None and limit is None and not fields:
+            if view == 'summary':
+                return cached_json_response('courses-summary', data_manager.get_catalog_version(),
+                                            courses_summary_payload)
+            return cached_json_response('courses', data_manager.get_catalog_version(), courses_payload)
+        
+        limit = min(max(limit or COURSE_PAGE_SIZE, 1), MAX_COURSE_PAGE_SIZE)
+        page = data_manager.get_courses_page(fields, limit=limit, after=after, summary=view == 'summary')
+        return jsonify({"success": True, **page})
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
     except Exception as e:
         print(f"Error in get_courses: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/search')
+def search_courses():
+    """Ranked full-text course search with pagination"""
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({"success": False, "error": "Search query (q) is required"}), 400
+
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+
+        filters = {}
+        for key in ('department', 'level'):
+            if request.args.get(key):
+                filters[key] = request.args[key]
+        max_difficulty = request.args.get('max_difficulty', type=float)
+        if max_difficulty is not None:
+            filters['max_difficulty'] = max_difficulty
+
+        result = data_manager.search_courses_page(query, filters, limit=per_page, offset=(page - 1) * per_page)
+        return jsonify({
+            "success": True,
+            "query": query,
+            "courses": result['courses'],
+            "total": result['total'],
+            "page": page,
+            "per_page": per_page,
+            "pages": (result['total'] + per_page - 1) // per_page
+        })
+    except Exception as e:
+        print(f"Error in search_courses: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @app.route('/api/recommend', methods=['POST'])
 def get_recommendations():
     """Get course recommendations based on student input"""
     try:
         data = request.get_json()
-        
-        # Extract student preferences
-        interests = data.get('interests', [])
-        specific_topics = data.get('specific_topics', '')
-        career_goals = data.get('career_goals', '')
-        preferred_topics = data.get('preferred_topics', [])
-        difficulty_preference = data.get('difficulty_preference', 'medium')
-        completed_courses = data.get('completed_courses', [])
-        num_recommendations = data.get('num_recommendations', 10)
-        department_filter = data.get('department_filter', '')
-        include_cross_dept = data.get('include_cross_dept', True)
-        academic_level = data.get('academic_level', '')
+        response_schema = data.get('schema', 'full')
         
         # Get recommendations
-        recommendations = recommendation_engine.get_recommendations(
-            interests=interests,
-            specific_topics=specific_topics,
-            career_goals=career_goals,
-            preferred_topics=preferred_topics,
-            difficulty_preference=difficulty_preference,
-            completed_courses=completed_courses,
-            num_recommendations=num_recommendations,
-            department_filter=department_filter,
-            include_cross_dept=include_cross_dept,
-            academic_level=academic_level
-        )
+        recommendations = get_recommendation_engine().get_recommendations(**profile_arguments(data))
         
+        if response_schema == 'lean':
+            return jsonify({"success": True, **lean_recommendations(recommendations),
+                            "total_count": len(recommendations)})
         return jsonify({
             "success": True, 
             "recommendations": recommendations,
@@ -140,6 +290,59 @@ def get_recommendations():
         print(f"Error in get_recommendations: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/recommend/batch', methods=['POST'])
+@login_required
+def get_batch_recommendations():
+    """Recommendations for a list of preference profiles, streamed as NDJSON with a timing summary last"""
+    data = request.get_json(silent=True) or {}
+    profiles = data.get('profiles')
+    if not isinstance(profiles, list) or not profiles or not all(isinstance(profile, dict) for profile in profiles):
+        return jsonify({"success": False, "error": "profiles must be a non-empty list of preference objects"}), 400
+    if len(profiles) > MAX_BATCH_PROFILES:
+        return jsonify({"success": False, "error": f"At most {MAX_BATCH_PROFILES} profiles per batch"}), 400
+    response_schema = data.get('schema', 'full')
+    
+    def generate():
+        try:
+            for result in batch_recommender.run(profiles, response_schema):
+                yield app.json.dumps(result) + "\n"
+        except Exception as e:
+            print(f"Error in get_batch_recommendations: {e}")
+            yield app.json.dumps({"success": False, "error": str(e)}) + "\n"
+    
+    return app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/recommendations/default')
+@login_required
+def get_default_recommendations():
+    """Recommendations for the signed-in student's major and level, served precomputed when available"""
+    try:
+        user = auth_manager.get_current_user()
+        if not user:
+            return jsonify({"success": False, "error": "Authentication required"}), 401
+        department = data_manager.resolve_major(user.get('major'))
+        academic_level = normalize_level(user.get('academic_level'))
+        
+        recommendations = data_manager.get_precomputed_recommendations(department, academic_level)
+        precomputed = recommendations is not None
+        if not precomputed:
+            # Score it live; this GET never writes, filling the table is precompute_recommendations.py's job
+            description = data_manager.get_department_descriptions().get(department, '')
+            profile = default_profile(department, academic_level, description)
+            recommendations = get_recommendation_engine().get_recommendations(**profile_arguments(profile))
+        
+        return jsonify({
+            "success": True,
+            "recommendations": recommendations,
+            "total_count": len(recommendations),
+            "department": department,
+            "academic_level": academic_level,
+            "precomputed": precomputed
+        })
+    except Exception as e:
+        print(f"Error in get_default_recommendations: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @app.route('/api/course/<course_id>')
 def get_course_details(course_id):
     """Get detailed information about a specific course"""
@@ -203,12 +406,41 @@ def get_course_ratings(course_id):
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/course/<course_id>/similar')
+def get_similar_courses(course_id):
+    """Courses most similar to a given course, served from the precomputed neighbour lists"""
+    try:
+        if not data_manager.get_catalog_snapshot().by_id.get(course_id):
+            return jsonify({"success": False, "error": "Course not found"}), 404
+
+        limit = min(max(request.args.get('limit', 5, type=int), 1), 50)
+        similar = get_recommendation_engine().get_similar_courses(course_id, limit)
+        return jsonify({"success": True, "course_id": course_id, "similar_courses": similar})
+    except Exception as e:
+        print(f"Error in get_similar_courses: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/health')
+def health():
+    """Readiness information: warmup report, catalog version and cache counters"""
+    report = app.config.get('WARMUP_REPORT')
+    return jsonify({
+        "success": True,
+        "warmed_up": report is not None,
+        "warmup": report,
+        "catalog_version": data_manager.get_catalog_version(),
+        "recommendation_cache": recommendation_engine.result_cache.stats() if recommendation_engine else None,
+        "password_hashing": password_hasher.stats(),
+        "user_cache": data_manager.user_cache.stats(),
+        "response_cache": response_cache.stats()
+    })
+
 @app.route('/api/departments')
 def get_departments():
     """Get all NJIT departments"""
     try:
-        departments = data_manager.get_all_departments()
-        return jsonify({"success": True, "departments": departments})
+        return cached_json_response('departments', data_manager.get_catalog_version('departments'),
+                                    departments_payload)
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -277,7 +509,8 @@ def api_register():
             last_name=last_name,
             student_id=student_id,
             major=major,
-            academic_level=academic_level
+            academic_level=academic_level,
+            client_ip=client_ip()
         )
         
         if success:
@@ -292,6 +525,8 @@ def api_register():
                 'error': message
             }), 400
             
+    except PasswordHashingBusy as e:
+        return password_hashing_busy_response(e)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -313,7 +548,7 @@ def api_login():
             return jsonify({'success': False, 'error': 'Email and password are required'}), 400
         
         # Authenticate user
-        success, message, user = auth_manager.login_user(email, password)
+        success, message, user = auth_manager.login_user(email, password, client_ip())
         
         if success:
             try:
@@ -342,6 +577,8 @@ def api_login():
                 'error': message
             }), 401
             
+    except PasswordHashingBusy as e:
+        return password_hashing_busy_response(e)
     except Exception as e:
         print(f"Login error: {e}")
         return jsonify({'success': False, 'error': 'Login failed due to server error'}), 500
@@ -448,6 +685,7 @@ def saved_courses_page():
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
+    warm_up()
     app.run(debug=False, host='0.0.0.0', port=port)
 else:
     # For production deployment (Railway, Heroku, etc.)
@@ -0,0 +1,629 @@
+#!/usr/bin/env python3
+"""
+NJIT Elective Advisor - Benchmark and Parity Checks
+
+Run against the course database to time and validate the recommendation pipeline:
+
+    python benchmark.py parity    # vectorized scoring vs. the per-course scorers
+    python benchmark.py pruning   # inverted-index candidate pruning vs. scoring every course
+    python benchmark.py imports   # import time of the web app and heavy-module guard
+    python benchmark.py tokenizer # fast tokenizer vs. NLTK word_tokenize, tokens/sec
+    python benchmark.py similar   # similar-course index build, lookups and incremental updates
+    python benchmark.py import    # streaming department CSV import, one reader vs. --workers readers
+    python benchmark.py ratings   # rating writes with running totals, checked for drift
+    python benchmark.py schema    # schema migrations and EXPLAIN QUERY PLAN for the hot queries
+    python benchmark.py search-index # reload sample data and CSVs, checking the FTS5 index stays in sync
+    python benchmark.py responses # /api/courses cold, cached, compressed and 304 revalidation
+    python benchmark.py serialization # recommendation encode time and bytes, json vs orjson, full vs lean
+    python benchmark.py batch     # cohort batch recommendations in-process and pooled, vs. the worker timeout
+    python benchmark.py hashing   # sign-ins turned away with 503/429 while hashing slots are held
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict
+from src.data_manager import DataManager
+from src.recommendation_engine import NON_ALPHA_PATTERN, RecommendationEngine
+from src.response_cache import ResponseCache
+from src.similarity_index import SimilarityIndex
+
+# Representative student profiles covering both weighting branches, every academic
+# level, completed-course prerequisites and the department filters
+PROFILES = [
+    dict(interests=['ai_ml'], specific_topics='machine learning neural networks',
+         career_goals='data_science', preferred_topics=[], difficulty_preference='medium',
+         completed_courses=[], num_recommendations=10, department_filter='Computer Science',
+         include_cross_dept=True, academic_level='junior'),
+    dict(interests=['cybersecurity', 'web_development'], specific_topics='',
+         career_goals='cybersecurity', preferred_topics=[], difficulty_preference='high',
+         completed_courses=['CS280', 'CS356'], num_recommendations=15,
+         department_filter='Computer Science', include_cross_dept=True, academic_level=''),
+    dict(interests=['mechanical_engineering'], specific_topics='thermodynamics and heat transfer',
+         career_goals='', preferred_topics=[], difficulty_preference='low', completed_courses=[],
+         num_recommendations=10, department_filter='Civil Engineering',
+         include_cross_dept=False, academic_level='sophomore'),
+    dict(interests=['environmental engineering sustainability'], specific_topics='',
+         career_goals='exploring', preferred_topics=['explore new fields discover interdisciplinary'],
+         difficulty_preference='any', completed_courses=[], num_recommendations=10,
+         department_filter='', include_cross_dept=True, academic_level='senior'),
+    dict(interests=['mathematics', 'data_science'], specific_topics='linear algebra statistics',
+         career_goals='data_analyst', preferred_topics=[], difficulty_preference='hard',
+         completed_courses=['MATH111', 'MATH112', 'CS100', 'CS114', 'CS241', 'MATH211',
+                            'MATH333', 'CS280', 'CS288', 'CS341', 'CS356'],
+         num_recommendations=10, department_filter='Mathematics', include_cross_dept=True,
+         academic_level=''),
+    dict(interests=[], specific_topics='', career_goals='', preferred_topics=[],
+         difficulty_preference='medium', completed_courses=[], num_recommendations=50,
+         department_filter='', include_cross_dept=False, academic_level='graduate'),
+]
+
+
+# Heavy dependencies that importing the web app must not pull in; they load on first use
+HEAVY_MODULES = ('numpy', 'scipy', 'sklearn', 'nltk', 'pandas', 'requests', 'bs4')
+
+
+def run_profiles(engine: RecommendationEngine):
+    """Run every profile once and return the results and the elapsed seconds"""
+    start = time.perf_counter()
+    results = [engine.get_recommendations(**profile) for profile in PROFILES]
+    return results, time.perf_counter() - start
+
+
+def command_parity(args) -> int:
+    """Compare vectorized scoring against the per-course scorers on every profile"""
+    data_manager = DataManager(args.db)
+    # Result caching off, so the second pass really scores every course again
+    vectorized = RecommendationEngine(data_manager, scoring_mode='vectorized', result_cache_size=0)
+    per_course = RecommendationEngine(data_manager, scoring_mode='per_course', result_cache_size=0)
+
+    # Warm both engines so the timings exclude index construction
+    run_profiles(vectorized)
+    run_profiles(per_course)
+
+    vectorized_results, vectorized_time = run_profiles(vectorized)
+    per_course_results, per_course_time = run_profiles(per_course)
+
+    mismatches = 0
+    for number, (expected, actual) in enumerate(zip(per_course_results, vectorized_results), 1):
+        expected_scores = [(rec['id'], rec['recommendation_score'], rec['score_breakdown']) for rec in expected]
+        actual_scores = [(rec['id'], rec['recommendation_score'], rec['score_breakdown']) for rec in actual]
+        if expected_scores != actual_scores:
+            mismatches += 1
+            print(f"❌ Profile {number}: vectorized results differ from per-course scoring")
+        else:
+            print(f"✅ Profile {number}: {len(actual)} recommendations match")
+
+    print(f"\nper_course: {per_course_time:.3f}s  vectorized: {vectorized_time:.3f}s "
+          f"({len(PROFILES)} profiles)")
+    return 1 if mismatches else 0
+
+
+def command_pruning(args) -> int:
+    """Compare candidate pruning against scoring every course and report the candidate share"""
+    data_manager = DataManager(args.db)
+    pruned = RecommendationEngine(data_manager, result_cache_size=0)
+    full = RecommendationEngine(data_manager, result_cache_size=0, candidate_pruning=False)
+    pruned.warm_up()
+    full.warm_up()
+    catalog_size = len(data_manager.get_catalog_snapshot())
+
+    mismatches = 0
+    pruned_time = full_time = 0.0
+    for number, profile in enumerate(PROFILES, 1):
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            actual = pruned.get_recommendations(**profile)
+        pruned_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            expected = full.get_recommendations(**profile)
+        full_time += time.perf_counter() - start
+
+        interest_rows = pruned.interest_candidate_rows(profile['interests'] + profile['preferred_topics'])
+        topic_rows = pruned.topic_candidate_rows(profile['specific_topics'])
+        interest_share = f"{len(interest_rows)}/{catalog_size}" if interest_rows is not None else "all"
+        topic_share = f"{len(topic_rows)}/{catalog_size}" if topic_rows is not None else "all"
+        if actual != expected:
+            mismatches += 1
+            print(f"❌ Profile {number}: pruned results differ from full scoring")
+        else:
+            print(f"✅ Profile {number}: {len(actual)} recommendations match "
+                  f"(interest candidates {interest_share}, topic candidates {topic_share})")
+
+    print(f"\nfull: {full_time:.3f}s  pruned: {pruned_time:.3f}s "
+          f"({len(PROFILES)} profiles x {args.rounds} rounds)")
+    return 1 if mismatches else 0
+
+
+def command_tokenizer(args) -> int:
+    """Compare the fast tokenizer with NLTK's on the catalog text and report tokens/sec"""
+    data_manager = DataManager(args.db)
+    courses = data_manager.get_catalog_snapshot().courses
+    texts = []
+    for course in courses:
+        texts.append(f"{course.get('title', '')} {course.get('description', '')} {course.get('topics', '')}")
+        texts.append(f"{course.get('title', '')} {course.get('description', '')} {course.get('topics', '')} "
+                     f"{course.get('career_relevance', '')}")
+        texts.append(f"{course.get('description', '')} {course.get('topics', '')}")
+    # Contractions the Treebank tokenizer splits, with and without apostrophes
+    texts.append("You cannot -- wanna, gonna, gotta, lemme, gimme; d'ye more'n 'tis 'twas CANNOT wanna")
+
+    outputs, rates = {}, {}
+    for mode in ('nltk', 'fast'):
+        engine = RecommendationEngine(data_manager, tokenizer=mode)
+        engine.load_text_pipeline()
+        tokens = sum(len(engine.word_tokenize(NON_ALPHA_PATTERN.sub('', text.lower()))) for text in texts)
+
+        # The first round runs with a cold stem cache
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            outputs[mode] = [engine.preprocess_text(text) for text in texts]
+        elapsed = time.perf_counter() - start
+        rates[mode] = tokens * args.rounds / elapsed
+        print(f"{mode:>5}: {rates[mode]:12,.0f} tokens/sec ({len(texts)} texts x {args.rounds} rounds, {elapsed:.3f}s)")
+
+    mismatches = sum(1 for expected, actual in zip(outputs['nltk'], outputs['fast']) if expected != actual)
+    print(f"\nspeedup: {rates['fast'] / rates['nltk']:.1f}x")
+    if mismatches:
+        print(f"❌ {mismatches} of {len(texts)} texts preprocess differently")
+        return 1
+    print(f"✅ All {len(texts)} texts preprocess identically")
+    return 0
+
+
+def command_similar(args) -> int:
+    """Time the similarity index build and lookups, and check incremental updates against a full build"""
+    data_manager = DataManager(args.db)
+    engine = RecommendationEngine(data_manager)
+    start = time.perf_counter()
+    engine.warm_up()
+    print(f"build: {time.perf_counter() - start:.3f}s (corpus index and similarity index)")
+
+    courses = data_manager.get_catalog_snapshot().courses
+    start = time.perf_counter()
+    for course in courses:
+        engine.get_similar_courses(course['id'], args.limit)
+    elapsed = time.perf_counter() - start
+    print(f"lookup: {elapsed / max(len(courses), 1) * 1e6:.1f}us per course ({len(courses)} courses, top {args.limit})")
+
+    # Edit a few courses' text, patch the index, and compare with scoring the edited
+    # catalog from scratch against the same fitted vocabulary
+    index = engine.similarity_index
+    course_ids = [course['id'] for course in courses]
+    texts = [engine.get_course_text(course)['similarity_text'] for course in courses]
+    for row in range(0, len(texts), max(len(texts) // max(args.edits, 1), 1))[:args.edits]:
+        texts[row] = f"{texts[(row + 1) % len(texts)]} {texts[row]}"
+    start = time.perf_counter()
+    status = index.update(course_ids, texts, 'benchmark')
+    print(f"update: {status} in {time.perf_counter() - start:.3f}s ({args.edits} courses edited)")
+
+    reference = SimilarityIndex(top_n=index.top_n)
+    reference.ids = course_ids
+    reference.matrix = index.vectorizer.transform(texts).tocsr()
+    mismatches = 0
+    for row, course_id in enumerate(course_ids):
+        expected = reference._top_neighbors(row, index.top_n)
+        actual = index.neighbors[course_id]
+        if [neighbor for neighbor, _ in expected] != [neighbor for neighbor, _ in actual] or any(
+                abs(expected_score - actual_score) > 1e-9
+                for (_, expected_score), (_, actual_score) in zip(expected, actual)):
+            mismatches += 1
+    if mismatches:
+        print(f"❌ {mismatches} of {len(course_ids)} neighbour lists differ after the incremental update")
+        return 1
+    print(f"✅ All {len(course_ids)} neighbour lists match a full recompute")
+    return 0
+
+
+def command_import(args) -> int:
+    """Import the department CSVs into scratch databases with one reader and with --workers readers"""
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        for workers in sorted({1, args.workers}):
+            data_manager = DataManager(os.path.join(directory, f"import_{workers}.db"))
+            for label in ('fresh', 'reimport'):
+                report = data_manager.import_department_csvs(args.directory, workers=workers)
+                failed = failed or not report['success']
+                print(f"workers={workers} {label:>8}: {report['rows']} rows, {report['written']} written, "
+                      f"{len(report['rejects'])} rejected, {report['duplicates']} duplicates in "
+                      f"{report['seconds']:.3f}s ({report['rows_per_second']:,.0f} rows/sec)")
+            data_manager.close_connections()
+    return 1 if failed else 0
+
+
+def command_ratings(args) -> int:
+    """Time rating writes on a scratch copy of the database and check the running totals for drift"""
+    import random
+    import shutil
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "ratings.db")
+        shutil.copyfile(args.db, db_path)
+        data_manager = DataManager(db_path)
+        data_manager.recompute_rating_aggregates()
+        course_ids = [course['id'] for course in data_manager.get_catalog_snapshot().courses]
+
+        # Few students and courses, so many writes overwrite an earlier rating
+        students = [f"student{number}@njit.edu" for number in range(args.students)]
+        courses = rng.sample(course_ids, min(args.courses, len(course_ids)))
+        start = time.perf_counter()
+        for _ in range(args.writes):
+            data_manager.add_student_rating({
+                'student_email': rng.choice(students), 'course_id': rng.choice(courses),
+                'rating': rng.randint(1, 5), 'review': '', 'completed_semester': '', 'would_recommend': True
+            })
+        elapsed = time.perf_counter() - start
+        print(f"{args.writes} rating writes in {elapsed:.3f}s ({args.writes / elapsed:,.0f} writes/sec)")
+
+        result = data_manager.recompute_rating_aggregates()
+        data_manager.close_connections()
+    if result['repaired']:
+        print(f"❌ Running totals drifted for {len(result['repaired'])} courses")
+        return 1
+    print(f"✅ Running totals match student_ratings for all {len(courses)} courses")
+    return 0
+
+
+def command_schema(args) -> int:
+    """Migrate a scratch copy of the database and check the hot queries' plans"""
+    import shutil
+    import sqlite3
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "schema.db")
+        shutil.copyfile(args.db, db_path)
+        connection = sqlite3.connect(db_path)
+        before = connection.execute('PRAGMA user_version').fetchone()[0]
+        connection.close()
+
+        # Opening the database applies pending migrations, which print the plans themselves
+        data_manager = DataManager(db_path)
+        after = data_manager.get_connection().execute('PRAGMA user_version').fetchone()[0]
+        plans = data_manager.check_query_plans(verbose=after == before)
+        data_manager.close_connections()
+    print(f"\nschema version {before} -> {after}")
+    slow = [name for name, result in plans.items() if not result['ok']]
+    if slow:
+        print(f"❌ {len(slow)} hot queries scan a table or sort in a temporary B-tree")
+        return 1
+    print(f"✅ All {len(plans)} hot queries use an index")
+    return 0
+
+
+def command_search_index(args) -> int:
+    """Reload sample data and re-import the CSVs into a scratch copy, running the FTS5 integrity check after each"""
+    import shutil
+
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "search.db")
+        shutil.copyfile(args.db, db_path)
+        data_manager = DataManager(db_path)
+        steps = [('sample data', data_manager.load_sample_data), ('sample data again', data_manager.load_sample_data),
+                 ('CSV import', lambda: data_manager.import_department_csvs(args.directory))]
+        for label, load in steps:
+            load()
+            ok = data_manager.check_search_index()
+            failed = failed or not ok
+            print(f"{'✅' if ok else '❌'} Search index {'in sync' if ok else 'corrupt'} after {label}")
+        data_manager.close_connections()
+    return 1 if failed else 0
+
+
+def command_responses(args) -> int:
+    """Time /api/courses and /api/departments through the Flask test client, from cold to 304"""
+    import gzip
+    import json
+    import app as web
+
+    web.data_manager = DataManager(args.db)
+    client = web.app.test_client()
+
+    def timed(path: str, headers: Dict) -> tuple:
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            response = client.get(path, headers=headers)
+        return response, (time.perf_counter() - start) / args.rounds * 1e6
+
+    failed = False
+    for path in ('/api/courses', '/api/departments'):
+        web.response_cache = ResponseCache(web.response_cache.token)
+        start = time.perf_counter()
+        cold = client.get(path)
+        cold_us = (time.perf_counter() - start) * 1e6
+        cached, cached_us = timed(path, {})
+        compressed, compressed_us = timed(path, {'Accept-Encoding': 'gzip'})
+        revalidated, revalidated_us = timed(path, {'Accept-Encoding': 'gzip', 'If-None-Match': compressed.headers['ETag']})
+
+        body = compressed.data
+        if compressed.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        if json.loads(body) != json.loads(cold.data) or cached.data != cold.data or revalidated.status_code != 304:
+            failed = True
+            print(f"❌ {path}: cached, compressed or 304 responses don't match the cold response")
+        print(f"{path}: cold {cold_us:,.0f} us ({len(cold.data):,} bytes), cached {cached_us:,.0f} us, "
+              f"{compressed.headers.get('Content-Encoding', 'identity')} {compressed_us:,.0f} us "
+              f"({len(compressed.data):,} bytes), 304 {revalidated_us:,.0f} us")
+    web.data_manager.close_connections()
+    if not failed:
+        print("✅ Cached, compressed and revalidated responses match")
+    return 1 if failed else 0
+
+
+def command_serialization(args) -> int:
+    """Encode /api/recommend bodies for K recommendations with each JSON provider and schema"""
+    import json
+    from flask import Flask
+    from flask.json.provider import DefaultJSONProvider
+    from src.serialization import OrjsonProvider, lean_recommendations, orjson
+
+    if orjson is None:
+        print("orjson is not installed; OrjsonProvider falls back to the json module")
+    app = Flask('benchmark')
+    providers = {'json': DefaultJSONProvider(app), 'orjson': OrjsonProvider(app)}
+    engine = RecommendationEngine(DataManager(args.db), result_cache_size=0)
+
+    failed = False
+    for k in args.k:
+        recommendations = engine.get_recommendations(**dict(PROFILES[0], department_filter='',
+                                                            num_recommendations=k))
+        bodies = {
+            'full': {"success": True, "recommendations": recommendations, "total_count": len(recommendations)},
+            'lean': {"success": True, **lean_recommendations(recommendations), "total_count": len(recommendations)},
+        }
+        for schema, body in bodies.items():
+            encoded = {}
+            for name, provider in providers.items():
+                start = time.perf_counter()
+                for _ in range(args.rounds):
+                    data = provider.response(body).get_data()
+                encoded[name] = data
+                elapsed_us = (time.perf_counter() - start) / args.rounds * 1e6
+                print(f"K={len(recommendations):<3} {schema:<4} {name:<6}: {elapsed_us:8,.0f} us  {len(data):8,} bytes")
+            if len({json.dumps(json.loads(data), sort_keys=True) for data in encoded.values()}) != 1:
+                failed = True
+                print(f"❌ K={k} {schema}: providers produced different documents")
+    if not failed:
+        print("✅ Both providers produce the same documents")
+    return 1 if failed else 0
+
+
+def command_batch(args) -> int:
+    """Run a full-size cohort in-process and on the pool; check it fits the worker timeout and matches single calls"""
+    from src.batch_recommendations import MAX_BATCH_PROFILES, BatchRecommender, profile_arguments
+
+    # Vary the free-text topics so the result cache doesn't answer repeated profiles
+    cohort = []
+    for number in range(args.profiles or MAX_BATCH_PROFILES):
+        profile = PROFILES[number % len(PROFILES)]
+        cohort.append(dict(profile, specific_topics=f"{profile['specific_topics']} {number}"))
+    engine = RecommendationEngine(DataManager(args.db), result_cache_size=0)
+    engine.warm_up()
+
+    start = time.perf_counter()
+    single = [[item['id'] for item in engine.get_recommendations(**profile_arguments(profile))]
+              for profile in cohort]
+    elapsed = time.perf_counter() - start
+    print(f"single calls: {len(cohort)} profiles in {elapsed:.3f}s ({len(cohort) / elapsed:,.1f}/sec)")
+
+    failed = False
+    for workers in sorted({0, args.workers}):
+        recommender = BatchRecommender(lambda: engine, workers=workers)
+        recommender.start_pool()
+        results = list(recommender.run(cohort, schema='lean'))
+        recommender.shutdown()
+        summary = results.pop()['summary']
+        print(f"workers={summary['workers']}: {summary['profiles']} profiles in {summary['seconds']:.3f}s "
+              f"({summary['profiles_per_second']:,.1f}/sec), p50 {summary['profile_seconds']['p50'] * 1000:.1f} ms, "
+              f"p95 {summary['profile_seconds']['p95'] * 1000:.1f} ms, {summary['failed']} failed")
+        ids = {result['index']: [item['id'] for item in result.get('recommendations', [])] for result in results}
+        if [ids.get(index) for index in range(len(cohort))] != single:
+            failed = True
+            print(f"❌ workers={workers}: batch results differ from single calls")
+        # Without a pool the whole batch runs in one gunicorn worker, so it must fit the timeout
+        if workers == 0 and len(cohort) >= MAX_BATCH_PROFILES and summary['seconds'] > args.budget_seconds:
+            failed = True
+            print(f"❌ {MAX_BATCH_PROFILES} profiles (MAX_BATCH_PROFILES) took {summary['seconds']:.1f}s in-process, "
+                  f"over the {args.budget_seconds:.0f}s budget")
+    if not failed:
+        print("✅ Batch results match single calls" + (
+            f"; {MAX_BATCH_PROFILES} profiles fit the {args.budget_seconds:.0f}s budget in-process"
+            if len(cohort) >= MAX_BATCH_PROFILES else ""))
+    return 1 if failed else 0
+
+
+def command_hashing(args) -> int:
+    """Hold the hashing slots from other processes and check sign-ins are turned away at once"""
+    import multiprocessing
+    import shutil
+    import app as web
+    from src.auth import AuthManager
+    from src.password_hashing import PBKDF2_ITERATIONS, PasswordHasher, hash_password
+
+    # A stored hash whose verification keeps a slot busy for about --hold seconds
+    start = time.perf_counter()
+    hash_password('calibration')
+    iterations = int(PBKDF2_ITERATIONS * args.hold / (time.perf_counter() - start))
+    slow_hash = f"pbkdf2_sha256${iterations}${'0' * 64}${'0' * 64}"
+
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "hashing.db")
+        shutil.copyfile(args.db, db_path)
+        hasher = PasswordHasher(max_pending=2, max_per_client=1, lock_dir=os.path.join(directory, 'slots'))
+        web.data_manager = DataManager(db_path)
+        web.auth_manager = AuthManager(web.data_manager, hasher)
+        client = web.app.test_client()
+        account = {'email': 'hashing@njit.edu', 'password': 'Benchmark-Password-1',
+                   'first_name': 'Hash', 'last_name': 'Check'}
+        client.post('/api/register', json=account, environ_base={'REMOTE_ADDR': '10.0.0.9'})
+        credentials = {'email': account['email'], 'password': account['password']}
+        # Forked, not spawned: this process has no other threads, and the children only hash
+        context = multiprocessing.get_context('fork')
+
+        def login(address: str, expected: int, label: str) -> None:
+            nonlocal failed
+            start = time.perf_counter()
+            response = client.post('/api/login', json=credentials, environ_base={'REMOTE_ADDR': address})
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            ok = response.status_code == expected
+            failed = failed or not ok
+            print(f"{'✅' if ok else '❌'} {label}: {response.status_code} (expected {expected}) in {elapsed_ms:.1f} ms")
+
+        for label, holders, address, expected in (
+                ("all host slots held by other processes", ['10.0.1.1', '10.0.1.2'], '10.0.0.1', 503),
+                ("this client's slot held by another process", ['10.0.0.1'], '10.0.0.1', 429),
+                ("another client while one slot is held", ['10.0.0.1'], '10.0.0.2', 200),
+                ("no slots held", [], '10.0.0.1', 200)):
+            processes = [context.Process(target=hasher.verify, args=('password', slow_hash, holder))
+                         for holder in holders]
+            for process in processes:
+                process.start()
+            # Give the holders time to take their slots
+            time.sleep(min(0.3, args.hold / 4) if processes else 0)
+            login(address, expected, label)
+            for process in processes:
+                process.join()
+        web.data_manager.flush_last_logins()
+        web.data_manager.close_connections()
+    return 1 if failed else 0
+
+
+def import_times(module: str) -> Dict[str, int]:
+    """Cumulative import time in microseconds for every module loaded by `import module`"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else module)
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue  # header line
+        times[fields[2].strip()] = int(fields[1])
+    return times
+
+
+def command_imports(args) -> int:
+    """Time a fresh import of the app and fail if it loads heavy modules or exceeds the budget"""
+    runs = []
+    for _ in range(args.runs):
+        try:
+            runs.append(import_times(args.module))
+        except RuntimeError as e:
+            print(f"❌ import {args.module} failed: {e}")
+            return 1
+    # The fastest run is the least disturbed by the rest of the machine
+    times = min(runs, key=lambda run: run.get(args.module, 0))
+    total_ms = times.get(args.module, 0) / 1000
+
+    print(f"import {args.module}: {total_ms:.1f} ms (best of {args.runs}, budget {args.budget_ms:.0f} ms)")
+    print("\nSlowest top-level imports:")
+    top_level = sorted(
+        ((name, us) for name, us in times.items() if '.' not in name and name != args.module),
+        key=lambda item: item[1], reverse=True
+    )
+    for name, us in top_level[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    failed = False
+    heavy = [name for name in HEAVY_MODULES if name in times]
+    if heavy:
+        failed = True
+        print(f"\n❌ Heavy modules imported eagerly: {', '.join(heavy)}")
+    if total_ms > args.budget_ms:
+        failed = True
+        print(f"\n❌ Import time {total_ms:.1f} ms exceeds the {args.budget_ms:.0f} ms budget")
+    if not failed:
+        print("\n✅ No heavy modules imported and within budget")
+    return 1 if failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="NJIT Elective Advisor benchmarks")
+    parser.add_argument('--db', default='data/courses.db', help="Path to the course database")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('parity', help="Check vectorized scoring against per-course scoring")
+
+    pruning_parser = subparsers.add_parser('pruning', help="Check candidate pruning against full scoring")
+    pruning_parser.add_argument('--rounds', type=int, default=5, help="Requests per profile")
+
+    tokenizer_parser = subparsers.add_parser('tokenizer', help="Compare the fast tokenizer with NLTK's")
+    tokenizer_parser.add_argument('--rounds', type=int, default=3, help="Passes over the catalog text")
+
+    imports_parser = subparsers.add_parser('imports', help="Measure app import time with python -X importtime")
+    imports_parser.add_argument('--module', default='app', help="Module to import (api.index for the Vercel entry)")
+    imports_parser.add_argument('--budget-ms', type=float, default=1000.0, help="Maximum allowed import time")
+    imports_parser.add_argument('--runs', type=int, default=3, help="Number of fresh interpreter runs")
+    imports_parser.add_argument('--top', type=int, default=10, help="Number of slowest imports to list")
+
+    similar_parser = subparsers.add_parser('similar', help="Time and check the precomputed similar-course index")
+    similar_parser.add_argument('--limit', type=int, default=5, help="Similar courses per lookup")
+    similar_parser.add_argument('--edits', type=int, default=5, help="Courses edited for the incremental check")
+
+    import_parser = subparsers.add_parser('import', help="Time the department CSV import")
+    import_parser.add_argument('--directory', default='data/departments', help="Directory of *_electives.csv files")
+    import_parser.add_argument('--workers', type=int, default=2,
+                               help="Parallel CSV readers to compare with one (import_department_csvs' default)")
+
+    ratings_parser = subparsers.add_parser('ratings', help="Time rating writes and check the running totals")
+    ratings_parser.add_argument('--writes', type=int, default=2000, help="Ratings to submit")
+    ratings_parser.add_argument('--students', type=int, default=200, help="Distinct students")
+    ratings_parser.add_argument('--courses', type=int, default=20, help="Distinct courses rated")
+    ratings_parser.add_argument('--seed', type=int, default=0, help="Random seed")
+
+    subparsers.add_parser('schema', help="Migrate a copy of the database and check query plans")
+
+    search_index_parser = subparsers.add_parser('search-index', help="Check the FTS5 index survives catalog reloads")
+    search_index_parser.add_argument('--directory', default='data/departments', help="Directory of *_electives.csv files")
+
+    responses_parser = subparsers.add_parser('responses', help="Time cached, compressed and 304 catalog responses")
+    responses_parser.add_argument('--rounds', type=int, default=200, help="Requests per measurement")
+
+    serialization_parser = subparsers.add_parser('serialization', help="Time recommendation response encoding")
+    serialization_parser.add_argument('--k', type=int, nargs='+', default=[10, 50, 100],
+                                      help="Recommendations per response")
+    serialization_parser.add_argument('--rounds', type=int, default=200, help="Encodes per measurement")
+
+    hashing_parser = subparsers.add_parser('hashing', help="Check sign-ins get 503/429 when hashing slots are held")
+    hashing_parser.add_argument('--hold', type=float, default=1.5, help="Seconds each holder keeps its slot")
+
+    batch_parser = subparsers.add_parser('batch', help="Time batch recommendations and check them against the worker timeout")
+    batch_parser.add_argument('--profiles', type=int, default=0, help="Profiles in the cohort (MAX_BATCH_PROFILES)")
+    batch_parser.add_argument('--workers', type=int, default=2, help="Pool processes")
+    batch_parser.add_argument('--budget-seconds', type=float, default=15.0,
+                              help="Longest an in-process batch may take (half gunicorn's 30s timeout)")
+
+    args = parser.parse_args()
+    commands = {
+        'parity': command_parity,
+        'pruning': command_pruning,
+        'imports': command_imports,
+        'tokenizer': command_tokenizer,
+        'similar': command_similar,
+        'import': command_import,
+        'ratings': command_ratings,
+        'schema': command_schema,
+        'search-index': command_search_index,
+        'responses': command_responses,
+        'serialization': command_serialization,
+        'batch': command_batch,
+        'hashing': command_hashing,
+    }
+    return commands[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
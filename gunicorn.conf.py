@@ -71,6 +71,18 @@ def on_reload(server):
 
 def when_ready(server):
     """Called just after the server is started."""
+    if server.cfg.preload_app:
+        # The app is already imported in the master; warm it up before any worker is forked
+        try:
+            from app import warm_up
+            report = warm_up()
+            server.log.info(
+                "Catalog warmed up in %.2fs: %d courses (version %s), %d TF-IDF terms, %d objects frozen",
+                report['total_seconds'], report['courses'], report['catalog_version'],
+                report['vocabulary_size'], report['frozen_objects']
+            )
+        except Exception as e:
+            server.log.warning("Catalog warmup failed, workers will build it on demand: %s", e)
     server.log.info("NJIT Elective Advisor server is ready. PID: %s", os.getpid())
 
 def worker_int(worker):
@@ -87,8 +99,17 @@ def post_fork(server, worker):
 
 def post_worker_init(worker):
     """Called just after a worker has initialized the application."""
+    # The worker has no other threads yet, so it can safely fork its batch recommendation pool
+    from app import start_batch_pool
+    if start_batch_pool():
+        worker.log.info("Batch recommendation pool started (pid: %s)", worker.pid)
     worker.log.info("Worker initialized (pid: %s)", worker.pid)
 
+def worker_exit(server, worker):
+    """Called just after a worker has been exited, in the worker process."""
+    from app import batch_recommender
+    batch_recommender.shutdown()
+
 def worker_abort(worker):
     """Called when a worker received the SIGABRT signal."""
     worker.log.info("Worker received SIGABRT signal")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+NJIT Elective Advisor - Recommendation Precomputation
+
+Scores the default recommendations shown on a student's first visit to the
+advisor page, one set per major department and academic level, and stores
+them in the precomputed_recommendations table under the current catalog
+version. Course edits and new ratings bump the catalog version, which drops
+the stored sets; run this again after imports or before registration week:
+
+    python precompute_recommendations.py              # combinations of active users
+    python precompute_recommendations.py --all        # every department and level
+    python precompute_recommendations.py --workers 4  # pool processes
+
+The engine is warmed before the pool is forked, so every pool process starts
+with the same course features.
+"""
+
+import argparse
+import os
+import sys
+from src.data_manager import DataManager
+from src.batch_recommendations import (ACADEMIC_LEVELS, BatchRecommender, default_profile,
+                                       normalize_level)
+
+
+def profile_combinations(data_manager: DataManager, every_combination: bool) -> list:
+    """(department, academic_level) pairs to precompute"""
+    if every_combination:
+        departments = [''] + sorted(department for department in data_manager.get_catalog_snapshot().by_department
+                                    if department)
+        return [(department, level) for department in departments for level in ('',) + ACADEMIC_LEVELS]
+    return sorted({(data_manager.resolve_major(major), normalize_level(level))
+                   for major, level in data_manager.get_user_profile_combinations()})
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Precompute default recommendations for every major and level")
+    parser.add_argument('--db', default='data/courses.db', help="Path to the course database")
+    parser.add_argument('--all', action='store_true',
+                        help="Every department and level instead of those of active users")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Pool processes (0 runs inline)")
+    args = parser.parse_args()
+
+    from src.recommendation_engine import RecommendationEngine
+
+    print("=== NJIT Elective Advisor - Precompute Recommendations ===\n")
+    data_manager = DataManager(args.db)
+    engine = RecommendationEngine(data_manager, result_cache_size=0, persist_similarities=True)
+
+    combinations = profile_combinations(data_manager, args.all)
+    if not combinations:
+        print("No active users to precompute recommendations for.")
+        return 0
+    descriptions = data_manager.get_department_descriptions()
+    profiles = [default_profile(department, level, descriptions.get(department, ''))
+                for department, level in combinations]
+    print(f"Scoring {len(profiles)} major/level combinations with {args.workers} workers...")
+
+    recommender = BatchRecommender(lambda: engine, workers=args.workers)
+    # Nothing else runs in this process yet, so the pool can be forked now
+    recommender.start_pool()
+    rows = []
+    summary = {}
+    for result in recommender.run(profiles):
+        if 'summary' in result:
+            summary = result['summary']
+        elif result['success']:
+            department, level = combinations[result['index']]
+            rows.append((department, level, result['recommendations']))
+        else:
+            department, level = combinations[result['index']]
+            print(f"  ⚠️  {department or 'Any department'} / {level or 'any level'}: {result['error']}")
+    recommender.shutdown()
+
+    saved = data_manager.save_precomputed_recommendations(summary['catalog_version'], rows)
+    data_manager.close_connections()
+    print(f"Scored {summary['succeeded']} combinations in {summary['seconds']:.2f}s "
+          f"({summary['profiles_per_second']:,.1f}/sec, p95 {summary['profile_seconds']['p95'] * 1000:.0f} ms)")
+    if saved != len(rows):
+        print("❌ The catalog changed while scoring; nothing was stored. Run this again.")
+        return 1
+    print(f"✅ Stored {saved} recommendation sets for catalog version {summary['catalog_version']}")
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -28,13 +28,16 @@ def main():
     print("2. Create CSV template for manual data entry")
     print("3. Import from existing CSV file")
     print("4. View current database statistics")
-    print("5. Exit")
+    print("5. Recompute course rating totals from student ratings")
+    print("6. Exit")
     
-    choice = input("\nEnter your choice (1-5): ").strip()
+    choice = input("\nEnter your choice (1-6): ").strip()
     
     if choice == "1":
         print("\nLoading sample NJIT course data...")
         data_manager.load_sample_data()
+        # Databases reloaded by earlier versions may carry stale search index entries
+        data_manager.check_search_index(repair=True)
         print("✅ Sample data loaded successfully!")
         print("\nNext steps:")
         print("- Review the sample data in data/courses.db")
@@ -53,13 +56,19 @@ def main():
         print("- Use option 3 to import your updated CSV")
         
     elif choice == "3":
-        csv_path = input("Enter path to your CSV file: ").strip()
-        if os.path.exists(csv_path):
+        csv_path = input("Enter path to your CSV file (or press Enter for all data/departments CSVs): ").strip()
+        csv_path = csv_path or "data/departments"
+        if os.path.isdir(csv_path):
+            print(f"Importing department CSVs from {csv_path}...")
+            report = data_manager.import_department_csvs(csv_path)
+        elif os.path.exists(csv_path):
             print(f"Importing courses from {csv_path}...")
-            data_manager.import_courses_from_csv(csv_path)
-            print("✅ Import completed!")
+            report = data_manager.import_courses_from_csv(csv_path)
         else:
             print("❌ File not found. Please check the path.")
+            report = None
+        if report:
+            show_import_report(report)
             
     elif choice == "4":
         print("\nDatabase Statistics:")
@@ -72,6 +81,18 @@ def main():
             print(f"  {dept}: {count} courses")
             
     elif choice == "5":
+        print("\nRecomputing course rating totals...")
+        result = data_manager.recompute_rating_aggregates()
+        if result['success']:
+            print(f"✅ {len(result['repaired'])} courses had drifted totals and were repaired")
+            for course_id in result['repaired'][:20]:
+                print(f"  {course_id}")
+            if result['orphaned_ratings']:
+                print(f"⚠️  {result['orphaned_ratings']} ratings refer to courses that are not in the catalog")
+        else:
+            print(f"❌ Recompute failed: {result['error']}")
+            
+    elif choice == "6":
         print("Goodbye!")
         sys.exit(0)
         
@@ -79,6 +100,22 @@ def main():
         print("Invalid choice. Please try again.")
         main()
 
+def show_import_report(report):
+    for file_stats in report['files']:
+        status = f"error: {file_stats['error']}" if file_stats.get('error') else (
+            f"{file_stats['rows']} rows, {file_stats['written']} written, {file_stats['rejects']} rejected")
+        print(f"  {os.path.basename(file_stats['file'])}: {status} "
+              f"(read {file_stats['read_seconds']:.3f}s, write {file_stats['write_seconds']:.3f}s)")
+    for reject in report['rejects'][:20]:
+        print(f"  ⚠️  {os.path.basename(reject['file'])} line {reject['line']} {reject['id']}: {reject['error']}")
+    if len(report['rejects']) > 20:
+        print(f"  ... and {len(report['rejects']) - 20} more rejected rows")
+    if report['success']:
+        print(f"✅ Import completed: {report['rows']} courses in {report['seconds']:.2f}s "
+              f"({report['rows_per_second']:,.0f} rows/sec)")
+    else:
+        print(f"❌ Import failed and was rolled back: {report.get('error')}")
+
 def show_next_steps():
     print("\n" + "="*50)
     print("🎓 NJIT Elective Advisor Setup Complete!")
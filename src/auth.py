@@ -3,40 +3,26 @@ Authentication module for NJIT Elective Advisor
 Handles user registration, login, password hashing, and session management
 """
 
-import hashlib
-import secrets
 import re
 from typing import Optional, Dict, Tuple
 from functools import wraps
 from flask import session, request, jsonify, redirect, url_for
+from src.password_hashing import PasswordHasher, PasswordHashingBusy
 
 class AuthManager:
-    def __init__(self, data_manager):
+    def __init__(self, data_manager, password_hasher: Optional[PasswordHasher] = None):
         self.data_manager = data_manager
         self.session_timeout = 3600  # 1 hour in seconds
+        # PasswordHashingBusy is raised when too many hashes are already running
+        self.password_hasher = password_hasher or PasswordHasher()
     
-    def hash_password(self, password: str) -> str:
+    def hash_password(self, password: str, client_ip: Optional[str] = None) -> str:
         """Create a secure hash of the password"""
-        # Generate a random salt
-        salt = secrets.token_hex(32)
-        # Create hash with salt
-        pwd_hash = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode('utf-8'), 100000)
-        # Store salt and hash together
-        return salt + pwd_hash.hex()
+        return self.password_hasher.hash(password, client_ip)
     
-    def verify_password(self, password: str, stored_hash: str) -> bool:
-        """Verify a password against its hash"""
-        try:
-            # Extract salt (first 64 characters)
-            salt = stored_hash[:64]
-            # Extract hash (rest of the string)
-            stored_pwd_hash = stored_hash[64:]
-            # Hash the provided password with the same salt
-            pwd_hash = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode('utf-8'), 100000)
-            # Compare hashes
-            return pwd_hash.hex() == stored_pwd_hash
-        except:
-            return False
+    def verify_password(self, password: str, stored_hash: str, client_ip: Optional[str] = None) -> bool:
+        """Verify a password against its hash (current or legacy format)"""
+        return self.password_hasher.verify(password, stored_hash, client_ip)
     
     def validate_email(self, email: str) -> bool:
         """Validate email format"""
@@ -61,8 +47,9 @@ class AuthManager:
     
     def register_user(self, email: str, password: str, first_name: str, last_name: str,
                      student_id: Optional[str] = None, major: Optional[str] = None,
-                     academic_level: Optional[str] = None) -> Tuple[bool, str, Optional[int]]:
-        """Register a new user"""
+                     academic_level: Optional[str] = None,
+                     client_ip: Optional[str] = None) -> Tuple[bool, str, Optional[int]]:
+        """Register a new user; raises PasswordHashingBusy when hashing is saturated"""
         
         # Validate email
         if not self.validate_email(email):
@@ -82,7 +69,7 @@ class AuthManager:
             return False, "First name and last name are required", None
         
         # Hash password
-        password_hash = self.hash_password(password)
+        password_hash = self.hash_password(password, client_ip)
         
         # Create user
         user_id = self.data_manager.create_user(
@@ -100,8 +87,9 @@ class AuthManager:
         else:
             return False, "Failed to create account", None
     
-    def login_user(self, email: str, password: str) -> Tuple[bool, str, Optional[Dict]]:
-        """Authenticate user login"""
+    def login_user(self, email: str, password: str,
+                   client_ip: Optional[str] = None) -> Tuple[bool, str, Optional[Dict]]:
+        """Authenticate user login; raises PasswordHashingBusy when hashing is saturated"""
         
         # Validate email format
         if not self.validate_email(email):
@@ -113,9 +101,16 @@ class AuthManager:
             return False, "Invalid email or password", None
         
         # Verify password
-        if not self.verify_password(password, user['password_hash']):
+        if not self.verify_password(password, user['password_hash'], client_ip):
             return False, "Invalid email or password", None
         
+        # Upgrade legacy or weaker hashes while the plain password is at hand
+        if self.password_hasher.needs_rehash(user['password_hash']):
+            try:
+                self.data_manager.update_password_hash(user['id'], self.hash_password(password, client_ip))
+            except PasswordHashingBusy:
+                pass
+        
         # Update last login
         self.data_manager.update_last_login(user['id'])
         
@@ -148,8 +143,11 @@ class AuthManager:
         if not self.is_logged_in():
             return None
         
-        user_id = session.get('user_id')
-        return self.data_manager.get_user_by_id(user_id)
+        user = self.data_manager.get_user_by_id(session.get('user_id'))
+        if user:
+            # The hash never leaves the server
+            user.pop('password_hash', None)
+        return user
 
 
 def login_required(f):
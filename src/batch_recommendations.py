@@ -0,0 +1,194 @@
+"""
+Batch recommendations for advisor cohort runs.
+
+BatchRecommender scores many preference profiles against one catalog snapshot:
+the RecommendationEngine is warmed once (catalog snapshot, corpus TF-IDF index
+and course matrix) and every profile reuses those course features. Profiles
+are spread over a process pool forked from the warmed engine by start_pool().
+That must run while the process has no other threads: gunicorn calls it from
+post_worker_init, and precompute_recommendations.py before it scores anything.
+The pool is never forked lazily from a request, so without it (the dev
+server, or after a pool failure) profiles are scored in the calling process.
+Results are yielded as profiles finish, followed by a timing summary, so the
+web endpoint can stream them as NDJSON.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List
+
+from src.serialization import lean_recommendations
+
+# Most profiles accepted in one batch; scored in-process at the measured ~20-30 ms per
+# profile this stays well inside gunicorn's 30s worker timeout (benchmark.py batch checks it)
+MAX_BATCH_PROFILES = 250
+
+ACADEMIC_LEVELS = ('freshman', 'sophomore', 'junior', 'senior', 'graduate')
+# Courses in a student's default (first visit) recommendations
+DEFAULT_RECOMMENDATIONS = 10
+
+# Engine inherited by forked pool processes; set by start_pool() right before it forks
+_engine = None
+
+
+def profile_arguments(data: Dict) -> Dict:
+    """Keyword arguments for RecommendationEngine.get_recommendations, with /api/recommend's defaults"""
+    return {
+        'interests': data.get('interests', []),
+        'specific_topics': data.get('specific_topics', ''),
+        'career_goals': data.get('career_goals', ''),
+        'preferred_topics': data.get('preferred_topics', []),
+        'difficulty_preference': data.get('difficulty_preference', 'medium'),
+        'completed_courses': data.get('completed_courses', []),
+        'num_recommendations': data.get('num_recommendations', 10),
+        'department_filter': data.get('department_filter', ''),
+        'include_cross_dept': data.get('include_cross_dept', True),
+        'academic_level': data.get('academic_level', '')
+    }
+
+
+def normalize_level(academic_level: str) -> str:
+    """Academic level as the advisor form sends it, or '' when unknown"""
+    academic_level = (academic_level or '').strip().lower()
+    return academic_level if academic_level in ACADEMIC_LEVELS else ''
+
+
+def default_profile(department: str, academic_level: str, description: str = '') -> Dict:
+    """Preferences used before a student fills in the advisor form: their major's department and focus, and level"""
+    return {
+        'interests': [],
+        'specific_topics': description,
+        'career_goals': '',
+        'preferred_topics': [],
+        'difficulty_preference': 'any',
+        'completed_courses': [],
+        'num_recommendations': DEFAULT_RECOMMENDATIONS,
+        'department_filter': department,
+        'include_cross_dept': True,
+        'academic_level': academic_level
+    }
+
+
+def recommend_profile(index: int, profile: Dict, schema: str = 'full', engine=None) -> Dict:
+    """Score one profile; errors are reported in the result instead of failing the batch"""
+    engine = engine if engine is not None else _engine
+    start = time.perf_counter()
+    try:
+        recommendations = engine.get_recommendations(**profile_arguments(profile))
+        result = {'index': index, 'success': True}
+        if schema == 'lean':
+            result.update(lean_recommendations(recommendations))
+        else:
+            result['recommendations'] = recommendations
+        result['total_count'] = len(recommendations)
+    except Exception as e:
+        result = {'index': index, 'success': False, 'error': str(e)}
+    result['seconds'] = round(time.perf_counter() - start, 4)
+    if 'id' in profile:
+        result['id'] = profile['id']
+    return result
+
+
+def timing_summary(results: List[Dict], elapsed: float, workers: int, catalog_version: int) -> Dict:
+    """Per-batch counts and per-profile latency percentiles"""
+    seconds = sorted(result['seconds'] for result in results)
+
+    def percentile(fraction: float) -> float:
+        return seconds[min(int(fraction * len(seconds)), len(seconds) - 1)] if seconds else 0.0
+
+    return {
+        'profiles': len(results),
+        'succeeded': sum(1 for result in results if result['success']),
+        'failed': sum(1 for result in results if not result['success']),
+        'workers': workers,
+        'catalog_version': catalog_version,
+        'seconds': round(elapsed, 3),
+        'profiles_per_second': round(len(results) / elapsed, 1) if elapsed > 0 else 0.0,
+        'profile_seconds': {'p50': percentile(0.5), 'p95': percentile(0.95), 'max': seconds[-1] if seconds else 0.0}
+    }
+
+
+class BatchRecommender:
+    """Scores preference profiles against one warmed engine, on a pool forked up front when there is one"""
+
+    def __init__(self, engine_factory, workers: int = 0):
+        # Called for the engine lazily, so creating the recommender doesn't load the ML stack
+        self.engine_factory = engine_factory
+        self.workers = workers
+        self._pool = None
+        self._pool_pid = None
+
+    def start_pool(self) -> bool:
+        """Fork the pool from the warmed engine; call only while this process runs no other threads"""
+        global _engine
+        if self.workers <= 0 or 'fork' not in multiprocessing.get_all_start_methods():
+            return False
+        if self._pool is not None and self._pool_pid == os.getpid():
+            return True
+        if threading.active_count() > 1:
+            print("Batch recommendation pool not started: other threads are running, scoring inline")
+            return False
+        try:
+            _engine = self.engine_factory()
+            _engine.warm_up()
+            pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('fork'))
+            # A fork-context pool starts every process on the first submit, before its own
+            # management thread, so nothing forks once this returns
+            for future in [pool.submit(os.getpid) for _ in range(self.workers)]:
+                future.result()
+        except Exception as e:
+            print(f"Batch recommendation pool unavailable, scoring inline: {e}")
+            return False
+        self._pool = pool
+        self._pool_pid = os.getpid()
+        return True
+
+    def run(self, profiles: List[Dict], schema: str = 'full') -> Iterator[Dict]:
+        """Yield one result per profile as it finishes, then {'summary': ...}"""
+        start = time.perf_counter()
+        engine = self.engine_factory()
+        # Build the catalog snapshot and course features once for the whole batch
+        report = engine.warm_up()
+        results = []
+
+        # A pool inherited across fork() belongs to the parent and is never used
+        pool = self._pool if self._pool_pid == os.getpid() else None
+        pending = set(range(len(profiles)))
+        if pool is not None:
+            futures = []
+            try:
+                futures = [pool.submit(recommend_profile, index, profile, schema)
+                           for index, profile in enumerate(profiles)]
+                for future in as_completed(futures):
+                    result = future.result()
+                    pending.discard(result['index'])
+                    results.append(result)
+                    yield result
+            except BrokenProcessPool as e:
+                # A pool process died; finish this and later batches here rather than fork again
+                print(f"Batch recommendation pool failed, scoring inline: {e}")
+                self._pool = None
+                pool.shutdown(wait=False)
+                pool = None
+            finally:
+                # The client may disconnect mid-stream; don't leave its profiles queued
+                for future in futures:
+                    future.cancel()
+        for index in sorted(pending):
+            result = recommend_profile(index, profiles[index], schema, engine)
+            results.append(result)
+            yield result
+
+        yield {'summary': timing_summary(results, time.perf_counter() - start,
+                                         0 if pool is None else self.workers, report['catalog_version'])}
+
+    def shutdown(self) -> None:
+        """Stop this process's pool"""
+        if self._pool is not None and self._pool_pid == os.getpid():
+            self._pool.shutdown(wait=True, cancel_futures=True)
+        self._pool = None
+        self._pool_pid = None
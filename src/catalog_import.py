@@ -0,0 +1,175 @@
+"""
+Streaming CSV catalog import for DataManager.
+
+Course CSVs are read with csv.DictReader in fixed-size chunks, so only one
+chunk per file is held in memory. Each row is validated and normalized into
+the column order of the courses table: course ids are upper-cased without
+spaces, credits become integers, difficulty labels (Low/Medium/High) become
+the same numbers the recommendation engine scores them as, and comma lists
+are split, trimmed and de-duplicated. Invalid rows are returned as rejects
+with their file and line number instead of aborting the import.
+"""
+
+import csv
+import glob
+import os
+import queue
+import re
+import threading
+import time
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Difficulty labels as numbers; same mapping as RecommendationEngine.calculate_difficulty_score
+DIFFICULTY_MAP = {
+    'low': 2.0,
+    'easy': 2.0,
+    'medium': 3.5,
+    'high': 4.5,
+    'hard': 4.5,
+    'any': 3.5
+}
+
+# Columns written by the importer, in the order of the upsert parameters
+IMPORT_COLUMNS = (
+    'id', 'title', 'description', 'credits', 'prerequisites', 'department', 'level',
+    'difficulty_rating', 'career_relevance', 'topics', 'semester_offered', 'professor'
+)
+REQUIRED_COLUMNS = ('id', 'title', 'department')
+LIST_COLUMNS = ('prerequisites', 'career_relevance', 'topics', 'semester_offered')
+
+# Rows read, validated and handed to the writer at a time
+CHUNK_SIZE = 500
+# Chunks a department reader may run ahead of the writer
+READ_AHEAD_CHUNKS = 4
+DEPARTMENT_CSV_PATTERN = '*_electives.csv'
+
+# Kinds of item a reader puts on its queue: (READ_CHUNK, (rows, rejects)),
+# then (READ_DONE, seconds spent reading) or (READ_FAILED, exception)
+READ_CHUNK = 'chunk'
+READ_DONE = 'done'
+READ_FAILED = 'failed'
+
+# Placeholders read as blank, as pandas.read_csv did for the original importer
+NULL_VALUES = frozenset({'none', 'null', 'n/a', 'na', 'nan'})
+
+COURSE_ID_PATTERN = re.compile(r'^[A-Z]{2,5}[A-Z0-9]{1,6}$')
+NUMBER_PATTERN = re.compile(r'\d+(?:\.\d+)?')
+
+
+def normalize_list(value: str) -> str:
+    """Split a comma list, trim the items and drop empty and repeated ones"""
+    items, seen = [], set()
+    for item in value.split(','):
+        item = ' '.join(item.split())
+        if item and item.lower() not in seen:
+            seen.add(item.lower())
+            items.append(item)
+    return ', '.join(items)
+
+
+def normalize_course_row(row: Dict) -> Tuple[Optional[tuple], Optional[str]]:
+    """Validate one CSV row; returns (values in IMPORT_COLUMNS order, None) or (None, error)"""
+    if None in row:
+        return None, "too many fields"
+    values = {}
+    for column in IMPORT_COLUMNS:
+        value = ' '.join((row.get(column) or '').split())
+        values[column] = '' if value.lower() in NULL_VALUES else value
+
+    values['id'] = values['id'].replace(' ', '').upper()
+    for column in REQUIRED_COLUMNS:
+        if not values[column]:
+            return None, f"missing {column}"
+    if not COURSE_ID_PATTERN.match(values['id']):
+        return None, f"invalid course id {values['id']!r}"
+
+    credits = values['credits']
+    if credits:
+        match = NUMBER_PATTERN.search(credits)
+        if match is None:
+            return None, f"invalid credits {credits!r}"
+        values['credits'] = int(float(match.group()))
+    else:
+        values['credits'] = None
+
+    difficulty = values['difficulty_rating']
+    if not difficulty:
+        values['difficulty_rating'] = DIFFICULTY_MAP['medium']
+    elif difficulty.lower() in DIFFICULTY_MAP:
+        values['difficulty_rating'] = DIFFICULTY_MAP[difficulty.lower()]
+    else:
+        try:
+            values['difficulty_rating'] = float(difficulty)
+        except ValueError:
+            return None, f"invalid difficulty {difficulty!r}"
+        if not 1.0 <= values['difficulty_rating'] <= 5.0:
+            return None, f"difficulty {difficulty} outside 1-5"
+
+    for column in LIST_COLUMNS:
+        values[column] = normalize_list(values[column])
+    values['level'] = values['level'].title()
+
+    # Blank optional fields are stored as NULL, like the rest of the catalog
+    return tuple(values[column] if values[column] != '' else None for column in IMPORT_COLUMNS), None
+
+
+def read_course_chunks(csv_path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[List[tuple], List[Dict]]]:
+    """Yield (valid rows, rejects) for each chunk of a course CSV"""
+    with open(csv_path, newline='', encoding='utf-8-sig') as handle:
+        reader = csv.DictReader(handle)
+        if reader.fieldnames is None:
+            # Empty file
+            return
+        missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or ())]
+        if missing:
+            raise ValueError(f"{csv_path} is missing required columns: {', '.join(missing)}")
+
+        while True:
+            # The reader's line_num is read after each row so multi-line quoted fields are reported correctly
+            numbered = [(row, reader.line_num) for row in islice(reader, chunk_size)]
+            if not numbered:
+                return
+            rows, rejects = [], []
+            for row, line in numbered:
+                values, error = normalize_course_row(row)
+                if error:
+                    rejects.append({'file': csv_path, 'line': line, 'id': (row.get('id') or '').strip(),
+                                    'error': error})
+                else:
+                    rows.append(values)
+            yield rows, rejects
+
+
+def department_csv_paths(directory: str) -> List[str]:
+    """Department elective CSVs in a directory, in a stable order"""
+    return sorted(glob.glob(os.path.join(directory, DEPARTMENT_CSV_PATTERN)))
+
+
+def read_ahead(csv_path: str, chunks: queue.Queue, stop: threading.Event, chunk_size: int = CHUNK_SIZE) -> None:
+    """Read a CSV into a bounded queue for the writer; ends with a READ_DONE or READ_FAILED item"""
+    elapsed = 0.0
+    try:
+        reader = read_course_chunks(csv_path, chunk_size)
+        while True:
+            start = time.perf_counter()
+            chunk = next(reader, None)
+            elapsed += time.perf_counter() - start
+            if chunk is None:
+                break
+            if not _put(chunks, (READ_CHUNK, chunk), stop):
+                return
+        _put(chunks, (READ_DONE, elapsed), stop)
+    except Exception as e:
+        _put(chunks, (READ_FAILED, e), stop)
+
+
+def _put(chunks: queue.Queue, item: tuple, stop: threading.Event) -> bool:
+    """Block until the writer takes the item; gives up once the writer has stopped"""
+    while not stop.is_set():
+        try:
+            chunks.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
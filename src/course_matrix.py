@@ -0,0 +1,252 @@
+"""
+Columnar view of the course catalog for vectorized scoring.
+
+Each per-course scorer in RecommendationEngine (difficulty, popularity, level
+appropriateness, course-level bonus, prerequisites) has an array counterpart
+here that scores the whole catalog in one NumPy operation. The arrays follow
+the order of the catalog snapshot they were built from, and every method
+reproduces the per-course scorer value for value.
+"""
+
+import re
+from typing import Dict, List
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from src.catalog_import import DIFFICULTY_MAP
+
+# Course level codes derived from the free-text 'level' column
+LEVEL_FRESHMAN, LEVEL_SOPHOMORE, LEVEL_JUNIOR, LEVEL_SENIOR, LEVEL_UNKNOWN = range(5)
+
+# Student level rows x course level columns, mirroring calculate_level_appropriateness
+LEVEL_APPROPRIATENESS = {
+    'freshman': (1.0, 0.7, 0.3, 0.1, 0.8),
+    'sophomore': (0.8, 1.0, 0.6, 0.2, 0.8),
+    'junior': (0.6, 0.8, 1.0, 0.5, 0.8),
+    'senior': (0.4, 0.6, 0.9, 1.0, 0.8),
+    'graduate': (0.7, 0.7, 0.8, 1.0, 0.8),
+}
+LEVEL_APPROPRIATENESS_DEFAULT = (0.7, 0.7, 0.8, 0.6, 0.8)
+
+# Preferred course number ranges, mirroring calculate_course_level_bonus
+LEVEL_PREFERENCES = {
+    'freshman': [100, 200],
+    'sophomore': [200, 300],
+    'junior': [300, 400],
+    'senior': [400, 500],
+    'graduate': [500, 600, 700]
+}
+
+# Departments that get the stronger penalty for 100-level courses
+STRICT_LEVEL_DEPARTMENTS = frozenset([
+    'mathematics', 'math', 'architecture', 'arch', 'engineering', 'mechanical engineering',
+    'civil engineering', 'biomedical engineering', 'electrical engineering',
+    'industrial engineering', 'environmental engineering'
+])
+
+# Academic level priority multipliers used by get_recommendations, indexed by the
+# course's own level (freshman, sophomore, junior, senior, graduate)
+ACADEMIC_LEVEL_PRIORITY = {
+    'freshman': (1.0, 0.8, 0.5, 0.2, 0.1),
+    'sophomore': (0.3, 1.0, 0.9, 0.6, 0.2),
+    'junior': (0.1, 0.4, 1.0, 0.9, 0.7),
+    'senior': (0.05, 0.2, 0.5, 1.0, 0.9),
+}
+ACADEMIC_LEVEL_PRIORITY_DEFAULT = (0.1, 0.3, 0.6, 0.8, 1.0)
+
+STANDING_PREREQUISITES = (
+    (('senior standing', 'senior', 'capstone'), 0.2),
+    (('junior standing', 'junior'), 0.5),
+    (('majors only', 'restriction', 'approval'), 0.8),
+)
+
+
+def level_code(level: str) -> int:
+    """Map a course 'level' string to one of the LEVEL_* codes"""
+    level = level.lower()
+    if 'freshman' in level or 'intro' in level:
+        return LEVEL_FRESHMAN
+    elif 'sophomore' in level:
+        return LEVEL_SOPHOMORE
+    elif 'junior' in level:
+        return LEVEL_JUNIOR
+    elif 'senior' in level or 'graduate' in level:
+        return LEVEL_SENIOR
+    return LEVEL_UNKNOWN
+
+
+def estimate_student_level(completed_courses: List[str], academic_level: str = '') -> str:
+    """Student level as used by calculate_level_appropriateness"""
+    if academic_level:
+        return academic_level.lower()
+    num_completed = len(completed_courses)
+    if num_completed == 0:
+        return 'freshman'
+    elif num_completed < 5:
+        return 'sophomore'
+    elif num_completed < 10:
+        return 'junior'
+    return 'senior'
+
+
+class CourseMatrix:
+    """NumPy columns for the numeric and categorical course fields used in scoring"""
+
+    def __init__(self, courses: List[Dict]):
+        self.size = len(courses)
+        self.ids = [course['id'] for course in courses]
+
+        difficulty = []
+        for course in courses:
+            raw = course.get('difficulty_rating', 3.0)
+            difficulty.append(DIFFICULTY_MAP.get(raw.lower(), 3.5) if isinstance(raw, str) else float(raw))
+        self.difficulty = np.array(difficulty, dtype=np.float64)
+
+        self.avg_rating = np.array([course.get('avg_rating', 0) for course in courses], dtype=np.float64)
+        self.total_ratings = np.array([course.get('total_ratings', 0) for course in courses], dtype=np.float64)
+        self.estimated_rating = np.array([course.get('rating', 3.0) for course in courses], dtype=np.float64)
+
+        self.level_code = np.array([level_code(course.get('level', '')) for course in courses], dtype=np.intp)
+
+        departments = [course.get('department', '') for course in courses]
+        self.department_names = sorted(set(departments))
+        department_index = {name: code for code, name in enumerate(self.department_names)}
+        self.department_code = np.array([department_index[name] for name in departments], dtype=np.intp)
+        self.strict_level_department = np.array(
+            [name.lower() in STRICT_LEVEL_DEPARTMENTS for name in departments], dtype=bool
+        )
+
+        # Course number as parsed by calculate_course_level_bonus (CS375 -> 375)
+        course_numbers, course_number_valid = [], []
+        for course in courses:
+            course_id = course.get('id', '')
+            try:
+                course_numbers.append(int(course_id[2:5]))
+                course_number_valid.append(len(course_id) >= 5)
+            except (ValueError, IndexError):
+                course_numbers.append(-1)
+                course_number_valid.append(False)
+        self.course_number = np.array(course_numbers, dtype=np.int64)
+        self.course_number_valid = np.array(course_number_valid, dtype=bool)
+
+        # First three-digit group of the id, used for the academic level priority (default 300)
+        priority_numbers = []
+        for course in courses:
+            match = re.search(r'(\d{3})', course.get('id', '').upper())
+            priority_numbers.append(int(match.group(1)) if match else 300)
+        self.course_academic_level = np.searchsorted(
+            np.array([200, 300, 400, 500]), np.array(priority_numbers, dtype=np.int64), side='right'
+        )
+
+        self._build_prerequisites(courses)
+
+    def _build_prerequisites(self, courses: List[Dict]) -> None:
+        """Pre-parse prerequisite strings into a base score and a course x code count matrix"""
+        base = np.full(self.size, np.nan)
+        code_index = {}
+        rows, columns, counts = [], [], []
+        code_counts = np.zeros(self.size, dtype=np.float64)
+
+        for row, course in enumerate(courses):
+            prerequisites = course.get('prerequisites', '')
+            if not prerequisites or prerequisites.lower() in ['none', 'n/a']:
+                base[row] = 1.0
+                continue
+
+            prereq_codes = re.findall(r'[A-Z]{2,4}\d{3}', prerequisites.upper())
+            if not prereq_codes:
+                prereq_lower = prerequisites.lower()
+                base[row] = 1.0
+                for keywords, value in STANDING_PREREQUISITES:
+                    if any(keyword in prereq_lower for keyword in keywords):
+                        base[row] = value
+                        break
+                continue
+
+            code_counts[row] = len(prereq_codes)
+            for code in prereq_codes:
+                rows.append(row)
+                columns.append(code_index.setdefault(code, len(code_index)))
+                counts.append(1.0)
+
+        self.prerequisite_base = base
+        self.prerequisite_code_counts = code_counts
+        self.prerequisite_code_index = code_index
+        # Duplicate (row, column) entries are summed, matching the per-course duplicate counting
+        self.prerequisite_matrix = csr_matrix(
+            (counts, (rows, columns)), shape=(self.size, max(len(code_index), 1)), dtype=np.float64
+        )
+
+    def difficulty_scores(self, difficulty_preference: str) -> np.ndarray:
+        """Vectorized calculate_difficulty_score"""
+        preferred_difficulty = DIFFICULTY_MAP.get(difficulty_preference.lower(), 3.5)
+        diff = np.abs(self.difficulty - preferred_difficulty)
+        return np.maximum(0, 1 - (diff / 2.0))
+
+    def popularity_scores(self) -> np.ndarray:
+        """Vectorized calculate_popularity_score"""
+        rating_score = np.where(
+            self.avg_rating > 0, (self.avg_rating - 1) / 4, (self.estimated_rating - 1) / 4
+        )
+        confidence_score = np.minimum(self.total_ratings / 10, 1.0)
+        return np.where(
+            self.total_ratings > 0, 0.8 * rating_score + 0.2 * confidence_score, 0.5 * rating_score
+        )
+
+    def level_appropriateness_scores(self, completed_courses: List[str], academic_level: str = '') -> np.ndarray:
+        """Vectorized calculate_level_appropriateness"""
+        student_level = estimate_student_level(completed_courses, academic_level)
+        table = np.array(LEVEL_APPROPRIATENESS.get(student_level, LEVEL_APPROPRIATENESS_DEFAULT))
+        return table[self.level_code]
+
+    def course_level_bonuses(self, academic_level: str) -> np.ndarray:
+        """Vectorized calculate_course_level_bonus"""
+        bonuses = np.zeros(self.size)
+        if not academic_level:
+            return bonuses
+
+        student_level = academic_level.lower()
+        numbers = self.course_number
+        matched = ~self.course_number_valid
+
+        advanced_student = student_level in ['sophomore', 'junior', 'senior']
+        for level in LEVEL_PREFERENCES.get(student_level, []):
+            in_range = ~matched & (level <= numbers) & (numbers < level + 100)
+            if advanced_student:
+                bonuses[in_range] = np.where(numbers[in_range] >= 300, 0.15, 0.10)
+            else:
+                bonuses[in_range] = 0.10
+            matched |= in_range
+
+        too_basic = ~matched & (numbers < 200)
+        if student_level == 'sophomore':
+            bonuses[too_basic] = np.where(self.strict_level_department[too_basic], -0.50, -0.30)
+        elif student_level in ['junior', 'senior']:
+            bonuses[too_basic] = np.where(self.strict_level_department[too_basic], -0.60, -0.40)
+
+        return bonuses
+
+    def satisfied_prerequisites(self, completed_courses: List[str]) -> np.ndarray:
+        """Number of each course's prerequisite codes found in completed_courses"""
+        completed = np.zeros(self.prerequisite_matrix.shape[1])
+        for code in set(code.upper() for code in completed_courses):
+            column = self.prerequisite_code_index.get(code)
+            if column is not None:
+                completed[column] = 1.0
+        return self.prerequisite_matrix @ completed
+
+    def prerequisite_scores(self, completed_courses: List[str]) -> np.ndarray:
+        """Vectorized calculate_prerequisite_score"""
+        satisfied = self.satisfied_prerequisites(completed_courses)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            partial = np.where(
+                satisfied == 0, 0.6, 0.6 + 0.4 * (satisfied / self.prerequisite_code_counts)
+            )
+        return np.where(np.isnan(self.prerequisite_base), partial, self.prerequisite_base)
+
+    def academic_level_priorities(self, academic_level: str) -> np.ndarray:
+        """Academic level priority multiplier applied in get_recommendations"""
+        table = np.array(ACADEMIC_LEVEL_PRIORITY.get(academic_level.lower(), ACADEMIC_LEVEL_PRIORITY_DEFAULT))
+        return table[self.course_academic_level]
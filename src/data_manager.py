@@ -1,23 +1,114 @@
 import sqlite3
-import pandas as pd
 import json
+import re
 import os
-from typing import List, Dict, Optional
-import requests
-from bs4 import BeautifulSoup
+import queue
+import atexit
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Callable, List, Dict, Optional, Tuple
+from src.result_cache import ResultCache
+from src.catalog_import import (CHUNK_SIZE, IMPORT_COLUMNS, READ_AHEAD_CHUNKS, READ_DONE, READ_FAILED,
+                                department_csv_paths, read_ahead)
+
+
+class CatalogSnapshot:
+    """Immutable in-memory view of the courses table at one catalog version"""
+    
+    __slots__ = ('version', 'courses', 'by_id', 'by_department')
+    
+    def __init__(self, version: int, rows: List[Dict]):
+        self.version = version
+        self.courses = tuple(MappingProxyType(row) for row in rows)
+        self.by_id = MappingProxyType({course['id']: course for course in self.courses})
+        
+        by_department = {}
+        for course in self.courses:
+            by_department.setdefault(course.get('department'), []).append(course)
+        self.by_department = MappingProxyType(
+            {department: tuple(courses) for department, courses in by_department.items()}
+        )
+    
+    def __len__(self):
+        return len(self.courses)
+
 
 class DataManager:
+    # Per-connection tuning applied when a connection is opened
+    CONNECTION_PRAGMAS = (
+        "PRAGMA synchronous = NORMAL",   # Safe with WAL, avoids an fsync per commit
+        "PRAGMA cache_size = -16000",    # 16 MB page cache
+        "PRAGMA mmap_size = 134217728",  # Memory-map up to 128 MB of the database file
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA busy_timeout = 30000"
+    )
+    
+    # Request-path queries checked with EXPLAIN QUERY PLAN after migrations (see check_query_plans)
+    HOT_QUERIES = {
+        'saved count for a course': ("SELECT COUNT(*) FROM saved_courses WHERE course_id = ?", ('',)),
+        'saved counts per course': ("SELECT course_id, COUNT(*) FROM saved_courses GROUP BY course_id", ()),
+        'saved courses for a user': ('''
+            SELECT c.*, sc.saved_at, sc.notes FROM saved_courses sc JOIN courses c ON sc.course_id = c.id
+            WHERE sc.user_id = ? ORDER BY sc.saved_at DESC
+        ''', (0,)),
+        'ratings for a course': ('''
+            SELECT student_email, rating, review, completed_semester, would_recommend, timestamp
+            FROM student_ratings WHERE course_id = ? ORDER BY timestamp DESC
+        ''', ('',)),
+        'rating totals per course': ("SELECT course_id, SUM(rating), COUNT(*) FROM student_ratings GROUP BY course_id", ()),
+        'courses per department': ("SELECT department, COUNT(*) FROM courses GROUP BY department", ()),
+        'user by email': ("SELECT * FROM users WHERE email = ? AND is_active = 1", ('',)),
+        'precomputed recommendations': ('''
+            SELECT recommendations FROM precomputed_recommendations
+            WHERE catalog_version = ? AND department = ? AND academic_level = ?
+        ''', (0, '', '')),
+        'course page after a cursor': ("SELECT id, title, department FROM courses WHERE id > ? ORDER BY id LIMIT ?",
+                                       ('', 101)),
+    }
+    
+    # Per-worker cache of user rows looked up by id (/api/user on every page load)
+    USER_CACHE_SIZE = 1024
+    USER_CACHE_TTL = 30.0
+    # last_login writes are buffered and flushed together at most this often
+    LAST_LOGIN_FLUSH_SECONDS = 5.0
+    LAST_LOGIN_FLUSH_BATCH = 100
+    
+    # Columns of the compact course list used by the advisor page
+    COURSE_SUMMARY_FIELDS = ('id', 'title', 'department')
+    
+    # bm25() column weights for courses_fts: id, title, description, topics, career_relevance
+    SEARCH_WEIGHTS = "10.0, 5.0, 1.0, 2.0, 1.0"
+    
     def __init__(self, db_path="data/courses.db"):
         self.db_path = db_path
+        self._catalog_snapshot = None
+        
+        # One persistent connection per thread, tagged with the pid that opened it. SQLite
+        # connections must not be used across fork() (gunicorn preload_app, process pools),
+        # so a process only ever uses connections it opened itself
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        # Set by init_search_index(); search_courses falls back to LIKE without FTS5
+        self.fts_enabled = False
+        
+        # User profiles don't depend on the catalog, so the cache is used with a fixed version
+        self.user_cache = ResultCache(maxsize=self.USER_CACHE_SIZE, ttl=self.USER_CACHE_TTL)
+        # user_id -> last_login timestamp not yet written, flushed by flush_last_logins()
+        self._pending_logins = {}
+        self._pending_logins_lock = threading.Lock()
+        self._last_login_timer = None
+        atexit.register(self.flush_last_logins)
+        
         self.ensure_data_directory()
         self.init_database()
         
         # Check if departments table is empty and populate if needed
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.get_connection().cursor()
         cursor.execute("SELECT COUNT(*) FROM departments")
         dept_count = cursor.fetchone()[0]
-        conn.close()
         
         if dept_count == 0:
             self.load_departments()
@@ -26,9 +117,49 @@ class DataManager:
         """Create data directory if it doesn't exist"""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
     
+    def open_connection(self) -> sqlite3.Connection:
+        """Open a new tuned connection to the database"""
+        conn = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False, cached_statements=256)
+        try:
+            # WAL lets readers in every worker proceed while a rating or save is being written
+            conn.execute("PRAGMA journal_mode = WAL")
+        except sqlite3.OperationalError as e:
+            # Read-only or network filesystems can't host the WAL index; keep the rollback journal
+            print(f"WAL mode unavailable for {self.db_path}: {e}")
+        for pragma in self.CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    def get_connection(self) -> sqlite3.Connection:
+        """Get this thread's persistent connection, opening a fresh one after a fork"""
+        pid = os.getpid()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != pid:
+            # A connection inherited from the parent stays referenced in _connections and is
+            # never closed here: closing it in the child could disturb the parent's locks
+            conn = self.open_connection()
+            self._local.conn = conn
+            self._local.pid = pid
+            with self._connections_lock:
+                self._connections.append((pid, conn))
+        return conn
+    
+    def close_connections(self) -> None:
+        """Close the connections this process opened; threads reopen them on demand"""
+        pid = os.getpid()
+        with self._connections_lock:
+            owned = [conn for owner, conn in self._connections if owner == pid]
+            self._connections = [(owner, conn) for owner, conn in self._connections if owner != pid]
+            self._local = threading.local()
+        for conn in owned:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+    
     def init_database(self):
         """Initialize the SQLite database with required tables"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
         
         # Create courses table
@@ -49,7 +180,8 @@ class DataManager:
                 rating REAL,
                 enrollment_count INTEGER,
                 avg_rating REAL DEFAULT 0.0,
-                total_ratings INTEGER DEFAULT 0
+                total_ratings INTEGER DEFAULT 0,
+                rating_sum INTEGER DEFAULT 0
             )
         ''')
         
@@ -139,8 +271,238 @@ class DataManager:
             )
         ''')
         
+        # Catalog version counters, bumped by triggers on every write to courses and
+        # departments so that each worker can tell when its in-memory copies are stale
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS catalog_meta (
+                name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        for table in ('courses', 'departments'):
+            cursor.execute("INSERT OR IGNORE INTO catalog_meta (name, version) VALUES (?, 0)", (table,))
+            for event in ('INSERT', 'UPDATE', 'DELETE'):
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS {table}_version_after_{event.lower()}
+                    AFTER {event} ON {table}
+                    BEGIN
+                        UPDATE catalog_meta SET version = version + 1 WHERE name = '{table}';
+                    END
+                ''')
+        
+        self.init_search_index(cursor)
+        self.init_rating_aggregates(cursor)
+        
+        # Precomputed similar-course lists, persisted by RecommendationEngine so a fresh
+        # process can serve /api/course/<id>/similar without refitting
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS course_similarities (
+                course_id TEXT NOT NULL,
+                rank INTEGER NOT NULL,
+                similar_id TEXT NOT NULL,
+                score REAL NOT NULL,
+                PRIMARY KEY (course_id, rank)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS course_similarity_meta (
+                name TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                top_n INTEGER NOT NULL,
+                built_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
         conn.commit()
-        conn.close()
+        
+        self.migrate()
+    
+    def schema_migrations(self) -> List[tuple]:
+        """(description, steps) per schema version; steps are SQL strings or callables taking a cursor"""
+        # Append new versions at the end; never edit or reorder one that has shipped.
+        # Steps must be idempotent: tables created above may already match the new schema
+        return [
+            ("running rating totals on courses", [self._add_rating_sum_column]),
+            ("indexes for hot queries", [
+                # get_course_saved_count(s): covering index for the count and GROUP BY
+                "CREATE INDEX IF NOT EXISTS idx_saved_courses_course ON saved_courses (course_id)",
+                # get_saved_courses: a user's saved list, newest first
+                "CREATE INDEX IF NOT EXISTS idx_saved_courses_user_saved_at ON saved_courses (user_id, saved_at)",
+                # get_course_ratings in timestamp order; covers the rating totals rebuild
+                '''CREATE INDEX IF NOT EXISTS idx_student_ratings_course_timestamp
+                   ON student_ratings (course_id, timestamp, rating)''',
+                # get_course_statistics and department search filters
+                "CREATE INDEX IF NOT EXISTS idx_courses_department ON courses (department)",
+            ]),
+            ("precomputed default recommendations", [
+                # One row per major department and academic level, filled by precompute_recommendations.py
+                # and on a student's first advisor visit
+                '''CREATE TABLE IF NOT EXISTS precomputed_recommendations (
+                    catalog_version INTEGER NOT NULL,
+                    department TEXT NOT NULL,
+                    academic_level TEXT NOT NULL,
+                    recommendations TEXT NOT NULL,
+                    computed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (catalog_version, department, academic_level)
+                )''',
+                # Course edits and new ratings bump the catalog version; results scored
+                # against an older catalog are dropped as soon as that happens
+                '''CREATE TRIGGER IF NOT EXISTS precomputed_recommendations_invalidate
+                   AFTER UPDATE OF version ON catalog_meta WHEN NEW.name = 'courses'
+                   BEGIN
+                       DELETE FROM precomputed_recommendations WHERE catalog_version < NEW.version;
+                   END''',
+            ]),
+        ]
+    
+    def migrate(self) -> List[int]:
+        """Apply pending schema migrations, tracked with PRAGMA user_version; returns the versions applied"""
+        conn = self.get_connection()
+        migrations = self.schema_migrations()
+        applied = []
+        for version, (description, steps) in enumerate(migrations, 1):
+            if conn.execute('PRAGMA user_version').fetchone()[0] >= version:
+                continue
+            with conn:
+                # IMMEDIATE takes the write lock up front, so two processes starting together
+                # can't both apply the same version
+                conn.execute('BEGIN IMMEDIATE')
+                current = conn.execute('PRAGMA user_version').fetchone()[0]
+                if current >= version:
+                    continue
+                cursor = conn.cursor()
+                for step in steps:
+                    if callable(step):
+                        step(cursor)
+                    else:
+                        cursor.execute(step)
+                cursor.execute(f'PRAGMA user_version = {version}')
+            applied.append(version)
+            print(f"Applied schema migration {version}: {description}")
+        
+        current = conn.execute('PRAGMA user_version').fetchone()[0]
+        if current > len(migrations):
+            print(f"Database schema version {current} is newer than this code ({len(migrations)})")
+        if applied:
+            self.check_query_plans()
+        return applied
+    
+    def _add_rating_sum_column(self, cursor) -> None:
+        """Add courses.rating_sum to databases created before it existed and rebuild the totals"""
+        cursor.execute("PRAGMA table_info(courses)")
+        if 'rating_sum' not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute("ALTER TABLE courses ADD COLUMN rating_sum INTEGER DEFAULT 0")
+        drifted, _ = self._recompute_rating_aggregates(cursor)
+        if drifted:
+            print(f"Repaired rating totals for {len(drifted)} courses")
+    
+    def check_query_plans(self, verbose: bool = True) -> Dict[str, Dict]:
+        """EXPLAIN QUERY PLAN for each hot query; flags full table scans and temporary sort trees"""
+        cursor = self.get_connection().cursor()
+        results = {}
+        for name, (sql, params) in self.HOT_QUERIES.items():
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = [row[3] for row in cursor.fetchall()]
+            ok = not any(
+                (detail.startswith('SCAN ') and ' USING ' not in detail) or 'TEMP B-TREE' in detail
+                for detail in plan
+            )
+            results[name] = {'plan': plan, 'ok': ok}
+            if verbose:
+                print(f"{'✅' if ok else '⚠️ '} {name}: {'; '.join(plan)}")
+        return results
+    
+    def init_rating_aggregates(self, cursor) -> None:
+        """Keep courses.rating_sum/total_ratings/avg_rating in step with student_ratings"""
+        # Each write adjusts the totals by the one rating it adds or removes, instead of
+        # re-aggregating every rating of the course
+        add_rating = '''
+            UPDATE courses SET rating_sum = rating_sum + NEW.rating, total_ratings = total_ratings + 1,
+                avg_rating = ROUND(CAST(rating_sum + NEW.rating AS REAL) / (total_ratings + 1), 2)
+            WHERE id = NEW.course_id;
+        '''
+        remove_rating = '''
+            UPDATE courses SET rating_sum = rating_sum - OLD.rating, total_ratings = total_ratings - 1,
+                avg_rating = CASE WHEN total_ratings > 1
+                    THEN ROUND(CAST(rating_sum - OLD.rating AS REAL) / (total_ratings - 1), 2) ELSE 0.0 END
+            WHERE id = OLD.course_id;
+        '''
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS student_ratings_after_insert AFTER INSERT ON student_ratings
+            BEGIN {add_rating} END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS student_ratings_after_delete AFTER DELETE ON student_ratings
+            BEGIN {remove_rating} END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS student_ratings_after_update AFTER UPDATE OF rating, course_id ON student_ratings
+            WHEN OLD.rating IS NOT NEW.rating OR OLD.course_id IS NOT NEW.course_id
+            BEGIN {remove_rating} {add_rating} END
+        ''')
+    
+    def init_search_index(self, cursor) -> None:
+        """Create the FTS5 index mirroring the searchable course columns, kept in sync by triggers"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'courses_fts'")
+        exists = cursor.fetchone() is not None
+        try:
+            # External content table: the text lives in courses, the index only stores postings
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS courses_fts USING fts5(
+                    id, title, description, topics, career_relevance,
+                    content='courses', content_rowid='rowid', tokenize='porter unicode61'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            print(f"FTS5 unavailable, course search uses LIKE: {e}")
+            self.fts_enabled = False
+            return
+        
+        columns = "id, title, description, topics, career_relevance"
+        new_values = ", ".join(f"new.{column}" for column in columns.split(", "))
+        old_values = ", ".join(f"old.{column}" for column in columns.split(", "))
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS courses_fts_after_insert AFTER INSERT ON courses
+            BEGIN
+                INSERT INTO courses_fts (rowid, {columns}) VALUES (new.rowid, {new_values});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS courses_fts_after_delete AFTER DELETE ON courses
+            BEGIN
+                INSERT INTO courses_fts (courses_fts, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});
+            END
+        ''')
+        # Rating updates touch other columns and leave the index alone
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS courses_fts_after_update AFTER UPDATE OF {columns} ON courses
+            BEGIN
+                INSERT INTO courses_fts (courses_fts, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});
+                INSERT INTO courses_fts (rowid, {columns}) VALUES (new.rowid, {new_values});
+            END
+        ''')
+        if not exists:
+            # Index the courses that were loaded before the search index existed
+            cursor.execute("INSERT INTO courses_fts (courses_fts) VALUES ('rebuild')")
+        self.fts_enabled = True
+    
+    def check_search_index(self, repair: bool = False) -> bool:
+        """Run the FTS5 integrity check; with repair, rebuild the index when it is out of sync"""
+        if not self.fts_enabled:
+            return True
+        try:
+            # rank = 1 also compares the index against the rows in courses
+            with self.get_connection() as conn:
+                conn.execute("INSERT INTO courses_fts (courses_fts, rank) VALUES ('integrity-check', 1)")
+            return True
+        except sqlite3.DatabaseError as e:
+            print(f"Search index is out of sync with courses: {e}")
+            if not repair:
+                return False
+        with self.get_connection() as conn:
+            conn.execute("INSERT INTO courses_fts (courses_fts) VALUES ('rebuild')")
+        print("Rebuilt the search index")
+        return True
     
     def load_sample_data(self):
         """Load sample NJIT course data"""
@@ -237,24 +599,31 @@ class DataManager:
             }
         ]
         
-        conn = sqlite3.connect(self.db_path)
-        for course in sample_courses:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT OR REPLACE INTO courses 
-                (id, title, description, credits, prerequisites, department, 
-                 level, difficulty_rating, career_relevance, topics, 
-                 semester_offered, professor, avg_rating, total_ratings)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                course["id"], course["title"], course["description"], 
-                course["credits"], course["prerequisites"], course["department"],
-                course["level"], course["difficulty_rating"], course["career_relevance"],
-                course["topics"], course["semester_offered"], course["professor"],
-                course.get("rating", 0), 0
-            ))
-        conn.commit()
-        conn.close()
+        with self.get_connection() as conn:
+            for course in sample_courses:
+                # An upsert, not INSERT OR REPLACE: REPLACE deletes the old row without firing
+                # the delete triggers, which leaves stale entries in courses_fts. Existing
+                # courses keep their rating totals, as with the CSV importer
+                conn.execute('''
+                    INSERT INTO courses 
+                    (id, title, description, credits, prerequisites, department, 
+                     level, difficulty_rating, career_relevance, topics, 
+                     semester_offered, professor, avg_rating, total_ratings)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET
+                        title = excluded.title, description = excluded.description,
+                        credits = excluded.credits, prerequisites = excluded.prerequisites,
+                        department = excluded.department, level = excluded.level,
+                        difficulty_rating = excluded.difficulty_rating,
+                        career_relevance = excluded.career_relevance, topics = excluded.topics,
+                        semester_offered = excluded.semester_offered, professor = excluded.professor
+                ''', (
+                    course["id"], course["title"], course["description"], 
+                    course["credits"], course["prerequisites"], course["department"],
+                    course["level"], course["difficulty_rating"], course["career_relevance"],
+                    course["topics"], course["semester_offered"], course["professor"],
+                    course.get("rating", 0), 0
+                ))
         
         print(f"Loaded {len(sample_courses)} sample courses into database")
     
@@ -284,17 +653,11 @@ class DataManager:
             {"id": "SLA", "name": "Science, Liberal Arts", "full_name": "Science, Liberal Arts Department"}
         ]
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        for dept in departments:
-            cursor.execute('''
+        with self.get_connection() as conn:
+            conn.executemany('''
                 INSERT OR REPLACE INTO departments (id, name, full_name)
                 VALUES (?, ?, ?)
-            ''', (dept["id"], dept["name"], dept["full_name"]))
-        
-        conn.commit()
-        conn.close()
+            ''', [(dept["id"], dept["name"], dept["full_name"]) for dept in departments])
         
         print(f"Loaded {len(departments)} departments into database")
     
@@ -307,73 +670,314 @@ class DataManager:
         # TODO: Implement based on actual NJIT course catalog structure
         pass
     
-    def import_courses_from_csv(self, csv_path: str):
-        """Import courses from a CSV file"""
+    def import_courses_from_csv(self, csv_path: str, chunk_size: Optional[int] = None) -> Dict:
+        """Stream one course CSV into the database, upserting by course id"""
+        return self.import_course_csvs([csv_path], workers=1, chunk_size=chunk_size)
+    
+    def import_department_csvs(self, directory: str = "data/departments", workers: int = 2,
+                               chunk_size: Optional[int] = None) -> Dict:
+        """Import every *_electives.csv in a directory, reading the next file while one is written"""
+        return self.import_course_csvs(department_csv_paths(directory), workers, chunk_size)
+    
+    def import_course_csvs(self, csv_paths: List[str], workers: int = 1, chunk_size: Optional[int] = None) -> Dict:
+        """Validate and upsert course CSVs in one transaction; returns rows/sec, rejects and per-file timing"""
+        start = time.perf_counter()
+        report = {'success': False, 'files': [], 'rows': 0, 'written': 0, 'duplicates': 0,
+                  'rejects': [], 'seconds': 0.0, 'rows_per_second': 0.0}
+        seen_ids = set()
+        # Readers parse and validate ahead of the writer; SQLite has a single writer, so
+        # the upserts are applied file by file, in order, from this thread. With one reader the
+        # writer waits for each file to be read in turn; a second lets the next file be read
+        # while one is written. Parsing holds the GIL, so more readers than that rarely help
+        queues = [queue.Queue(maxsize=READ_AHEAD_CHUNKS) for _ in csv_paths]
+        stop = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=max(1, min(workers, len(csv_paths) or 1)))
         try:
-            df = pd.read_csv(csv_path)
-            conn = sqlite3.connect(self.db_path)
-            df.to_sql('courses', conn, if_exists='append', index=False)
-            conn.close()
-            print(f"Successfully imported {len(df)} courses from {csv_path}")
+            for csv_path, chunks in zip(csv_paths, queues):
+                pool.submit(read_ahead, csv_path, chunks, stop, chunk_size or CHUNK_SIZE)
+            
+            conn = self.get_connection()
+            with conn:
+                conn.execute('BEGIN')
+                for csv_path, chunks in zip(csv_paths, queues):
+                    stats = {'file': csv_path, 'rows': 0, 'written': 0, 'rejects': 0, 'duplicates': 0,
+                             'read_seconds': 0.0, 'write_seconds': 0.0}
+                    file_ids, file_rejects = set(), []
+                    # A file that can't be read is rolled back on its own; the other files still import
+                    conn.execute('SAVEPOINT import_file')
+                    error = None
+                    while True:
+                        kind, payload = chunks.get()
+                        if kind == READ_DONE:
+                            stats['read_seconds'] = round(payload, 4)
+                            break
+                        if kind == READ_FAILED:
+                            error = payload
+                            break
+                        rows, rejects = payload
+                        # The first file (in path order) to list a course id wins, so the
+                        # result doesn't depend on which reader finishes first
+                        unique = []
+                        for row in rows:
+                            if row[0] in seen_ids or row[0] in file_ids:
+                                stats['duplicates'] += 1
+                            else:
+                                file_ids.add(row[0])
+                                unique.append(row)
+                        write_start = time.perf_counter()
+                        stats['written'] += self._upsert_courses(conn, unique)
+                        stats['write_seconds'] += time.perf_counter() - write_start
+                        stats['rows'] += len(unique)
+                        stats['rejects'] += len(rejects)
+                        file_rejects.extend(rejects)
+                    
+                    if error is not None:
+                        conn.execute('ROLLBACK TO import_file')
+                        print(f"Error importing {csv_path}: {error}")
+                        stats.update(rows=0, written=0, rejects=0, duplicates=0, error=str(error))
+                    else:
+                        report['rejects'].extend(file_rejects)
+                        seen_ids.update(file_ids)
+                    conn.execute('RELEASE import_file')
+                    stats['write_seconds'] = round(stats['write_seconds'], 4)
+                    report['files'].append(stats)
+                    report['rows'] += stats['rows']
+                    report['written'] += stats['written']
+                    report['duplicates'] += stats['duplicates']
+            report['success'] = True
         except Exception as e:
             print(f"Error importing CSV: {e}")
+            report['error'] = str(e)
+        finally:
+            stop.set()
+            pool.shutdown(wait=True)
+        
+        report['seconds'] = round(time.perf_counter() - start, 4)
+        if report['seconds'] > 0:
+            report['rows_per_second'] = round(report['rows'] / report['seconds'], 1)
+        if report['success']:
+            print(f"Successfully imported {report['rows']} courses from {len(csv_paths)} file(s) "
+                  f"({report['written']} written, {len(report['rejects'])} rejected, "
+                  f"{report['duplicates']} duplicate ids skipped, "
+                  f"{report['rows_per_second']:,.0f} rows/sec)")
+        return report
     
-    def get_all_courses(self) -> List[Dict]:
-        """Get all courses from database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM courses")
-        columns = [description[0] for description in cursor.description]
-        courses = [dict(zip(columns, row)) for row in cursor.fetchall()]
-        conn.close()
-        return courses
+    def _upsert_courses(self, conn: sqlite3.Connection, rows: List[tuple]) -> int:
+        """Insert or update imported courses, keeping their ratings; returns the rows actually changed"""
+        if not rows:
+            return 0
+        columns = ', '.join(IMPORT_COLUMNS)
+        updates = ', '.join(f"{column} = excluded.{column}" for column in IMPORT_COLUMNS[1:])
+        # Identical rows are skipped so re-importing a catalog doesn't bump the catalog
+        # version or rewrite the search index
+        changed = ' OR '.join(f"courses.{column} IS NOT excluded.{column}" for column in IMPORT_COLUMNS[1:])
+        cursor = conn.executemany(f'''
+            INSERT INTO courses ({columns}) VALUES ({', '.join('?' for _ in IMPORT_COLUMNS)})
+            ON CONFLICT(id) DO UPDATE SET {updates} WHERE {changed}
+        ''', rows)
+        return cursor.rowcount
     
-    def get_course_by_id(self, course_id: str) -> Optional[Dict]:
-        """Get specific course by ID"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM courses WHERE id = ?", (course_id,))
+    def get_catalog_version(self, name: str = 'courses') -> int:
+        """Get the current catalog version (incremented on every write to the courses or departments table)"""
+        cursor = self.get_connection().cursor()
+        cursor.execute("SELECT version FROM catalog_meta WHERE name = ?", (name,))
         row = cursor.fetchone()
-        if row:
+        return row[0] if row else 0
+    
+    def versioned_read(self, read: Callable, name: str = 'courses') -> Tuple[int, object]:
+        """(catalog version, read()) from one read transaction, so the result is exactly that version"""
+        conn = self.get_connection()
+        if conn.in_transaction:
+            return self.get_catalog_version(name), read()
+        # In WAL mode the first SELECT pins the snapshot that every later read in the transaction sees
+        conn.execute('BEGIN')
+        try:
+            return self.get_catalog_version(name), read()
+        finally:
+            conn.commit()
+    
+    def get_catalog_snapshot(self) -> CatalogSnapshot:
+        """Get the in-memory catalog snapshot, reloading it only when the catalog version changed"""
+        snapshot = self._catalog_snapshot
+        if snapshot is not None and snapshot.version == self.get_catalog_version():
+            return snapshot
+        
+        def read_courses() -> List[Dict]:
+            cursor = self.get_connection().cursor()
+            cursor.execute("SELECT * FROM courses")
             columns = [description[0] for description in cursor.description]
-            course = dict(zip(columns, row))
-        else:
-            course = None
-        conn.close()
-        return course
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        
+        # A write between reading the version and the rows would file newer rows under the older version
+        version, rows = self.versioned_read(read_courses)
+        snapshot = CatalogSnapshot(version, rows)
+        self._catalog_snapshot = snapshot
+        return snapshot
     
-    def search_courses(self, query: str, filters: Dict = None) -> List[Dict]:
-        """Search courses based on query and filters"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def get_all_courses(self, fields: Optional[List[str]] = None) -> List[Dict]:
+        """Get all courses from database, optionally only some of their columns"""
+        if fields:
+            return self.get_courses_page(fields)['courses']
+        # Hand out copies so callers can't mutate the shared snapshot
+        return [dict(course) for course in self.get_catalog_snapshot().courses]
+    
+    def get_course_fields(self) -> List[str]:
+        """Column names of the courses table"""
+        cursor = self.get_connection().cursor()
+        cursor.execute("PRAGMA table_info(courses)")
+        return [row[1] for row in cursor.fetchall()]
+    
+    def resolve_course_fields(self, fields: Optional[List[str]]) -> List[str]:
+        """Validate a field projection; the id is always included since it is the page cursor"""
+        columns = self.get_course_fields()
+        if not fields:
+            return columns
+        unknown = [field for field in fields if field not in columns]
+        if unknown:
+            raise ValueError(f"Unknown course fields: {', '.join(unknown)}")
+        return ['id'] + [field for field in dict.fromkeys(fields) if field != 'id']
+    
+    def get_courses_page(self, fields: Optional[List[str]] = None, limit: Optional[int] = None,
+                         after: Optional[str] = None, summary: bool = False) -> Dict:
+        """Courses in id order after the cursor, selecting only the requested columns"""
+        columns = list(self.COURSE_SUMMARY_FIELDS) if summary else self.resolve_course_fields(fields)
+        # Column names come from PRAGMA table_info, never from the request
+        sql = f"SELECT {', '.join(columns)} FROM courses"
+        params = []
+        if after is not None:
+            sql += " WHERE id > ?"
+            params.append(after)
+        sql += " ORDER BY id"
+        if limit is not None:
+            # One extra row tells whether there is another page
+            sql += " LIMIT ?"
+            params.append(limit + 1)
         
-        sql = """
-            SELECT * FROM courses 
-            WHERE (title LIKE ? OR description LIKE ? OR topics LIKE ? OR career_relevance LIKE ?)
-        """
-        params = [f"%{query}%", f"%{query}%", f"%{query}%", f"%{query}%"]
+        cursor = self.get_connection().cursor()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = rows[-1][0]
         
+        if summary:
+            page = self._summarize_courses(columns, rows)
+        else:
+            page = {'courses': [dict(zip(columns, row)) for row in rows]}
+        page['next_cursor'] = next_cursor
+        return page
+    
+    def _summarize_courses(self, columns: List[str], rows: List[tuple]) -> Dict:
+        """Compact course list: one array per course, departments listed once and referenced by index"""
+        department_column = columns.index('department')
+        departments = {}
+        courses = []
+        for row in rows:
+            row = list(row)
+            row[department_column] = departments.setdefault(row[department_column], len(departments))
+            courses.append(row)
+        return {'view': 'summary', 'fields': columns, 'departments': list(departments), 'courses': courses}
+    
+    def get_course_by_id(self, course_id: str) -> Optional[Dict]:
+        """Get specific course by ID"""
+        course = self.get_catalog_snapshot().by_id.get(course_id)
+        return dict(course) if course is not None else None
+    
+    def get_courses_by_department(self, department: str) -> List[Dict]:
+        """Get all courses offered by a department"""
+        return [dict(course) for course in self.get_catalog_snapshot().by_department.get(department, ())]
+    
+    def search_courses(self, query: str, filters: Dict = None, limit: Optional[int] = None,
+                       offset: int = 0) -> List[Dict]:
+        """Search courses based on query and filters, best matches first"""
+        return self.search_courses_page(query, filters, limit, offset)['courses']
+    
+    def search_courses_page(self, query: str, filters: Dict = None, limit: Optional[int] = None,
+                            offset: int = 0) -> Dict:
+        """One page of search results with the total number of matches"""
+        terms = re.findall(r'\w+', (query or '').lower())
+        if not terms:
+            return {'courses': [], 'total': 0}
+        
+        if self.fts_enabled:
+            try:
+                return self._search_fts(terms, filters, limit, offset)
+            except sqlite3.OperationalError as e:
+                print(f"FTS search failed, falling back to LIKE: {e}")
+        return self._search_like(query, filters, limit, offset)
+    
+    def _search_filters(self, filters: Optional[Dict]):
+        """SQL conditions and parameters for the department, level and max_difficulty filters"""
+        conditions, params = [], []
         if filters:
             if 'department' in filters:
-                sql += " AND department = ?"
+                conditions.append("c.department = ?")
                 params.append(filters['department'])
             if 'level' in filters:
-                sql += " AND level = ?"
+                conditions.append("c.level = ?")
                 params.append(filters['level'])
             if 'max_difficulty' in filters:
-                sql += " AND difficulty_rating <= ?"
+                conditions.append("c.difficulty_rating <= ?")
                 params.append(filters['max_difficulty'])
+        return conditions, params
+    
+    def _fetch_search_page(self, sql: str, count_sql: str, params: List,
+                           limit: Optional[int], offset: int) -> Dict:
+        """Run a search query with paging, plus a count of all matches when paging"""
+        cursor = self.get_connection().cursor()
+        if limit is not None:
+            cursor.execute(count_sql, params)
+            total = cursor.fetchone()[0]
+            sql += " LIMIT ? OFFSET ?"
+            params = params + [limit, offset]
         
         cursor.execute(sql, params)
         columns = [description[0] for description in cursor.description]
         courses = [dict(zip(columns, row)) for row in cursor.fetchall()]
-        conn.close()
-        return courses
+        if limit is None:
+            total = len(courses)
+        return {'courses': courses, 'total': total}
+    
+    def _search_fts(self, terms: List[str], filters: Optional[Dict], limit: Optional[int], offset: int) -> Dict:
+        """BM25-ranked FTS5 search; every term matches as a prefix"""
+        match = ' '.join(f'"{term}"*' for term in terms)
+        conditions, params = self._search_filters(filters)
+        where = ''.join(f" AND {condition}" for condition in conditions)
+        
+        sql = f"""
+            SELECT c.*,
+                   bm25(courses_fts, {self.SEARCH_WEIGHTS}) AS search_rank,
+                   snippet(courses_fts, -1, '<mark>', '</mark>', '...', 16) AS snippet
+            FROM courses_fts JOIN courses c ON c.rowid = courses_fts.rowid
+            WHERE courses_fts MATCH ?{where}
+            ORDER BY search_rank
+        """
+        count_sql = f"""
+            SELECT COUNT(*) FROM courses_fts JOIN courses c ON c.rowid = courses_fts.rowid
+            WHERE courses_fts MATCH ?{where}
+        """
+        return self._fetch_search_page(sql, count_sql, [match] + params, limit, offset)
+    
+    def _search_like(self, query: str, filters: Optional[Dict], limit: Optional[int], offset: int) -> Dict:
+        """Unranked substring search used when FTS5 is unavailable"""
+        conditions, params = self._search_filters(filters)
+        where = ''.join(f" AND {condition}" for condition in conditions)
+        pattern = f"%{query}%"
+        text_condition = "(c.title LIKE ? OR c.description LIKE ? OR c.topics LIKE ? OR c.career_relevance LIKE ?)"
+        
+        sql = f"""
+            SELECT c.*, NULL AS search_rank, NULL AS snippet
+            FROM courses c
+            WHERE {text_condition}{where}
+            ORDER BY c.id
+        """
+        count_sql = f"SELECT COUNT(*) FROM courses c WHERE {text_condition}{where}"
+        return self._fetch_search_page(sql, count_sql, [pattern] * 4 + params, limit, offset)
     
     def get_course_statistics(self) -> Dict:
         """Get statistics about the course database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.get_connection().cursor()
         
         cursor.execute("SELECT COUNT(*) FROM courses")
         total_courses = cursor.fetchone()[0]
@@ -384,8 +988,6 @@ class DataManager:
         cursor.execute("SELECT AVG(difficulty_rating), AVG(avg_rating) FROM courses")
         avg_difficulty, avg_rating = cursor.fetchone()
         
-        conn.close()
-        
         return {
             "total_courses": total_courses,
             "departments": departments,
@@ -396,49 +998,80 @@ class DataManager:
     def add_student_rating(self, rating_data: Dict) -> bool:
         """Add a student rating for a course"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Insert rating
-            cursor.execute('''
-                INSERT OR REPLACE INTO student_ratings 
-                (student_email, course_id, rating, review, completed_semester, would_recommend)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                rating_data['student_email'],
-                rating_data['course_id'],
-                rating_data['rating'],
-                rating_data['review'],
-                rating_data['completed_semester'],
-                rating_data['would_recommend']
-            ))
-            
-            # Update course average rating
-            cursor.execute('''
-                SELECT AVG(rating), COUNT(rating) FROM student_ratings 
-                WHERE course_id = ?
-            ''', (rating_data['course_id'],))
-            
-            avg_rating, total_ratings = cursor.fetchone()
+            with self.get_connection() as conn:
+                # A student re-rating a course updates their row in place, so the update trigger
+                # moves the course totals by the difference. INSERT OR REPLACE would delete the old
+                # row without firing the delete trigger and count the student twice
+                conn.execute('''
+                    INSERT INTO student_ratings 
+                    (student_email, course_id, rating, review, completed_semester, would_recommend)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(student_email, course_id) DO UPDATE SET
+                        rating = excluded.rating, review = excluded.review,
+                        completed_semester = excluded.completed_semester,
+                        would_recommend = excluded.would_recommend, timestamp = CURRENT_TIMESTAMP
+                ''', (
+                    rating_data['student_email'],
+                    rating_data['course_id'],
+                    rating_data['rating'],
+                    rating_data['review'],
+                    rating_data['completed_semester'],
+                    rating_data['would_recommend']
+                ))
             
-            cursor.execute('''
-                UPDATE courses 
-                SET avg_rating = ?, total_ratings = ?
-                WHERE id = ?
-            ''', (round(avg_rating, 2), total_ratings, rating_data['course_id']))
-            
-            conn.commit()
-            conn.close()
             return True
             
         except Exception as e:
             print(f"Error adding rating: {e}")
             return False
     
+    def recompute_rating_aggregates(self) -> Dict:
+        """Rebuild the rating totals of courses that drifted from student_ratings"""
+        try:
+            with self.get_connection() as conn:
+                drifted, orphaned = self._recompute_rating_aggregates(conn.cursor())
+            
+            if drifted:
+                print(f"Repaired rating totals for {len(drifted)} courses")
+            return {'success': True, 'repaired': drifted, 'orphaned_ratings': orphaned}
+            
+        except Exception as e:
+            print(f"Error recomputing rating totals: {e}")
+            return {'success': False, 'error': str(e), 'repaired': [], 'orphaned_ratings': 0}
+    
+    def _recompute_rating_aggregates(self, cursor) -> tuple:
+        """Fix drifted rating totals in the caller's transaction; returns (course ids fixed, orphaned ratings)"""
+        # Courses without ratings keep a seeded avg_rating (sample data) unless their totals
+        # say they had ratings
+        cursor.execute('''
+            SELECT c.id, IFNULL(t.rating_sum, 0), IFNULL(t.total, 0),
+                CASE WHEN t.total > 0 THEN ROUND(CAST(t.rating_sum AS REAL) / t.total, 2)
+                     WHEN IFNULL(c.total_ratings, 0) = 0 THEN c.avg_rating
+                     ELSE 0.0 END
+            FROM courses c
+            LEFT JOIN (
+                SELECT course_id, SUM(rating) AS rating_sum, COUNT(*) AS total
+                FROM student_ratings GROUP BY course_id
+            ) t ON t.course_id = c.id
+            WHERE c.rating_sum IS NOT IFNULL(t.rating_sum, 0)
+               OR c.total_ratings IS NOT IFNULL(t.total, 0)
+               OR (t.total > 0 AND c.avg_rating IS NOT ROUND(CAST(t.rating_sum AS REAL) / t.total, 2))
+        ''')
+        drifted = cursor.fetchall()
+        cursor.executemany(
+            'UPDATE courses SET rating_sum = ?, total_ratings = ?, avg_rating = ? WHERE id = ?',
+            [(rating_sum, total, avg_rating, course_id) for course_id, rating_sum, total, avg_rating in drifted]
+        )
+        
+        cursor.execute('''
+            SELECT COUNT(*) FROM student_ratings r
+            WHERE NOT EXISTS (SELECT 1 FROM courses c WHERE c.id = r.course_id)
+        ''')
+        return [row[0] for row in drifted], cursor.fetchone()[0]
+    
     def get_course_ratings(self, course_id: str) -> List[Dict]:
         """Get all ratings for a specific course"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.get_connection().cursor()
         
         cursor.execute('''
             SELECT student_email, rating, review, completed_semester, would_recommend, timestamp
@@ -450,49 +1083,104 @@ class DataManager:
         columns = ['student_email', 'rating', 'review', 'completed_semester', 'would_recommend', 'timestamp']
         ratings = [dict(zip(columns, row)) for row in cursor.fetchall()]
         
-        conn.close()
         return ratings
     
     def get_course_average_rating(self, course_id: str) -> float:
         """Get the average rating for a course"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.get_connection().cursor()
         
         cursor.execute("SELECT avg_rating FROM courses WHERE id = ?", (course_id,))
         result = cursor.fetchone()
         
-        conn.close()
         return result[0] if result else 0.0
     
     def get_all_departments(self) -> List[Dict]:
         """Get all departments from database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.get_connection().cursor()
         
         cursor.execute("SELECT * FROM departments")
         columns = [description[0] for description in cursor.description]
         departments = [dict(zip(columns, row)) for row in cursor.fetchall()]
         
-        conn.close()
         return departments
     
+    def resolve_major(self, major: Optional[str]) -> str:
+        """Course department for a free-text major (department name or code), or '' when none matches"""
+        major = ' '.join((major or '').split()).lower()
+        if not major:
+            return ''
+        departments = {department.lower(): department
+                       for department in self.get_catalog_snapshot().by_department if department}
+        if major in departments:
+            return departments[major]
+        for department in self.get_all_departments():
+            if major in ((department.get('code') or '').lower(), (department.get('name') or '').lower()):
+                return departments.get((department.get('name') or '').lower(), '')
+        return ''
+    
+    def get_department_descriptions(self) -> Dict[str, str]:
+        """Department name -> short description of its focus areas"""
+        return {department['name']: department.get('description') or ''
+                for department in self.get_all_departments() if department.get('name')}
+    
+    def get_user_profile_combinations(self) -> List[tuple]:
+        """Distinct (major, academic_level) pairs of active users"""
+        cursor = self.get_connection().cursor()
+        cursor.execute("SELECT DISTINCT major, academic_level FROM users WHERE is_active = 1")
+        return cursor.fetchall()
+    
+    def get_precomputed_recommendations(self, department: str, academic_level: str,
+                                        catalog_version: Optional[int] = None) -> Optional[List[Dict]]:
+        """Stored default recommendations for a department and level, or None when missing or stale"""
+        if catalog_version is None:
+            catalog_version = self.get_catalog_version()
+        try:
+            cursor = self.get_connection().cursor()
+            cursor.execute('''
+                SELECT recommendations FROM precomputed_recommendations
+                WHERE catalog_version = ? AND department = ? AND academic_level = ?
+            ''', (catalog_version, department, academic_level))
+            row = cursor.fetchone()
+            return json.loads(row[0]) if row else None
+        except sqlite3.OperationalError as e:
+            print(f"Database operational error getting precomputed recommendations: {e}")
+            return None
+    
+    def save_precomputed_recommendations(self, catalog_version: int, rows: List[tuple]) -> int:
+        """Store (department, academic_level, recommendations) rows scored at catalog_version; returns rows written"""
+        try:
+            with self.get_connection() as conn:
+                conn.execute('BEGIN IMMEDIATE')
+                # Results scored against a catalog that has changed since are not worth keeping
+                if self.get_catalog_version() != catalog_version:
+                    return 0
+                conn.execute('DELETE FROM precomputed_recommendations WHERE catalog_version <> ?', (catalog_version,))
+                conn.executemany('''
+                    INSERT OR REPLACE INTO precomputed_recommendations
+                    (catalog_version, department, academic_level, recommendations)
+                    VALUES (?, ?, ?, ?)
+                ''', [(catalog_version, department, academic_level, json.dumps(recommendations))
+                      for department, academic_level, recommendations in rows])
+            return len(rows)
+        except Exception as e:
+            print(f"Error saving precomputed recommendations: {e}")
+            return 0
+    
     # User Management Methods
     def create_user(self, email: str, password_hash: str, first_name: str, last_name: str, 
                    student_id: Optional[str] = None, major: Optional[str] = None, 
                    academic_level: Optional[str] = None) -> Optional[int]:
         """Create a new user account"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO users (email, password_hash, first_name, last_name, student_id, major, academic_level)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (email, password_hash, first_name, last_name, student_id, major, academic_level))
-            
-            user_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    INSERT INTO users (email, password_hash, first_name, last_name, student_id, major, academic_level)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (email, password_hash, first_name, last_name, student_id, major, academic_level))
+                
+                user_id = cursor.lastrowid
             return user_id
             
         except sqlite3.IntegrityError as e:
@@ -504,17 +1192,15 @@ class DataManager:
     
     def get_user_by_email(self, email: str) -> Optional[Dict]:
         """Get user by email address"""
-        conn = None
         try:
-            conn = sqlite3.connect(self.db_path, timeout=30.0)
-            conn.row_factory = sqlite3.Row  # Enable row factory for better error handling
-            cursor = conn.cursor()
+            cursor = self.get_connection().cursor()
+            cursor.row_factory = sqlite3.Row  # Enable row factory for better error handling
             
             cursor.execute('SELECT * FROM users WHERE email = ? AND is_active = 1', (email,))
             user_data = cursor.fetchone()
             
             if user_data:
-                return dict(user_data)
+                return self._with_pending_login(dict(user_data))
             return None
         except sqlite3.OperationalError as e:
             print(f"Database operational error getting user by email: {e}")
@@ -522,23 +1208,24 @@ class DataManager:
         except Exception as e:
             print(f"Error getting user by email: {e}")
             return None
-        finally:
-            if conn:
-                conn.close()
     
     def get_user_by_id(self, user_id: int) -> Optional[Dict]:
         """Get user by ID"""
-        conn = None
+        cached = self.user_cache.get(user_id, 0)
+        if cached is not None:
+            return self._with_pending_login(dict(cached))
+        
         try:
-            conn = sqlite3.connect(self.db_path, timeout=30.0)
-            conn.row_factory = sqlite3.Row  # Enable row factory for better error handling
-            cursor = conn.cursor()
+            cursor = self.get_connection().cursor()
+            cursor.row_factory = sqlite3.Row  # Enable row factory for better error handling
             
             cursor.execute('SELECT * FROM users WHERE id = ? AND is_active = 1', (user_id,))
             user_data = cursor.fetchone()
             
             if user_data:
-                return dict(user_data)
+                user = dict(user_data)
+                self.user_cache.put(user_id, 0, user)
+                return self._with_pending_login(dict(user))
             return None
         except sqlite3.OperationalError as e:
             print(f"Database operational error getting user by ID: {e}")
@@ -546,45 +1233,82 @@ class DataManager:
         except Exception as e:
             print(f"Error getting user by ID: {e}")
             return None
-        finally:
-            if conn:
-                conn.close()
+    
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop a user from the profile cache after their row changed"""
+        self.user_cache.invalidate(user_id)
+    
+    def _with_pending_login(self, user: Dict) -> Dict:
+        """Show a buffered last_login that hasn't been flushed yet"""
+        pending = self._pending_logins.get(user.get('id'))
+        if pending is not None:
+            user['last_login'] = pending
+        return user
     
     def update_last_login(self, user_id: int) -> bool:
-        """Update user's last login timestamp"""
-        conn = None
+        """Record a login; the timestamp is written with other logins in one batch"""
+        # Same format as CURRENT_TIMESTAMP (UTC)
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+        with self._pending_logins_lock:
+            self._pending_logins[user_id] = timestamp
+            flush_now = len(self._pending_logins) >= self.LAST_LOGIN_FLUSH_BATCH
+            timer = self._last_login_timer
+            if not flush_now and (timer is None or not timer.is_alive() or timer.pid != os.getpid()):
+                # A timer inherited across fork() never fires in the child
+                timer = threading.Timer(self.LAST_LOGIN_FLUSH_SECONDS, self.flush_last_logins)
+                timer.daemon = True
+                timer.pid = os.getpid()
+                timer.start()
+                self._last_login_timer = timer
+        self.invalidate_user(user_id)
+        if flush_now:
+            return self.flush_last_logins()
+        return True
+    
+    def flush_last_logins(self) -> bool:
+        """Write buffered last_login timestamps in one transaction"""
+        with self._pending_logins_lock:
+            pending, self._pending_logins = self._pending_logins, {}
+        if not pending:
+            return True
         try:
-            conn = sqlite3.connect(self.db_path, timeout=30.0)
-            cursor = conn.cursor()
-            
-            cursor.execute('UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?', (user_id,))
-            conn.commit()
+            with self.get_connection() as conn:
+                conn.executemany('UPDATE users SET last_login = ? WHERE id = ?',
+                                 [(timestamp, user_id) for user_id, timestamp in pending.items()])
             return True
             
         except sqlite3.OperationalError as e:
             print(f"Database operational error updating last login: {e}")
-            return False
         except Exception as e:
             print(f"Error updating last login: {e}")
+        
+        # Keep the timestamps for the next flush unless a newer login replaced them
+        with self._pending_logins_lock:
+            for user_id, timestamp in pending.items():
+                self._pending_logins.setdefault(user_id, timestamp)
+        return False
+    
+    def update_password_hash(self, user_id: int, password_hash: str) -> bool:
+        """Replace a user's stored password hash"""
+        try:
+            with self.get_connection() as conn:
+                conn.execute('UPDATE users SET password_hash = ? WHERE id = ?', (password_hash, user_id))
+            self.invalidate_user(user_id)
+            return True
+            
+        except Exception as e:
+            print(f"Error updating password hash: {e}")
             return False
-        finally:
-            if conn:
-                conn.close()
     
     # Saved Courses Methods
     def save_course_for_user(self, user_id: int, course_id: str, notes: Optional[str] = None) -> bool:
         """Save a course to user's saved list"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO saved_courses (user_id, course_id, notes, saved_at)
-                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-            ''', (user_id, course_id, notes))
-            
-            conn.commit()
-            conn.close()
+            with self.get_connection() as conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO saved_courses (user_id, course_id, notes, saved_at)
+                    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                ''', (user_id, course_id, notes))
             return True
             
         except Exception as e:
@@ -594,14 +1318,9 @@ class DataManager:
     def remove_saved_course(self, user_id: int, course_id: str) -> bool:
         """Remove a course from user's saved list"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('DELETE FROM saved_courses WHERE user_id = ? AND course_id = ?', 
-                          (user_id, course_id))
-            
-            conn.commit()
-            conn.close()
+            with self.get_connection() as conn:
+                conn.execute('DELETE FROM saved_courses WHERE user_id = ? AND course_id = ?', 
+                             (user_id, course_id))
             return True
             
         except Exception as e:
@@ -610,8 +1329,7 @@ class DataManager:
     
     def get_saved_courses(self, user_id: int) -> List[Dict]:
         """Get all saved courses for a user"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.get_connection().cursor()
         
         cursor.execute('''
             SELECT c.*, sc.saved_at, sc.notes
@@ -624,33 +1342,102 @@ class DataManager:
         columns = [description[0] for description in cursor.description]
         saved_courses = [dict(zip(columns, row)) for row in cursor.fetchall()]
         
-        conn.close()
         return saved_courses
     
     def is_course_saved(self, user_id: int, course_id: str) -> bool:
         """Check if a course is saved by user"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.get_connection().cursor()
         
         cursor.execute('SELECT 1 FROM saved_courses WHERE user_id = ? AND course_id = ?', 
                       (user_id, course_id))
         result = cursor.fetchone()
         
-        conn.close()
         return result is not None
     
     def get_course_saved_count(self, course_id: str) -> int:
         """Get the number of users who saved a specific course"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cursor = self.get_connection().cursor()
             
             cursor.execute('SELECT COUNT(*) FROM saved_courses WHERE course_id = ?', (course_id,))
             count = cursor.fetchone()[0]
             
-            conn.close()
             return count
             
         except Exception as e:
             print(f"Error getting course saved count: {e}")
-            return 0
\ No newline at end of file
+            return 0
+    
+    def get_course_saved_counts(self, course_ids: Optional[List[str]] = None) -> Dict[str, int]:
+        """Get saved counts for many courses with a single GROUP BY query"""
+        try:
+            if course_ids is not None and not course_ids:
+                return {}
+            
+            cursor = self.get_connection().cursor()
+            
+            # Large id lists would exceed SQLite's bound-parameter limit; count everything instead
+            if course_ids is None or len(course_ids) > 500:
+                cursor.execute('SELECT course_id, COUNT(*) FROM saved_courses GROUP BY course_id')
+            else:
+                placeholders = ', '.join('?' for _ in course_ids)
+                cursor.execute(f'''
+                    SELECT course_id, COUNT(*) FROM saved_courses
+                    WHERE course_id IN ({placeholders})
+                    GROUP BY course_id
+                ''', list(course_ids))
+            counts = dict(cursor.fetchall())
+            
+            return counts
+            
+        except Exception as e:
+            print(f"Error getting course saved counts: {e}")
+            return {}
+    
+    def load_course_similarities(self, digest: str, top_n: int) -> Optional[Dict[str, List]]:
+        """Persisted similar-course lists if they were built from the same course text"""
+        try:
+            cursor = self.get_connection().cursor()
+            cursor.execute("SELECT digest, top_n FROM course_similarity_meta WHERE name = 'courses'")
+            meta = cursor.fetchone()
+            if meta is None or meta[0] != digest or meta[1] < top_n:
+                return None
+            
+            cursor.execute('SELECT course_id, similar_id, score FROM course_similarities ORDER BY course_id, rank')
+            similarities = {}
+            for course_id, similar_id, score in cursor.fetchall():
+                neighbors = similarities.setdefault(course_id, [])
+                if len(neighbors) < top_n:
+                    neighbors.append((similar_id, score))
+            return similarities
+        except Exception as e:
+            print(f"Error loading course similarities: {e}")
+            return None
+    
+    def save_course_similarities(self, similarities: Dict[str, List], digest: str, top_n: int) -> bool:
+        """Replace the persisted similar-course lists in one transaction; False if already stored or on error"""
+        try:
+            with self.get_connection() as conn:
+                # Workers that rebuild after the same catalog change all reach here; the write
+                # lock makes the first one store the lists and the rest find its digest
+                conn.execute('BEGIN IMMEDIATE')
+                meta = conn.execute(
+                    "SELECT digest, top_n FROM course_similarity_meta WHERE name = 'courses'"
+                ).fetchone()
+                if meta is not None and meta[0] == digest and meta[1] >= top_n:
+                    return False
+                conn.execute('DELETE FROM course_similarities')
+                conn.executemany(
+                    'INSERT INTO course_similarities (course_id, rank, similar_id, score) VALUES (?, ?, ?, ?)',
+                    [(course_id, rank, similar_id, score)
+                     for course_id, neighbors in similarities.items()
+                     for rank, (similar_id, score) in enumerate(neighbors)]
+                )
+                conn.execute('''
+                    INSERT OR REPLACE INTO course_similarity_meta (name, digest, top_n, built_at)
+                    VALUES ('courses', ?, ?, CURRENT_TIMESTAMP)
+                ''', (digest, top_n))
+            return True
+        except Exception as e:
+            print(f"Error saving course similarities: {e}")
+            return False
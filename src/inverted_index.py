@@ -0,0 +1,76 @@
+"""
+Inverted index over the preprocessed course text for candidate pruning.
+
+Maps stemmed tokens, keyword phrases, category flags and departments to the
+catalog rows that contain them. RecommendationEngine uses it to find the
+courses whose interest and topic scores can be non-zero for a query; every
+other course is known to score zero on those text components without running
+the scorers. Rows follow the order of the catalog snapshot the index was built
+from.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Set
+
+from src.keywords import compile_keywords
+
+
+class InvertedIndex:
+    """Token, phrase, category and department postings for one catalog snapshot"""
+
+    def __init__(self, courses: List[Dict], course_features: List[Dict]):
+        self.size = len(courses)
+        self.interest_postings = {}
+        self.content_postings = {}
+        self.category_rows = {}
+        self.department_rows = {}
+        # Courses with no usable text get the scorers' neutral score, never zero
+        self.empty_interest_rows = set()
+        self.empty_content_rows = set()
+
+        for row, (course, features) in enumerate(zip(courses, course_features)):
+            for token in features['interest_token_set']:
+                self.interest_postings.setdefault(token, []).append(row)
+            for token in features['content_token_set']:
+                self.content_postings.setdefault(token, []).append(row)
+            if not features['interest_text']:
+                self.empty_interest_rows.add(row)
+            if not features['content_text']:
+                self.empty_content_rows.add(row)
+            for name, flag in features['categories'].items():
+                if flag:
+                    self.category_rows.setdefault(name, set()).add(row)
+            self.department_rows.setdefault(course.get('department', ''), set()).add(row)
+
+        self._raw_texts = [features['raw_text'] for features in course_features]
+        # Phrase lists are scanned once per catalog and remembered
+        self._phrase_rows = {}
+        self._phrase_lock = threading.Lock()
+
+    def rows_with_tokens(self, tokens: Iterable[str], field: str = 'interest') -> Set[int]:
+        """Rows whose interest (or content) tokens include any of the given tokens"""
+        postings = self.interest_postings if field == 'interest' else self.content_postings
+        rows = set()
+        for token in tokens:
+            rows.update(postings.get(token, ()))
+        return rows
+
+    def rows_with_phrases(self, phrases: Iterable[str]) -> Set[int]:
+        """Rows whose raw id/title/description text contains any of the phrases as a substring"""
+        key = tuple(phrases)
+        rows = self._phrase_rows.get(key)
+        if rows is None:
+            rows = set()
+            if key:
+                pattern = compile_keywords(key)
+                rows = {row for row, text in enumerate(self._raw_texts) if pattern.search(text)}
+            with self._phrase_lock:
+                self._phrase_rows[key] = rows
+        return rows
+
+    def rows_in_departments(self, departments: Iterable[str]) -> Set[int]:
+        """Rows belonging to any of the departments"""
+        rows = set()
+        for department in departments:
+            rows.update(self.department_rows.get(department, ()))
+        return rows
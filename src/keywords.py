@@ -0,0 +1,553 @@
+"""
+Keyword tables for course classification, interest expansion and interest boosts.
+
+The tables are frozen at import time and every keyword list is compiled into a
+single alternation regex, so checking a category is one scan of the course text
+rather than one substring search per keyword. Matching keeps the substring
+semantics of the original `any(keyword in text ...)` checks.
+"""
+
+import re
+from types import MappingProxyType
+from typing import Dict, Iterable, Optional
+
+
+def _freeze(table: Dict) -> MappingProxyType:
+    """Read-only copy of a keyword table with the keyword lists turned into tuples"""
+    frozen = {}
+    for key, value in table.items():
+        if isinstance(value, dict):
+            value = _freeze(value)
+        elif isinstance(value, list):
+            value = tuple(value)
+        frozen[key] = value
+    return MappingProxyType(frozen)
+
+
+def compile_keywords(keywords: Iterable[str]):
+    """Compile keywords into one regex that matches wherever any keyword is a substring"""
+    return re.compile('|'.join(re.escape(keyword) for keyword in sorted(set(keywords), key=len, reverse=True)))
+
+
+# Interest expansion keywords used by RecommendationEngine.expand_interests
+ENHANCED_KEYWORDS = _freeze({
+    'cybersecurity': [
+        'security', 'cyber', 'cybersecurity', 'encryption', 'firewall',
+        'network security', 'information security', 'protection', 'vulnerability',
+        'authentication', 'authorization', 'cryptography', 'secure', 'privacy',
+        'risk management', 'threat', 'defense', 'forensics', 'penetration',
+        'malware', 'intrusion', 'incident response', 'compliance'
+    ],
+    'ux_design': [
+        'user experience', 'user interface', 'ui', 'ux', 'usability',
+        'human computer interaction', 'interface design', 'user centered',
+        'interaction design', 'user research', 'design thinking', 'hci',
+        'user needs', 'user testing', 'prototyping', 'wireframe',
+        'accessibility', 'ergonomics', 'human factors', 'persona'
+    ],
+    'mechanical_engineering': [
+        'mechanical', 'engineering design', 'manufacturing', 'systems design',
+        'product design', 'cad', 'modeling', 'simulation', 'automation',
+        'robotics', 'control systems', 'mechanics', 'materials', 'thermal',
+        'fluid dynamics', 'design optimization', 'prototype', 'machining',
+        'assembly', 'tolerance', 'quality', 'reliability', 'testing',
+        'production', 'process design', 'tooling', 'fixtures',
+        'mechanical systems', 'machine design', 'heat transfer', 'vibrations',
+        'mechanical analysis', 'engineering mechanics', 'solid mechanics',
+        'manufacturing processes', 'quality control', 'engineering materials',
+        'mechanical engineering', 'design engineering', 'product development'
+    ],
+    'environmental_science': [
+        'environmental', 'sustainability', 'ecology', 'climate', 'green',
+        'renewable', 'conservation', 'environmental data', 'gis',
+        'remote sensing', 'environmental monitoring', 'pollution',
+        'ecosystem', 'biodiversity', 'carbon', 'energy efficiency',
+        'water quality', 'air quality', 'soil', 'waste management',
+        'environmental impact', 'assessment', 'geographic', 'spatial'
+    ],
+    'architecture': [
+        'architecture', 'architectural', 'building design', 'structural',
+        'construction', 'spatial design', 'urban planning', 'design',
+        'modeling', 'visualization', '3d modeling', 'cad', 'drafting',
+        'building systems', 'sustainable design', 'space planning',
+        'architectural history', 'building technology', 'environmental design',
+        'landscape architecture', 'interior design', 'urban design',
+        'architectural theory', 'building materials', 'construction management',
+        'architectural drawing', 'site planning', 'building codes',
+        'architectural engineering', 'facade design', 'adaptive reuse'
+    ],
+    'mathematics': [
+        'mathematics', 'mathematical', 'calculus', 'algebra', 'geometry',
+        'statistics', 'probability', 'linear algebra', 'differential equations',
+        'discrete mathematics', 'number theory', 'topology', 'analysis',
+        'mathematical modeling', 'optimization', 'numerical analysis',
+        'applied mathematics', 'pure mathematics', 'mathematical statistics',
+        'combinatorics', 'graph theory', 'mathematical logic', 'set theory',
+        'real analysis', 'complex analysis', 'functional analysis',
+        'mathematical physics', 'financial mathematics', 'actuarial science',
+        'mathematical computing', 'algorithmic mathematics', 'cryptography'
+    ],
+    'web_development': [
+        'web', 'website', 'html', 'css', 'javascript', 'frontend', 'backend',
+        'react', 'node', 'express', 'http', 'api', 'rest', 'json',
+        'responsive', 'bootstrap', 'jquery', 'php', 'mysql'
+    ],
+    'data_science': [
+        'data science', 'data analysis', 'statistics', 'analytics',
+        'visualization', 'machine learning', 'big data', 'pandas',
+        'python', 'r', 'sql', 'database', 'mining', 'warehouse'
+    ],
+    'mobile_development': [
+        'mobile', 'android', 'ios', 'app development', 'smartphone',
+        'tablet', 'swift', 'kotlin', 'react native', 'flutter'
+    ],
+    'game_development': [
+        'game', 'gaming', 'unity', 'graphics', '3d', 'animation',
+        'interactive', 'simulation', 'physics', 'rendering'
+    ],
+    # New interests - using exact form values as keys
+    'cloud computing devops aws azure infrastructure': [
+        'cloud', 'aws', 'azure', 'devops', 'infrastructure', 'kubernetes',
+        'docker', 'containerization', 'microservices', 'serverless',
+        'deployment', 'ci/cd', 'automation', 'scalability', 'virtualization'
+    ],
+    'mobile development ios android apps': [
+        'mobile', 'android', 'ios', 'app development', 'smartphone',
+        'tablet', 'swift', 'kotlin', 'react native', 'flutter'
+    ],
+    'game development unity programming graphics': [
+        'game', 'gaming', 'unity', 'graphics', '3d', 'animation',
+        'interactive', 'simulation', 'physics', 'rendering'
+    ],
+    'electrical engineering electronics circuits power': [
+        'electrical', 'electronics', 'circuits', 'power', 'signal processing',
+        'communications', 'control systems', 'embedded systems', 'vlsi',
+        'analog', 'digital', 'microprocessors', 'sensors', 'instrumentation'
+    ],
+    'industrial engineering operations supply chain systems': [
+        'industrial', 'operations', 'supply chain', 'systems', 'optimization',
+        'lean', 'six sigma', 'quality', 'productivity', 'logistics',
+        'ergonomics', 'human factors', 'process improvement', 'efficiency'
+    ],
+    'environmental engineering sustainability green technology': [
+        'environmental engineering', 'sustainability', 'green technology',
+        'water treatment', 'air pollution', 'waste management', 'remediation',
+        'renewable energy', 'environmental impact', 'ecology'
+    ],
+    'finance accounting economics financial analysis': [
+        'finance', 'accounting', 'economics', 'financial analysis', 'investment',
+        'banking', 'financial modeling', 'risk management', 'portfolio',
+        'budgeting', 'cost accounting', 'auditing', 'taxation'
+    ],
+    'physics engineering physics applied physics': [
+        'physics', 'engineering physics', 'applied physics', 'quantum',
+        'mechanics', 'thermodynamics', 'electromagnetism', 'optics',
+        'nuclear', 'computational physics', 'materials physics'
+    ],
+    'communication media journalism public relations': [
+        'communication', 'media', 'journalism', 'public relations', 'writing',
+        'reporting', 'broadcasting', 'digital media', 'social media',
+        'public speaking', 'rhetoric', 'mass communication', 'storytelling'
+    ],
+    'science technology society ethics innovation policy': [
+        'science technology society', 'sts', 'ethics', 'policy', 'innovation',
+        'social impact', 'technology ethics', 'digital divide', 'sustainability',
+        'environmental policy', 'science policy', 'technology assessment',
+        'social responsibility', 'public understanding', 'science communication'
+    ],
+    'psychology human behavior cognitive science': [
+        'psychology', 'human behavior', 'cognitive science', 'mental health',
+        'research methods', 'social psychology', 'behavioral', 'perception',
+        'learning', 'memory', 'decision making', 'human factors'
+    ],
+    'theatre performing arts drama production': [
+        'theatre', 'performing arts', 'drama', 'production', 'acting',
+        'directing', 'stage design', 'lighting', 'sound', 'costume',
+        'performance', 'creative writing', 'dramatic arts'
+    ],
+    'history humanities culture literature': [
+        'history', 'humanities', 'culture', 'literature', 'philosophy',
+        'anthropology', 'sociology', 'cultural studies', 'critical thinking',
+        'research', 'writing', 'analysis', 'interpretation'
+    ],
+    'health wellness physical education sports': [
+        'health', 'wellness', 'physical education', 'sports', 'fitness',
+        'nutrition', 'exercise science', 'kinesiology', 'public health',
+        'healthcare', 'medicine', 'therapy', 'rehabilitation'
+    ]
+})
+
+
+# Course categories behind the is_*_course classifiers. Each entry lists the text it
+# scans ('full' adds topics to id, title and description), the departments that always
+# belong to it, keywords that only count within a given department, and general keywords.
+COURSE_CATEGORIES = _freeze({
+    'ai_ml': {
+        'text': 'full',
+        'departments': [],
+        'id_keywords': [],
+        'department_keywords': {},
+        'keywords': [
+            'artificial intelligence', 'machine learning', 'neural network', 'deep learning',
+            'computer vision', 'natural language processing', 'data mining', 'robotics',
+            'generative ai', 'ai', ' ml ', 'nlp', 'reinforcement learning', 'introduction to ai',
+            'intro to ai', 'introduction to machine learning', 'intro to machine learning',
+            'cs370', 'cs375', 'cs474', 'cs440', 'cs482',  # Specific course IDs
+            'federated machine learning', 'ai for temporal', 'pattern recognition'
+        ]
+    },
+    'architecture': {
+        'text': 'full',
+        'departments': ['architecture', 'arch', 'architectural'],
+        'id_keywords': [],
+        'department_keywords': {},
+        'keywords': [
+            'architecture', 'architectural', 'building design', 'architectural design',
+            'design studio', 'architectural studio', 'urban planning', 'urban design',
+            'sustainable design', 'environmental design', 'architectural history',
+            'building technology', 'construction management', 'spatial design',
+            'architectural theory', 'building materials', 'architectural drawing',
+            'site planning', 'building codes', 'architectural engineering',
+            'facade design', 'adaptive reuse', 'landscape architecture',
+            'interior design', 'space planning', 'building systems',
+            'arch', 'building', 'construction', 'structural design'
+        ]
+    },
+    'mechanical_engineering': {
+        'text': 'basic',
+        # Materials Science (MTSE) courses are matched on department or course id
+        'departments': ['mechanical engineering', 'me', 'mechanical', 'materials science'],
+        'id_keywords': ['mtse'],
+        'department_keywords': {
+            # BME courses with mechanical content (BME302, BME321, BME351, etc.)
+            'biomedical engineering': [
+                'mechanical', 'mechanics', 'biomechanical', 'fluid mechanics', 'biofluid',
+                'advanced mechanics', 'mechanical fundamentals', 'stress', 'strain'
+            ],
+            # Engineering department mechanical courses (ENGR224, ENGR225, ENGR220, etc.)
+            'engineering': [
+                'welding', 'machining', 'metrology', 'fabrication', 'manufacturing',
+                'prototyping', 'materials', 'manual machining', 'cnc', 'physical metrology'
+            ],
+            'architecture': [
+                'materials', 'processes', 'construction', 'structural'
+            ],
+            'physics': [
+                'mechanics', 'classical mechanics', 'fluid', 'thermodynamics'
+            ]
+        },
+        'keywords': [
+            'mechanical engineering', 'mechanical', 'mechanics', 'thermodynamics', 'heat transfer',
+            'fluid mechanics', 'biofluid', 'materials science', 'manufacturing', 'machining',
+            'welding', 'fabrication', 'prototyping', 'metrology', 'cnc', 'manual machining',
+            'stress analysis', 'finite element', 'biomechanical', 'biomechanics'
+        ]
+    },
+    'civil_engineering': {
+        'text': 'full',
+        'departments': ['civil engineering', 'ce', 'civil'],
+        'id_keywords': [],
+        'department_keywords': {},
+        'keywords': [
+            'civil engineering', 'structural engineering', 'construction', 'building',
+            'infrastructure', 'transportation', 'highway', 'bridge', 'concrete',
+            'steel design', 'structural analysis', 'structural design', 'foundation',
+            'geotechnical', 'soil mechanics', 'environmental engineering', 'water resources',
+            'hydraulics', 'hydrology', 'traffic engineering', 'urban planning',
+            'construction management', 'project management', 'civil design',
+            'civil systems', 'civil infrastructure', 'civil construction',
+            'civil engineering design', 'civil engineering analysis'
+        ]
+    },
+    'biomedical_engineering': {
+        'text': 'full',
+        'departments': ['biomedical engineering', 'bme', 'biomedical'],
+        'id_keywords': [],
+        'department_keywords': {},
+        'keywords': [
+            'biomedical engineering', 'biomedical', 'bioengineering', 'medical devices',
+            'biomaterials', 'tissue engineering', 'biomechanics', 'physiology',
+            'anatomy', 'medical imaging', 'biomedical signals', 'biomedical systems',
+            'biomedical instrumentation', 'biomedical sensors', 'biomedical analysis',
+            'biomedical design', 'biomedical technology', 'biomedical applications',
+            'biomedical research', 'biomedical innovation', 'biomedical devices',
+            'biomedical equipment', 'biomedical software', 'biomedical data',
+            'biomedical modeling', 'biomedical simulation', 'biomedical testing'
+        ]
+    },
+    'electrical_engineering': {
+        'text': 'basic',
+        'departments': ['electrical engineering', 'ee', 'ece', 'electrical'],
+        'id_keywords': [],
+        'department_keywords': {
+            # BME courses with electrical content (BME210, BME301, BME333, BME372, BME373)
+            'biomedical engineering': [
+                'electrical', 'electronics', 'signals', 'biomedical signals', 'processing',
+                'biomedical electronics', 'medical devices', 'electrical fundamentals'
+            ],
+            # Engineering department electrical courses (ENGR203 - Remote Sensing, ENGR320 - Prototyping)
+            'engineering': [
+                'remote sensing', 'prototyping', 'electronics', 'electrical', 'sensor'
+            ],
+            'computer science': [
+                'embedded', 'microprocessor', 'digital design', 'computer architecture', 'hardware'
+            ],
+            'physics': [
+                'electricity', 'magnetism', 'electromagnetic', 'electronics', 'circuits',
+                'electrical', 'biophysics', 'radiation', 'applied physics'
+            ],
+            # Industrial Engineering courses with electronics content (IE203 - Computer Graphics)
+            'industrial engineering': [
+                'computer graphics', 'electronics', 'electrical applications'
+            ]
+        },
+        'keywords': [
+            'electrical engineering', 'electrical', 'electronics', 'circuits', 'circuit analysis',
+            'digital systems', 'analog systems', 'power systems', 'signal processing',
+            'biomedical signals', 'biomedical electronics', 'medical devices',
+            'electromagnetic', 'microelectronics', 'remote sensing', 'prototyping',
+            'electricity', 'magnetism', 'semiconductor', 'embedded systems'
+        ]
+    },
+    'industrial_engineering': {
+        'text': 'basic',
+        'departments': ['industrial engineering', 'ie', 'industrial'],
+        'id_keywords': [],
+        'department_keywords': {
+            # Engineering department industrial courses (ENGR301 - Data Science, ENGR225 - Metrology, etc.)
+            'engineering': [
+                'data science', 'metrology', 'gis', 'geographic information', 'co-op work',
+                'work experience', 'engineering applications', 'manufacturing', 'quality'
+            ],
+            'mathematics': [
+                'statistics', 'operations research', 'optimization', 'applied statistics',
+                'probability', 'data analysis', 'mathematical modeling', 'quality control'
+            ],
+            'computer science': [
+                'data science', 'operations research', 'optimization', 'systems analysis',
+                'database management', 'information systems'
+            ],
+            'management': [
+                'operations', 'supply chain', 'logistics', 'quality', 'production', 'manufacturing'
+            ],
+            'operations management': [
+                'operations', 'supply chain', 'logistics', 'quality', 'production', 'manufacturing'
+            ],
+            'architecture': [
+                'materials', 'processes', 'production', 'manufacturing'
+            ]
+        },
+        'keywords': [
+            'industrial engineering', 'industrial', 'operations research', 'optimization',
+            'quality control', 'quality assurance', 'manufacturing systems', 'production',
+            'supply chain', 'logistics', 'data science', 'engineering applications',
+            'statistical methods', 'applied statistics', 'engineering economy',
+            'computer graphics', 'process design', 'work experience', 'co-op'
+        ]
+    },
+    'environmental_engineering': {
+        'text': 'basic',
+        'departments': ['environmental engineering', 'env', 'environmental'],
+        'id_keywords': [],
+        'department_keywords': {
+            # Chemistry courses with environmental content (CHEM360, CHEM361)
+            'chemistry': [
+                'environmental', 'pollution', 'climate change', 'air pollution', 'water pollution',
+                'soil pollution', 'environmental chemistry'
+            ],
+            # STS courses with environmental content (STS360, STS362, STS363, STS364, STS382)
+            'science technology society': [
+                'environmental', 'sustainability', 'environmental economics', 'environmental ethics',
+                'geographical perspectives', 'environment', 'sustainability studies', 'sustainability policy'
+            ],
+            # Architecture courses with environmental content (ARCH295, ARCH296, ARCH309, ARCH314, ARCH571)
+            'architecture': [
+                'environmental', 'sustainability', 'environmental control', 'sustainable city',
+                'green building', 'environmental systems'
+            ],
+            'biology': [
+                'environmental', 'ecology', 'conservation', 'ecosystem', 'biodiversity'
+            ],
+            # Engineering department environmental courses (ENGR203 - Remote Sensing)
+            'engineering': [
+                'remote sensing', 'earth monitoring', 'environmental', 'sustainability'
+            ],
+            'civil engineering': [
+                'environmental', 'water resources', 'environmental engineering', 'pollution'
+            ]
+        },
+        'keywords': [
+            'environmental engineering', 'environmental', 'sustainability', 'environmental chemistry',
+            'air pollution', 'climate change', 'water pollution', 'soil pollution',
+            'environmental economics', 'environmental ethics', 'geographical perspectives',
+            'sustainability studies', 'sustainability policy', 'remote sensing',
+            'earth monitoring', 'ecology', 'conservation', 'green technology',
+            'renewable energy', 'environmental impact', 'sustainable city'
+        ]
+    }
+})
+
+
+def _compile_category(category: Dict) -> MappingProxyType:
+    """Compile one COURSE_CATEGORIES entry into its matchers"""
+    return MappingProxyType({
+        'text': category['text'],
+        'departments': frozenset(category['departments']),
+        'id_pattern': compile_keywords(category['id_keywords']) if category['id_keywords'] else None,
+        'department_patterns': MappingProxyType({
+            department: compile_keywords(keywords)
+            for department, keywords in category['department_keywords'].items()
+        }),
+        'pattern': compile_keywords(category['keywords'])
+    })
+
+
+COMPILED_CATEGORIES = MappingProxyType({
+    name: _compile_category(category) for name, category in COURSE_CATEGORIES.items()
+})
+
+
+def classify_course(course: Dict) -> Dict[str, bool]:
+    """Category flags for a course; they depend only on the catalog, never on the student"""
+    if not course:
+        return {name: False for name in COMPILED_CATEGORIES}
+
+    course_id = course.get('id', '').lower()
+    department = course.get('department', '').lower()
+    basic_text = f"{course_id} {course.get('title', '')} {course.get('description', '')}".lower()
+    texts = {
+        'basic': basic_text,
+        'full': f"{basic_text} {course.get('topics', '')}".lower()
+    }
+
+    flags = {}
+    for name, category in COMPILED_CATEGORIES.items():
+        text = texts[category['text']]
+        department_pattern = category['department_patterns'].get(department)
+        flags[name] = bool(
+            department in category['departments']
+            or (category['id_pattern'] is not None and category['id_pattern'].search(course_id))
+            or (department_pattern is not None and department_pattern.search(text))
+            or category['pattern'].search(text)
+        )
+    return flags
+
+
+# Course text terms that earn an interest family's boost in
+# RecommendationEngine.calculate_interest_score, matched as substrings of the
+# lowercased course id, title and description
+INTEREST_BOOST_TERMS = _freeze({
+    'cybersecurity': [
+        'security', 'cyber', 'encryption', 'cryptography'
+    ],
+    'mechanical_engineering': [
+        'mechanical', 'mechanics', 'thermodynamics', 'heat transfer', 'fluid mechanics',
+        'manufacturing', 'machining', 'cnc', 'cad', 'solidworks', 'autocad',
+        'mechanical design', 'machine design', 'mechanical systems', 'robotics',
+        'automation', 'control systems', 'mechanical analysis', 'stress analysis',
+        'finite element', 'fea', 'mechanical properties', 'materials science',
+        'prototyping', 'metrology', 'welding', 'woodworking', 'shop skills',
+        'tool operation', 'fabrication', 'production', 'quality control', 'dimensional',
+        'tolerancing', 'geometric', 'engineering materials', 'physical metrology',
+        'manual machining', 'cnc routing'
+    ],
+    'electrical_engineering': [
+        'electrical', 'electronics', 'circuits', 'circuit analysis', 'digital systems',
+        'analog systems', 'power systems', 'signal processing', 'biomedical signals',
+        'biomedical electronics', 'medical devices', 'electromagnetic', 'microelectronics',
+        'remote sensing', 'prototyping', 'electricity', 'magnetism', 'semiconductor',
+        'embedded systems', 'microprocessor', 'digital design', 'computer architecture',
+        'hardware', 'biophysics', 'radiation', 'applied physics'
+    ],
+    'industrial_engineering': [
+        'industrial', 'manufacturing', 'production', 'operations', 'quality', 'metrology',
+        'machining', 'gis', 'engineering applications'
+    ],
+    'environmental_engineering': [
+        'environmental', 'ecology', 'remote sensing', 'sustainability', 'climate',
+        'conservation', 'biology', 'neotropical'
+    ],
+    'ux_design': [
+        'user experience', 'designing the user experience', 'discovering user needs',
+        'usability & measuring ux', 'user interface design', 'interaction design',
+        'human computer interaction', 'user research', 'user needs for ux'
+    ],
+    'human_factors': [
+        'human factors', 'ergonomics'
+    ],
+    'mathematics': [
+        'mathematics', 'mathematical', 'calculus', 'algebra', 'geometry', 'statistics',
+        'probability', 'linear algebra', 'differential equations', 'discrete mathematics',
+        'number theory', 'topology', 'analysis', 'mathematical modeling', 'optimization',
+        'numerical analysis', 'applied mathematics', 'pure mathematics',
+        'mathematical statistics', 'combinatorics', 'graph theory', 'mathematical logic',
+        'set theory', 'real analysis', 'complex analysis', 'functional analysis',
+        'mathematical physics', 'financial mathematics', 'actuarial science',
+        'mathematical computing', 'algorithmic mathematics', 'cryptography'
+    ],
+    'architecture': [
+        'architecture', 'architectural', 'building design', 'structural', 'construction',
+        'spatial design', 'urban planning', 'design', 'modeling', 'visualization',
+        '3d modeling', 'cad', 'drafting', 'building systems', 'sustainable design',
+        'space planning', 'architectural history', 'building technology',
+        'environmental design', 'landscape architecture', 'interior design', 'urban design',
+        'architectural theory', 'building materials', 'construction management',
+        'architectural drawing', 'site planning', 'building codes',
+        'architectural engineering', 'facade design', 'adaptive reuse'
+    ],
+    'civil_engineering': [
+        'civil engineering', 'structural engineering', 'construction', 'building',
+        'infrastructure', 'transportation', 'highway', 'bridge', 'concrete', 'steel design',
+        'structural analysis', 'structural design', 'foundation', 'geotechnical',
+        'soil mechanics', 'water resources', 'hydraulics'
+    ],
+    'biomedical_engineering': [
+        'biomedical engineering', 'biomedical', 'bioengineering', 'medical devices',
+        'biomaterials', 'tissue engineering', 'biomechanics', 'physiology', 'anatomy',
+        'medical imaging', 'biomedical signals', 'biomedical systems',
+        'biomedical instrumentation', 'biomedical sensors', 'biomedical analysis'
+    ]
+})
+
+# Everything that can earn each family's boost: the family's term list plus, for the
+# families named after a COURSE_CATEGORIES entry, membership in that category
+INTEREST_BOOST_TRIGGERS = MappingProxyType({
+    'ai_ml': (),
+    'cybersecurity': INTEREST_BOOST_TERMS['cybersecurity'],
+    'mechanical_engineering': INTEREST_BOOST_TERMS['mechanical_engineering'],
+    'electrical_engineering': INTEREST_BOOST_TERMS['electrical_engineering'],
+    'industrial_engineering': INTEREST_BOOST_TERMS['industrial_engineering'],
+    'environmental_engineering': INTEREST_BOOST_TERMS['environmental_engineering'],
+    'ux_design': INTEREST_BOOST_TERMS['ux_design'] + INTEREST_BOOST_TERMS['human_factors'],
+    'mathematics': INTEREST_BOOST_TERMS['mathematics'],
+    'architecture': INTEREST_BOOST_TERMS['architecture'],
+    'civil_engineering': INTEREST_BOOST_TERMS['civil_engineering'],
+    'biomedical_engineering': INTEREST_BOOST_TERMS['biomedical_engineering'],
+})
+
+
+def interest_boost_family(interest: str) -> Optional[str]:
+    """The calculate_interest_score boost branch a lowercased interest falls into, checked in order"""
+    if 'ai' in interest or 'ml' in interest:
+        return 'ai_ml'
+    elif 'cyber' in interest or 'security' in interest:
+        return 'cybersecurity'
+    elif 'mechanical' in interest:
+        return 'mechanical_engineering'
+    elif 'electrical' in interest:
+        return 'electrical_engineering'
+    elif 'industrial' in interest:
+        return 'industrial_engineering'
+    elif 'environmental' in interest:
+        return 'environmental_engineering'
+    elif ('ux' in interest or 'design' in interest) and 'engineering' not in interest:
+        return 'ux_design'
+    elif 'mathematics' in interest or 'math' in interest:
+        return 'mathematics'
+    elif 'architecture' in interest:
+        return 'architecture'
+    elif any(term in interest for term in ['civil', 'construction']):
+        return 'civil_engineering'
+    elif any(term in interest for term in ['biomedical', 'bioengineering']):
+        return 'biomedical_engineering'
+    return None
@@ -0,0 +1,208 @@
+"""
+Password hashing for AuthManager, run off the request thread.
+
+Hashes are self-describing so the algorithm and cost can change without
+invalidating stored passwords:
+
+    pbkdf2_sha256$<iterations>$<salt>$<hex digest>
+    scrypt$<n>$<r>$<p>$<salt>$<hex digest>
+
+Hashes written before this format (64 hex characters of salt followed by the
+hex PBKDF2-SHA256 digest at 100,000 iterations) still verify; needs_rehash()
+reports them, and any hash weaker than the current default, so they can be
+upgraded on the next successful login.
+
+PasswordHasher caps how many hashes run at once on the host and per client
+IP. Each hash holds a non-blocking flock on one of max_pending slot files in
+a lock directory shared by every gunicorn worker (and one of max_per_client
+files for its client), so the caps span workers. When no slot is free the
+request fails at once with PasswordHashingBusy, instead of waiting. A burst
+of logins can therefore occupy at most max_pending workers, and the rest
+stay free for recommendation requests. Where flock is unavailable the caps
+count this process's hashes only.
+"""
+
+import hashlib
+import hmac
+import os
+import secrets
+import tempfile
+import threading
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_SCHEME = 'pbkdf2_sha256'
+PBKDF2_ITERATIONS = 100000
+SCRYPT_PARAMS = (2 ** 14, 8, 1)  # n, r, p
+
+# Stored hashes from before the self-describing format
+LEGACY_SALT_LENGTH = 64
+LEGACY_ITERATIONS = 100000
+# Client addresses share this many per-client slot files, so the lock directory stays small
+CLIENT_BUCKETS = 256
+
+
+class PasswordHashingBusy(Exception):
+    """Too many password hashes are queued, overall or for one client"""
+
+    def __init__(self, message: str, per_client: bool = False):
+        super().__init__(message)
+        self.per_client = per_client
+
+
+def hash_password(password: str, scheme: str = DEFAULT_SCHEME) -> str:
+    """Hash a password in the self-describing format"""
+    salt = secrets.token_hex(32)
+    if scheme == 'scrypt':
+        n, r, p = SCRYPT_PARAMS
+        digest = hashlib.scrypt(password.encode('utf-8'), salt=salt.encode('utf-8'), n=n, r=r, p=p,
+                                maxmem=128 * n * r * p + 1024 * 1024)
+        return f"scrypt${n}${r}${p}${salt}${digest.hex()}"
+    if scheme != 'pbkdf2_sha256':
+        raise ValueError(f"Unknown password hash scheme: {scheme}")
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode('utf-8'), PBKDF2_ITERATIONS)
+    return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${salt}${digest.hex()}"
+
+
+def verify_password(password: str, stored_hash: str) -> bool:
+    """Check a password against a stored hash in either format, in constant time"""
+    try:
+        parts = stored_hash.split('$')
+        if parts[0] == 'pbkdf2_sha256' and len(parts) == 4:
+            iterations, salt, expected = int(parts[1]), parts[2], parts[3]
+            digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode('utf-8'), iterations)
+        elif parts[0] == 'scrypt' and len(parts) == 6:
+            n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+            salt, expected = parts[4], parts[5]
+            digest = hashlib.scrypt(password.encode('utf-8'), salt=salt.encode('utf-8'), n=n, r=r, p=p,
+                                    maxmem=128 * n * r * p + 1024 * 1024)
+        elif len(parts) == 1 and len(stored_hash) > LEGACY_SALT_LENGTH:
+            salt, expected = stored_hash[:LEGACY_SALT_LENGTH], stored_hash[LEGACY_SALT_LENGTH:]
+            digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode('utf-8'),
+                                         LEGACY_ITERATIONS)
+        else:
+            return False
+        return hmac.compare_digest(digest.hex(), expected)
+    except (ValueError, TypeError, AttributeError):
+        return False
+
+
+def needs_rehash(stored_hash: str, scheme: str = DEFAULT_SCHEME) -> bool:
+    """True if the hash uses another scheme or a lower cost than new hashes would"""
+    parts = stored_hash.split('$')
+    if parts[0] != scheme:
+        return True
+    try:
+        if scheme == 'pbkdf2_sha256':
+            return int(parts[1]) < PBKDF2_ITERATIONS
+        return tuple(int(part) for part in parts[1:4]) < SCRYPT_PARAMS
+    except (ValueError, IndexError):
+        return True
+
+
+class PasswordHasher:
+    """Password hashing with host-wide and per-client caps on hashes in progress"""
+
+    def __init__(self, max_pending: int = 2, max_per_client: int = 1, lock_dir: Optional[str] = None,
+                 scheme: str = DEFAULT_SCHEME):
+        self.max_pending = max_pending
+        self.max_per_client = max_per_client
+        self.scheme = scheme
+        self.lock_dir = lock_dir or os.path.join(tempfile.gettempdir(), 'njit-advisor-password-hashing')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._pending_by_client = {}
+        # Without flock (or a writable lock directory) the caps only count this process's hashes
+        self._shared = fcntl is not None
+        if self._shared:
+            try:
+                os.makedirs(self.lock_dir, exist_ok=True)
+            except OSError as e:
+                print(f"Password hashing lock directory unavailable, capping per process: {e}")
+                self._shared = False
+
+    def hash(self, password: str, client: Optional[str] = None) -> str:
+        """Hash a new password, or raise PasswordHashingBusy when no slot is free"""
+        return self._run(client, hash_password, password, self.scheme)
+
+    def verify(self, password: str, stored_hash: str, client: Optional[str] = None) -> bool:
+        """Verify a password, or raise PasswordHashingBusy when no slot is free"""
+        return self._run(client, verify_password, password, stored_hash)
+
+    def needs_rehash(self, stored_hash: str) -> bool:
+        """True if the stored hash should be replaced after a successful login"""
+        return needs_rehash(stored_hash, self.scheme)
+
+    def stats(self) -> Dict:
+        """Hashes in progress in this process and the configured caps"""
+        with self._lock:
+            return {'pending': self._pending, 'clients': len(self._pending_by_client),
+                    'max_pending': self.max_pending, 'max_per_client': self.max_per_client,
+                    'shared': self._shared}
+
+    def _run(self, client: Optional[str], function, *args):
+        slots = self._acquire(client)
+        try:
+            return function(*args)
+        finally:
+            self._release(client, slots)
+
+    def _acquire(self, client: Optional[str]) -> List[int]:
+        """Take a client slot and a host-wide slot without waiting; returns the locked descriptors"""
+        with self._lock:
+            if not self._shared:
+                if self._pending >= self.max_pending:
+                    raise PasswordHashingBusy("Too many sign-in requests in progress, please try again shortly")
+                if client is not None and self._pending_by_client.get(client, 0) >= self.max_per_client:
+                    raise PasswordHashingBusy("Too many sign-in requests from this address, please wait",
+                                              per_client=True)
+            self._pending += 1
+            if client is not None:
+                self._pending_by_client[client] = self._pending_by_client.get(client, 0) + 1
+        if not self._shared:
+            return []
+
+        slots = []
+        try:
+            if client is not None:
+                bucket = int(hashlib.sha1(client.encode('utf-8')).hexdigest()[:8], 16) % CLIENT_BUCKETS
+                slots.append(self._lock_slot(f"client-{bucket}", self.max_per_client))
+                if slots[-1] is None:
+                    raise PasswordHashingBusy("Too many sign-in requests from this address, please wait",
+                                              per_client=True)
+            slots.append(self._lock_slot('hash', self.max_pending))
+            if slots[-1] is None:
+                raise PasswordHashingBusy("Too many sign-in requests in progress, please try again shortly")
+            return slots
+        except BaseException:
+            self._release(client, slots)
+            raise
+
+    def _lock_slot(self, name: str, count: int) -> Optional[int]:
+        """Lock the first free one of `count` slot files, or None when every slot is taken"""
+        for number in range(count):
+            fd = os.open(os.path.join(self.lock_dir, f"{name}-{number}.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                os.close(fd)
+        return None
+
+    def _release(self, client: Optional[str], slots: List[Optional[int]]) -> None:
+        # Closing the descriptor drops its flock; a crashed process's slots are freed the same way
+        for fd in slots:
+            if fd is not None:
+                os.close(fd)
+        with self._lock:
+            self._pending -= 1
+            if client is not None:
+                remaining = self._pending_by_client.get(client, 1) - 1
+                if remaining > 0:
+                    self._pending_by_client[client] = remaining
+                else:
+                    self._pending_by_client.pop(client, None)
@@ -1,33 +1,71 @@
 import numpy as np
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.preprocessing import StandardScaler
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import PorterStemmer
 import re
+import heapq
+import time
+from functools import lru_cache
 from typing import List, Dict, Tuple
+from src.course_matrix import CourseMatrix, estimate_student_level
+from src.inverted_index import InvertedIndex
+from src.keywords import (ENHANCED_KEYWORDS, INTEREST_BOOST_TERMS, INTEREST_BOOST_TRIGGERS,
+                          classify_course, interest_boost_family)
+from src.result_cache import ResultCache, profile_key
+from src.similarity_index import SimilarityIndex, similarity_digest
+from src.text_processing import ENGLISH_STOPWORDS, tokenize
 import warnings
 warnings.filterwarnings('ignore')
 
-# Download required NLTK data
-try:
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
-except Exception as e:
-    # Fallback for production environments where downloads might fail
-    print(f"NLTK download warning: {e}")
-    pass
+# sklearn and NLTK take seconds to import; they are loaded on first use (see
+# load_text_pipeline and build_corpus_index) so importing this module stays cheap
+
+# Porter stems cached per word; the catalog vocabulary is a few thousand words
+STEM_CACHE_SIZE = 16384
+# Neighbours precomputed per course for get_similar_courses
+SIMILAR_COURSES_TOP_N = 20
+NON_ALPHA_PATTERN = re.compile(r'[^a-zA-Z\s]')
 
 class RecommendationEngine:
-    def __init__(self, data_manager):
+    def __init__(self, data_manager, scoring_mode: str = 'vectorized',
+                 result_cache_size: int = 256, result_cache_ttl: float = 600.0,
+                 tokenizer: str = 'fast', candidate_pruning: bool = True,
+                 persist_similarities: bool = False):
         self.data_manager = data_manager
-        self.vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
-        self.scaler = StandardScaler()
-        self.stemmer = PorterStemmer()
-        self.stop_words = set(stopwords.words('english')) if nltk.data.find('corpora/stopwords') else set()
+        # 'vectorized' scores the numeric components over the CourseMatrix columns,
+        # 'per_course' calls the calculate_* scorers for every course dict
+        self.scoring_mode = scoring_mode
+        # 'fast' uses the bundled tokenizer and stopwords with a memoized stemmer,
+        # 'nltk' uses word_tokenize and the NLTK stopword corpus (needs punkt data)
+        self.tokenizer = tokenizer
+        # Skip the text scorers for courses the inverted index shows cannot match the query
+        self.candidate_pruning = candidate_pruning
+        # Per-profile scored rows, reused across students with the same preferences
+        self.result_cache = ResultCache(maxsize=result_cache_size, ttl=result_cache_ttl)
+        # Tokenizer, stemmer and stopwords, set by load_text_pipeline() on first use
+        self.word_tokenize = None
+        self.stop_words = set()
+        self.stemmer = None
+        self.stem = None
+        
+        # Per-catalog store of preprocessed course text, keyed by course id
+        self.course_text_cache = {}
+        # Query strings repeat across courses and requests; memoize their preprocessing
+        self.preprocess_query = lru_cache(maxsize=512)(self.preprocess_text)
+        
+        # Corpus-wide TF-IDF index, fitted once per catalog by build_corpus_index()
+        self.corpus_vectorizer = None
+        self.corpus_rows = {}
+        self.interest_matrix = None
+        self.topic_matrix = None
+        self._corpus_signature = None
+        self._corpus_version = None
+        # Columnar copy of the catalog for vectorized scoring, rebuilt with every catalog version
+        self.course_matrix = None
+        # Token/phrase/department postings for candidate pruning, rebuilt with the corpus index
+        self.inverted_index = None
+        # Top-N similar courses per course, refreshed with the corpus index; optionally
+        # loaded from and saved to the course_similarities table
+        self.similarity_index = SimilarityIndex(top_n=SIMILAR_COURSES_TOP_N)
+        self.persist_similarities = persist_similarities
+        self.similarity_status = None
         
         # Comprehensive career goal to course topic mapping
         self.career_mappings = {
@@ -83,179 +121,233 @@ class RecommendationEngine:
             'research': ['research', 'algorithms', 'theory', 'computational complexity', 'research methods']
         }
     
+    def load_text_pipeline(self) -> None:
+        """Set up the tokenizer, stemmer and stopwords for the configured tokenizer mode"""
+        # The Porter stemmer is pure code; only the 'nltk' mode needs downloaded data
+        from nltk.stem.porter import PorterStemmer
+        stemmer = PorterStemmer()
+        
+        if self.tokenizer == 'nltk':
+            import nltk
+            from nltk.corpus import stopwords
+            from nltk.tokenize import word_tokenize
+            
+            # Download required NLTK data
+            try:
+                nltk.download('punkt', quiet=True)
+                nltk.download('stopwords', quiet=True)
+            except Exception as e:
+                # Fallback for production environments where downloads might fail
+                print(f"NLTK download warning: {e}")
+            
+            self.word_tokenize = word_tokenize
+            self.stop_words = set(stopwords.words('english')) if nltk.data.find('corpora/stopwords') else set()
+            self.stem = stemmer.stem
+        else:
+            self.word_tokenize = tokenize
+            self.stop_words = ENGLISH_STOPWORDS
+            self.stem = lru_cache(maxsize=STEM_CACHE_SIZE)(stemmer.stem)
+        # Assigned last: preprocess_text treats a stemmer as "pipeline ready"
+        self.stemmer = stemmer
+    
     def preprocess_text(self, text: str) -> str:
         """Clean and preprocess text for analysis"""
         if not text:
             return ""
+        if self.stemmer is None:
+            self.load_text_pipeline()
         
         # Convert to lowercase and remove special characters
-        text = re.sub(r'[^a-zA-Z\s]', '', text.lower())
+        text = NON_ALPHA_PATTERN.sub('', text.lower())
         
         # Tokenize and remove stopwords
-        words = word_tokenize(text)
-        words = [self.stemmer.stem(word) for word in words if word not in self.stop_words]
+        words = self.word_tokenize(text)
+        words = [self.stem(word) for word in words if word not in self.stop_words]
         
         return ' '.join(words)
     
-    def calculate_interest_score(self, course: Dict, interests: List[str]) -> float:
-        """Calculate how well a course matches student interests"""
-        if not interests:
-            return 0.5  # Neutral score
+    def course_interest_text(self, course: Dict) -> str:
+        """Raw course text used for interest matching"""
+        return f"{course.get('title', '')} {course.get('description', '')} {course.get('topics', '')}"
+    
+    def course_content_text(self, course: Dict) -> str:
+        """Raw course text used for specific topic matching"""
+        return f"{course.get('title', '')} {course.get('description', '')} {course.get('topics', '')} {course.get('career_relevance', '')}"
+    
+    def preprocess_course(self, course: Dict) -> Dict:
+        """Tokenize, stem and lowercase all the text fields the scorers need for one course"""
+        interest_text = self.preprocess_text(self.course_interest_text(course))
+        content_text = self.preprocess_text(self.course_content_text(course))
+        similarity_text = self.preprocess_text(f"{course.get('description', '')} {course.get('topics', '')}")
+        interest_tokens = interest_text.split()
+        content_tokens = content_text.split()
+        
+        return {
+            'interest_text': interest_text,
+            'interest_tokens': interest_tokens,
+            'interest_token_set': frozenset(interest_tokens),
+            'content_text': content_text,
+            'content_tokens': content_tokens,
+            'content_token_set': frozenset(content_tokens),
+            'similarity_text': similarity_text,
+            'raw_text': f"{course.get('id', '')} {course.get('title', '')} {course.get('description', '')}".lower(),
+            # Keyword categories never depend on the student, so classify once per catalog load
+            'categories': classify_course(course)
+        }
+    
+    def get_course_text(self, course: Dict) -> Dict:
+        """Preprocessed text for a course, served from the per-catalog store when available"""
+        cached = self.course_text_cache.get(course.get('id'))
+        if cached is not None:
+            return cached
+        return self.preprocess_course(course)
+    
+    def _catalog_signature(self, courses: List[Dict]) -> int:
+        """Cheap fingerprint of the catalog text used to detect catalog changes"""
+        return hash(tuple(
+            (course.get('id'), course.get('title'), course.get('description'),
+             course.get('topics'), course.get('career_relevance'), course.get('department'))
+            for course in courses
+        ))
+    
+    def build_corpus_index(self, courses: List[Dict]) -> None:
+        """Fit one TF-IDF vectorizer over the whole catalog and keep the sparse document matrices"""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        
+        # Rebuild the preprocessed text store alongside the index so both track the same catalog
+        self.course_text_cache = {course['id']: self.preprocess_course(course) for course in courses}
+        self.inverted_index = InvertedIndex(courses, [self.course_text_cache[course['id']] for course in courses])
+        content_docs = [self.course_text_cache[course['id']]['content_text'] for course in courses]
+        interest_docs = [self.course_text_cache[course['id']]['interest_text'] for course in courses]
+        
+        self.corpus_rows = {course['id']: row for row, course in enumerate(courses)}
+        self.corpus_vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
+        try:
+            self.topic_matrix = self.corpus_vectorizer.fit_transform(content_docs)
+            self.interest_matrix = self.corpus_vectorizer.transform(interest_docs)
+        except ValueError:
+            # Empty catalog or no usable vocabulary
+            self.corpus_vectorizer = None
+            self.topic_matrix = None
+            self.interest_matrix = None
+        
+        self._corpus_signature = self._catalog_signature(courses)
+    
+    def ensure_corpus_index(self, snapshot=None) -> None:
+        """Build the corpus index and course matrix on first use and refresh them when the catalog changes"""
+        if snapshot is None:
+            snapshot = self.data_manager.get_catalog_snapshot()
+        if snapshot.version == self._corpus_version:
+            return
+        # Rating updates bump the catalog version too; only refit when the course text changed
+        if self._catalog_signature(snapshot.courses) != self._corpus_signature:
+            self.build_corpus_index(snapshot.courses)
+            self.similarity_status = self.refresh_similarities(snapshot.courses)
+        # The matrix holds ratings, so it follows every version change
+        self.course_matrix = CourseMatrix(snapshot.courses)
+        self._corpus_version = snapshot.version
+    
+    def refresh_similarities(self, courses: List[Dict]) -> str:
+        """Bring the similar-course lists up to date, reusing the persisted copy when it matches"""
+        digest = similarity_digest(courses)
+        if digest == self.similarity_index.digest:
+            return 'unchanged'
+        
+        top_n = self.similarity_index.top_n
+        if self.persist_similarities and self.similarity_index.vectorizer is None:
+            stored = self.data_manager.load_course_similarities(digest, top_n)
+            if stored is not None:
+                self.similarity_index.load(stored, digest)
+                return 'loaded'
+        
+        status = self.similarity_index.update(
+            [course['id'] for course in courses],
+            [self.get_course_text(course)['similarity_text'] for course in courses],
+            digest
+        )
+        if self.persist_similarities:
+            self.data_manager.save_course_similarities(self.similarity_index.neighbors, digest, top_n)
+        return status
+    
+    def warm_up(self) -> Dict:
+        """Build every per-catalog structure up front and report what was built"""
+        start = time.perf_counter()
+        snapshot = self.data_manager.get_catalog_snapshot()
+        self.ensure_corpus_index(snapshot)
+        
+        return {
+            'catalog_version': snapshot.version,
+            'courses': len(snapshot),
+            'vocabulary_size': len(self.corpus_vectorizer.vocabulary_) if self.corpus_vectorizer is not None else 0,
+            'classified_courses': sum(
+                1 for features in self.course_text_cache.values() if any(features['categories'].values())
+            ),
+            'similarity_index': self.similarity_status,
+            'seconds': round(time.perf_counter() - start, 3)
+        }
+    
+    def corpus_similarities(self, matrix, query_text: str):
+        """Cosine similarity between a preprocessed query and every course in the corpus"""
+        if matrix is None or self.corpus_vectorizer is None or not query_text:
+            return None
+        query_vector = self.corpus_vectorizer.transform([query_text])
+        # Rows are L2-normalized by the vectorizer, so a sparse dot product is the cosine
+        return (matrix @ query_vector.T).toarray().ravel()
+    
+    def interest_candidate_rows(self, interests: List[str]):
+        """Rows whose interest score can be non-zero, or None when every course needs scoring"""
+        if not interests or self.inverted_index is None:
+            return None
+        interest_text = self.expand_interests(interests)
+        if not interest_text:
+            return None
+        
+        # Without a shared term the TF-IDF and keyword parts are zero, so only a boost
+        # rule (category flag or boost term) can lift the score
+        index = self.inverted_index
+        rows = index.rows_with_tokens(interest_text.split(), 'interest') | index.empty_interest_rows
+        for interest in interests:
+            family = interest_boost_family(interest.lower())
+            if family is None:
+                continue
+            rows |= index.category_rows.get(family, set())
+            rows |= index.rows_with_phrases(INTEREST_BOOST_TRIGGERS[family])
+        return rows
+    
+    def topic_candidate_rows(self, specific_topics: str):
+        """Rows whose topic score can exceed its phrase-match part, or None when every course needs scoring"""
+        if not specific_topics or not specific_topics.strip() or self.inverted_index is None:
+            return None
+        topics_text = self.preprocess_query(specific_topics)
+        if not topics_text:
+            return None
+        
+        expanded_topics = self.expand_topic_words(set(topics_text.split()))
+        index = self.inverted_index
+        return index.rows_with_tokens(expanded_topics, 'content') | index.empty_content_rows
+    
+    def tfidf_similarity(self, matrix, course: Dict, course_text: str, query_text: str) -> float:
+        """Cosine similarity between one course and a preprocessed query using the corpus index"""
+        if self._corpus_signature is None:
+            self.ensure_corpus_index()
+        if matrix is None or self.corpus_vectorizer is None:
+            return 0.0
         
-        course_text = f"{course.get('title', '')} {course.get('description', '')} {course.get('topics', '')}"
-        course_text = self.preprocess_text(course_text)
+        query_vector = self.corpus_vectorizer.transform([query_text])
+        row = self.corpus_rows.get(course.get('id'))
+        if row is not None:
+            course_vector = matrix[row]
+        else:
+            # Course outside the indexed catalog: project it onto the corpus vocabulary
+            course_vector = self.corpus_vectorizer.transform([course_text])
         
+        return float(course_vector.multiply(query_vector).sum())
+    
+    def expand_interests(self, interests: List[str]) -> str:
+        """Expand interests with related keywords and return the preprocessed query text"""
         # Enhanced keyword expansion for better cross-department matching
         expanded_interests = []
         
-        # Comprehensive keyword mappings for better cross-department matching
-        ENHANCED_KEYWORDS = {
-            'cybersecurity': [
-                'security', 'cyber', 'cybersecurity', 'encryption', 'firewall', 
-                'network security', 'information security', 'protection', 'vulnerability',
-                'authentication', 'authorization', 'cryptography', 'secure', 'privacy',
-                'risk management', 'threat', 'defense', 'forensics', 'penetration',
-                'malware', 'intrusion', 'incident response', 'compliance'
-            ],
-            'ux_design': [
-                'user experience', 'user interface', 'ui', 'ux', 'usability', 
-                'human computer interaction', 'interface design', 'user centered',
-                'interaction design', 'user research', 'design thinking', 'hci',
-                'user needs', 'user testing', 'prototyping', 'wireframe',
-                'accessibility', 'ergonomics', 'human factors', 'persona'
-            ],
-            'mechanical_engineering': [
-                'mechanical', 'engineering design', 'manufacturing', 'systems design',
-                'product design', 'cad', 'modeling', 'simulation', 'automation',
-                'robotics', 'control systems', 'mechanics', 'materials', 'thermal',
-                'fluid dynamics', 'design optimization', 'prototype', 'machining',
-                'assembly', 'tolerance', 'quality', 'reliability', 'testing',
-                'production', 'process design', 'tooling', 'fixtures',
-                'mechanical systems', 'machine design', 'heat transfer', 'vibrations',
-                'mechanical analysis', 'engineering mechanics', 'solid mechanics',
-                'manufacturing processes', 'quality control', 'engineering materials',
-                'mechanical engineering', 'design engineering', 'product development'
-            ],
-            'environmental_science': [
-                'environmental', 'sustainability', 'ecology', 'climate', 'green',
-                'renewable', 'conservation', 'environmental data', 'gis',
-                'remote sensing', 'environmental monitoring', 'pollution',
-                'ecosystem', 'biodiversity', 'carbon', 'energy efficiency',
-                'water quality', 'air quality', 'soil', 'waste management',
-                'environmental impact', 'assessment', 'geographic', 'spatial'
-            ],
-            'architecture': [
-                'architecture', 'architectural', 'building design', 'structural',
-                'construction', 'spatial design', 'urban planning', 'design',
-                'modeling', 'visualization', '3d modeling', 'cad', 'drafting',
-                'building systems', 'sustainable design', 'space planning',
-                'architectural history', 'building technology', 'environmental design',
-                'landscape architecture', 'interior design', 'urban design',
-                'architectural theory', 'building materials', 'construction management',
-                'architectural drawing', 'site planning', 'building codes',
-                'architectural engineering', 'facade design', 'adaptive reuse'
-            ],
-            'mathematics': [
-                'mathematics', 'mathematical', 'calculus', 'algebra', 'geometry',
-                'statistics', 'probability', 'linear algebra', 'differential equations',
-                'discrete mathematics', 'number theory', 'topology', 'analysis',
-                'mathematical modeling', 'optimization', 'numerical analysis',
-                'applied mathematics', 'pure mathematics', 'mathematical statistics',
-                'combinatorics', 'graph theory', 'mathematical logic', 'set theory',
-                'real analysis', 'complex analysis', 'functional analysis',
-                'mathematical physics', 'financial mathematics', 'actuarial science',
-                'mathematical computing', 'algorithmic mathematics', 'cryptography'
-            ],
-            'web_development': [
-                'web', 'website', 'html', 'css', 'javascript', 'frontend', 'backend',
-                'react', 'node', 'express', 'http', 'api', 'rest', 'json',
-                'responsive', 'bootstrap', 'jquery', 'php', 'mysql'
-            ],
-            'data_science': [
-                'data science', 'data analysis', 'statistics', 'analytics',
-                'visualization', 'machine learning', 'big data', 'pandas',
-                'python', 'r', 'sql', 'database', 'mining', 'warehouse'
-            ],
-            'mobile_development': [
-                'mobile', 'android', 'ios', 'app development', 'smartphone',
-                'tablet', 'swift', 'kotlin', 'react native', 'flutter'
-            ],
-            'game_development': [
-                'game', 'gaming', 'unity', 'graphics', '3d', 'animation',
-                'interactive', 'simulation', 'physics', 'rendering'
-            ],
-            # New interests - using exact form values as keys
-            'cloud computing devops aws azure infrastructure': [
-                'cloud', 'aws', 'azure', 'devops', 'infrastructure', 'kubernetes',
-                'docker', 'containerization', 'microservices', 'serverless',
-                'deployment', 'ci/cd', 'automation', 'scalability', 'virtualization'
-            ],
-            'mobile development ios android apps': [
-                'mobile', 'android', 'ios', 'app development', 'smartphone',
-                'tablet', 'swift', 'kotlin', 'react native', 'flutter'
-            ],
-            'game development unity programming graphics': [
-                'game', 'gaming', 'unity', 'graphics', '3d', 'animation',
-                'interactive', 'simulation', 'physics', 'rendering'
-            ],
-            'electrical engineering electronics circuits power': [
-                'electrical', 'electronics', 'circuits', 'power', 'signal processing',
-                'communications', 'control systems', 'embedded systems', 'vlsi',
-                'analog', 'digital', 'microprocessors', 'sensors', 'instrumentation'
-            ],
-            'industrial engineering operations supply chain systems': [
-                'industrial', 'operations', 'supply chain', 'systems', 'optimization',
-                'lean', 'six sigma', 'quality', 'productivity', 'logistics',
-                'ergonomics', 'human factors', 'process improvement', 'efficiency'
-            ],
-            'environmental engineering sustainability green technology': [
-                'environmental engineering', 'sustainability', 'green technology',
-                'water treatment', 'air pollution', 'waste management', 'remediation',
-                'renewable energy', 'environmental impact', 'ecology'
-            ],
-            'finance accounting economics financial analysis': [
-                'finance', 'accounting', 'economics', 'financial analysis', 'investment',
-                'banking', 'financial modeling', 'risk management', 'portfolio',
-                'budgeting', 'cost accounting', 'auditing', 'taxation'
-            ],
-            'physics engineering physics applied physics': [
-                'physics', 'engineering physics', 'applied physics', 'quantum',
-                'mechanics', 'thermodynamics', 'electromagnetism', 'optics',
-                'nuclear', 'computational physics', 'materials physics'
-            ],
-            'communication media journalism public relations': [
-                'communication', 'media', 'journalism', 'public relations', 'writing',
-                'reporting', 'broadcasting', 'digital media', 'social media',
-                'public speaking', 'rhetoric', 'mass communication', 'storytelling'
-            ],
-            'science technology society ethics innovation policy': [
-                'science technology society', 'sts', 'ethics', 'policy', 'innovation',
-                'social impact', 'technology ethics', 'digital divide', 'sustainability',
-                'environmental policy', 'science policy', 'technology assessment',
-                'social responsibility', 'public understanding', 'science communication'
-            ],
-            'psychology human behavior cognitive science': [
-                'psychology', 'human behavior', 'cognitive science', 'mental health',
-                'research methods', 'social psychology', 'behavioral', 'perception',
-                'learning', 'memory', 'decision making', 'human factors'
-            ],
-            'theatre performing arts drama production': [
-                'theatre', 'performing arts', 'drama', 'production', 'acting',
-                'directing', 'stage design', 'lighting', 'sound', 'costume',
-                'performance', 'creative writing', 'dramatic arts'
-            ],
-            'history humanities culture literature': [
-                'history', 'humanities', 'culture', 'literature', 'philosophy',
-                'anthropology', 'sociology', 'cultural studies', 'critical thinking',
-                'research', 'writing', 'analysis', 'interpretation'
-            ],
-            'health wellness physical education sports': [
-                'health', 'wellness', 'physical education', 'sports', 'fitness',
-                'nutrition', 'exercise science', 'kinesiology', 'public health',
-                'healthcare', 'medicine', 'therapy', 'rehabilitation'
-            ]
-        }
-        
         for interest in interests:
             # Add enhanced keywords for specific interests
             if interest.lower() in ENHANCED_KEYWORDS:
@@ -270,7 +362,18 @@ class RecommendationEngine:
                 expanded_interests.append(interest)
         
         interest_text = ' '.join(expanded_interests)
-        interest_text = self.preprocess_text(interest_text)
+        interest_text = self.preprocess_query(interest_text)
+        
+        return interest_text
+    
+    def calculate_interest_score(self, course: Dict, interests: List[str], tfidf_similarity: float = None) -> float:
+        """Calculate how well a course matches student interests"""
+        if not interests:
+            return 0.5  # Neutral score
+        
+        course_features = self.get_course_text(course)
+        course_text = course_features['interest_text']
+        interest_text = self.expand_interests(interests)
         
         if not course_text or not interest_text:
             return 0.5
@@ -278,18 +381,14 @@ class RecommendationEngine:
         # Enhanced matching: TF-IDF + keyword overlap
         score = 0.0
         
-        # 1. TF-IDF similarity (60% weight)
-        try:
-            texts = [course_text, interest_text]
-            tfidf_matrix = self.vectorizer.fit_transform(texts)
-            tfidf_similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-            score += 0.6 * float(tfidf_similarity)
-        except:
-            pass
+        # 1. TF-IDF similarity (60% weight) against the corpus-wide index
+        if tfidf_similarity is None:
+            tfidf_similarity = self.tfidf_similarity(self.interest_matrix, course, course_text, interest_text)
+        score += 0.6 * float(tfidf_similarity)
         
         # 2. Direct keyword matching (40% weight)
-        course_words = set(course_text.lower().split())
-        interest_words = set(interest_text.lower().split())
+        course_words = course_features['interest_token_set']
+        interest_words = set(interest_text.split())
         
         # Count overlapping words
         overlap = len(course_words.intersection(interest_words))
@@ -300,12 +399,13 @@ class RecommendationEngine:
             score += 0.4 * keyword_score
         
         # Smart course boosting based on interest type
+        course_text_lower = course_features['raw_text']
         for interest in interests:
             interest_lower = interest.lower()
-            course_text_lower = f"{course.get('id', '')} {course.get('title', '')} {course.get('description', '')}".lower()
+            family = interest_boost_family(interest_lower)
             
             # AI/ML boost (existing logic)
-            if 'ai' in interest_lower or 'ml' in interest_lower:
+            if family == 'ai_ml':
                 if self.is_ai_ml_course(course):
                     if course.get('id', '').startswith('CS') and any(term in course.get('title', '').lower() for term in ['artificial intelligence', 'machine learning']):
                         score += 0.8  # Maximum boost for core CS AI/ML courses
@@ -315,8 +415,8 @@ class RecommendationEngine:
                     score *= 0.3
             
             # Cybersecurity boost
-            elif 'cyber' in interest_lower or 'security' in interest_lower:
-                if any(term in course_text_lower for term in ['security', 'cyber', 'encryption', 'cryptography']):
+            elif family == 'cybersecurity':
+                if any(term in course_text_lower for term in INTEREST_BOOST_TERMS['cybersecurity']):
                     if any(term in course_text_lower for term in ['cybersecurity', 'network security', 'information security']):
                         score += 0.7  # High boost for core security courses
                     else:
@@ -324,53 +424,33 @@ class RecommendationEngine:
             
             # ENGINEERING INTERESTS FIRST - Check all engineering disciplines before other design interests
             # MECHANICAL ENGINEERING boost - MASSIVE INTEREST-BASED WEIGHTING
-            elif 'mechanical' in interest_lower:
+            elif family == 'mechanical_engineering':
                 if self.is_mechanical_engineering_course(course):
                     # MASSIVE BOOST FOR ANY MECHANICAL-RELATED COURSE REGARDLESS OF DEPARTMENT
                     score += 2.0  # HUGE boost for mechanical courses (INTEREST FIRST!)
-                elif any(term in course_text_lower for term in [
-                    'mechanical', 'mechanics', 'thermodynamics', 'heat transfer', 'fluid mechanics',
-                    'manufacturing', 'machining', 'cnc', 'cad', 'solidworks', 'autocad',
-                    'mechanical design', 'machine design', 'mechanical systems', 'robotics',
-                    'automation', 'control systems', 'mechanical analysis', 'stress analysis',
-                    'finite element', 'fea', 'mechanical properties', 'materials science',
-                    'prototyping', 'metrology', 'welding', 'woodworking', 'shop skills',
-                    'tool operation', 'fabrication', 'production', 'quality control',
-                    'dimensional', 'tolerancing', 'geometric', 'engineering materials',
-                    'physical metrology', 'manual machining', 'cnc routing'
-                ]):
+                elif any(term in course_text_lower for term in INTEREST_BOOST_TERMS['mechanical_engineering']):
                     # MASSIVE BOOST FOR ANY COURSE WITH MECHANICAL KEYWORDS (INTEREST FIRST!)
                     score += 1.5  # HUGE boost for courses with mechanical keywords
                 elif score <= 0.1:  # Penalize completely irrelevant courses
                     score *= 0.3
             
             # ELECTRICAL ENGINEERING boost - MASSIVE INTEREST-BASED WEIGHTING
-            elif 'electrical' in interest_lower:
+            elif family == 'electrical_engineering':
                 if self.is_electrical_engineering_course(course):
                     # MASSIVE BOOST FOR ANY ELECTRICAL-RELATED COURSE REGARDLESS OF DEPARTMENT
                     score += 2.0  # HUGE boost for electrical courses (INTEREST FIRST!)
-                elif any(term in course_text_lower for term in [
-                    'electrical', 'electronics', 'circuits', 'circuit analysis', 'digital systems',
-                    'analog systems', 'power systems', 'signal processing', 'biomedical signals',
-                    'biomedical electronics', 'medical devices', 'electromagnetic', 'microelectronics',
-                    'remote sensing', 'prototyping', 'electricity', 'magnetism', 'semiconductor',
-                    'embedded systems', 'microprocessor', 'digital design', 'computer architecture',
-                    'hardware', 'biophysics', 'radiation', 'applied physics'
-                ]):
+                elif any(term in course_text_lower for term in INTEREST_BOOST_TERMS['electrical_engineering']):
                     # MASSIVE BOOST FOR ANY COURSE WITH ELECTRICAL KEYWORDS (INTEREST FIRST!)
                     score += 1.5  # HUGE boost for courses with electrical keywords
                 elif score <= 0.1:  # Penalize completely irrelevant courses
                     score *= 0.3
             
             # INDUSTRIAL ENGINEERING boost - SIMPLE AGGRESSIVE MATCHING
-            elif 'industrial' in interest_lower:
+            elif family == 'industrial_engineering':
                 if self.is_industrial_engineering_course(course):
                     # MASSIVE BOOST FOR TRUE INDUSTRIAL COURSES 
                     score += 10.0  # MASSIVE boost to ensure industrial courses always appear first!
-                elif any(term in course_text_lower for term in [
-                    'industrial', 'manufacturing', 'production', 'operations', 'quality',
-                    'metrology', 'machining', 'gis', 'engineering applications'
-                ]):
+                elif any(term in course_text_lower for term in INTEREST_BOOST_TERMS['industrial_engineering']):
                     # HUGE BOOST FOR INDUSTRIAL-RELATED KEYWORDS 
                     score += 5.0  # HUGE boost for industrial keywords
                 else:
@@ -378,14 +458,11 @@ class RecommendationEngine:
                     score *= 0.1  # Make non-industrial courses basically invisible
             
             # ENVIRONMENTAL ENGINEERING boost - SIMPLE AGGRESSIVE MATCHING
-            elif 'environmental' in interest_lower:
+            elif family == 'environmental_engineering':
                 if self.is_environmental_engineering_course(course):
                     # MASSIVE BOOST FOR TRUE ENVIRONMENTAL COURSES 
                     score += 10.0  # MASSIVE boost to ensure environmental courses always appear first!
-                elif any(term in course_text_lower for term in [
-                    'environmental', 'ecology', 'remote sensing', 'sustainability',
-                    'climate', 'conservation', 'biology', 'neotropical'
-                ]):
+                elif any(term in course_text_lower for term in INTEREST_BOOST_TERMS['environmental_engineering']):
                     # HUGE BOOST FOR ENVIRONMENTAL-RELATED KEYWORDS 
                     score += 5.0  # HUGE boost for environmental keywords
                 else:
@@ -393,13 +470,9 @@ class RecommendationEngine:
                     score *= 0.1  # Make non-environmental courses basically invisible
             
             # UX Design boost - Extremely precise matching to avoid false positives (MOVED AFTER ENGINEERING)
-            elif ('ux' in interest_lower or 'design' in interest_lower) and 'engineering' not in interest_lower:
+            elif family == 'ux_design':
                 # Check for true UX course indicators
-                is_true_ux = any(phrase in course_text_lower for phrase in [
-                    'user experience', 'designing the user experience', 'discovering user needs',
-                    'usability & measuring ux', 'user interface design', 'interaction design',
-                    'human computer interaction', 'user research', 'user needs for ux'
-                ])
+                is_true_ux = any(phrase in course_text_lower for phrase in INTEREST_BOOST_TERMS['ux_design'])
                 
                 # Exclude courses that are clearly not UX
                 is_false_positive = any(phrase in course_text_lower for phrase in [
@@ -409,23 +482,13 @@ class RecommendationEngine:
                 
                 if is_true_ux and not is_false_positive:
                     score += 0.8  # Very strong boost for true UX courses only
-                elif any(term in course_text_lower for term in ['human factors', 'ergonomics']) and not is_false_positive:
+                elif any(term in course_text_lower for term in INTEREST_BOOST_TERMS['human_factors']) and not is_false_positive:
                     score += 0.4  # Moderate boost for human factors courses
             
             
             # Mathematics boost - COMPREHENSIVE MATCHING WITH CS PRIORITY
-            elif 'mathematics' in interest_lower or 'math' in interest_lower:
-                if any(term in course_text_lower for term in [
-                    'mathematics', 'mathematical', 'calculus', 'algebra', 'geometry',
-                    'statistics', 'probability', 'linear algebra', 'differential equations',
-                    'discrete mathematics', 'number theory', 'topology', 'analysis',
-                    'mathematical modeling', 'optimization', 'numerical analysis',
-                    'applied mathematics', 'pure mathematics', 'mathematical statistics',
-                    'combinatorics', 'graph theory', 'mathematical logic', 'set theory',
-                    'real analysis', 'complex analysis', 'functional analysis',
-                    'mathematical physics', 'financial mathematics', 'actuarial science',
-                    'mathematical computing', 'algorithmic mathematics', 'cryptography'
-                ]):
+            elif family == 'mathematics':
+                if any(term in course_text_lower for term in INTEREST_BOOST_TERMS['mathematics']):
                     # Prioritize advanced mathematics courses for CS students
                     if any(term in course_text_lower for term in [
                         'discrete mathematics', 'linear algebra', 'differential equations',
@@ -441,60 +504,40 @@ class RecommendationEngine:
                         score += 0.4  # Lower boost for related mathematical courses
             
             # Architecture boost - STRENGTHENED MATCHING (SAME AS MATH PRIORITY)
-            elif 'architecture' in interest_lower:
+            elif family == 'architecture':
                 if self.is_architecture_course(course):
                     # Prioritize true Architecture department courses
                     if course.get('department', '').lower() in ['architecture', 'arch']:
                         score += 0.8  # Maximum boost for core Architecture department courses
                     else:
                         score += 0.6  # Strong boost for architecture-related courses in other departments
-                elif any(term in course_text_lower for term in [
-                    'architecture', 'architectural', 'building design', 'structural',
-                    'construction', 'spatial design', 'urban planning', 'design',
-                    'modeling', 'visualization', '3d modeling', 'cad', 'drafting',
-                    'building systems', 'sustainable design', 'space planning',
-                    'architectural history', 'building technology', 'environmental design',
-                    'landscape architecture', 'interior design', 'urban design',
-                    'architectural theory', 'building materials', 'construction management',
-                    'architectural drawing', 'site planning', 'building codes',
-                    'architectural engineering', 'facade design', 'adaptive reuse'
-                ]):
+                elif any(term in course_text_lower for term in INTEREST_BOOST_TERMS['architecture']):
                     score += 0.4  # Moderate boost for somewhat related courses
                 elif score <= 0.1:  # Penalize completely irrelevant courses
                     score *= 0.3
             
             # CIVIL ENGINEERING boost - STRENGTHENED MATCHING (SAME AS ARCHITECTURE)
-            elif any(term in interest_lower for term in ['civil', 'construction']):
+            elif family == 'civil_engineering':
                 if self.is_civil_engineering_course(course):
                     # Prioritize true Civil Engineering department courses
                     if course.get('department', '').lower() in ['civil engineering', 'ce', 'civil']:
                         score += 0.8  # Maximum boost for core CE department courses
                     else:
                         score += 0.6  # Strong boost for civil-related courses in other departments
-                elif any(term in course_text_lower for term in [
-                    'civil engineering', 'structural engineering', 'construction', 'building',
-                    'infrastructure', 'transportation', 'highway', 'bridge', 'concrete',
-                    'steel design', 'structural analysis', 'structural design', 'foundation',
-                    'geotechnical', 'soil mechanics', 'water resources', 'hydraulics'
-                ]):
+                elif any(term in course_text_lower for term in INTEREST_BOOST_TERMS['civil_engineering']):
                     score += 0.4  # Moderate boost for somewhat related courses
                 elif score <= 0.1:  # Penalize completely irrelevant courses
                     score *= 0.3
             
             # BIOMEDICAL ENGINEERING boost - STRENGTHENED MATCHING (SAME AS ARCHITECTURE)
-            elif any(term in interest_lower for term in ['biomedical', 'bioengineering']):
+            elif family == 'biomedical_engineering':
                 if self.is_biomedical_engineering_course(course):
                     # Prioritize true Biomedical Engineering department courses
                     if course.get('department', '').lower() in ['biomedical engineering', 'bme', 'biomedical']:
                         score += 0.8  # Maximum boost for core BME department courses
                     else:
                         score += 0.6  # Strong boost for biomedical-related courses in other departments
-                elif any(term in course_text_lower for term in [
-                    'biomedical engineering', 'biomedical', 'bioengineering', 'medical devices',
-                    'biomaterials', 'tissue engineering', 'biomechanics', 'physiology',
-                    'anatomy', 'medical imaging', 'biomedical signals', 'biomedical systems',
-                    'biomedical instrumentation', 'biomedical sensors', 'biomedical analysis'
-                ]):
+                elif any(term in course_text_lower for term in INTEREST_BOOST_TERMS['biomedical_engineering']):
                     score += 0.4  # Moderate boost for somewhat related courses
                 elif score <= 0.1:  # Penalize completely irrelevant courses
                     score *= 0.3
@@ -504,369 +547,44 @@ class RecommendationEngine:
         
         return min(score, 1.0)  # Cap at 1.0
     
+    def course_categories(self, course: Dict) -> Dict[str, bool]:
+        """Category flags for a course, precomputed per catalog load when available"""
+        cached = self.course_text_cache.get(course.get('id')) if course else None
+        if cached is not None:
+            return cached['categories']
+        return classify_course(course)
+    
     def is_ai_ml_course(self, course: Dict) -> bool:
         """Detect if a course is clearly AI/ML related"""
-        course_text = f"{course.get('id', '')} {course.get('title', '')} {course.get('description', '')} {course.get('topics', '')}".lower()
-        
-        # Strong AI/ML indicators
-        ai_ml_keywords = [
-            'artificial intelligence', 'machine learning', 'neural network', 'deep learning',
-            'computer vision', 'natural language processing', 'data mining', 'robotics',
-            'generative ai', 'ai', ' ml ', 'nlp', 'reinforcement learning', 'introduction to ai',
-            'intro to ai', 'introduction to machine learning', 'intro to machine learning',
-            'cs370', 'cs375', 'cs474', 'cs440', 'cs482',  # Specific course IDs
-            'federated machine learning', 'ai for temporal', 'pattern recognition'
-        ]
-        
-        # Must contain clear AI/ML keywords
-        for keyword in ai_ml_keywords:
-            if keyword in course_text:
-                return True
-        
-        # Exclude false positives (courses that contain "machine" but aren't AI/ML)
-        false_positives = [
-            'machining', 'manual', 'welding', 'routing', 'manufacturing', 'mechanical'
-        ]
-        
-        for false_pos in false_positives:
-            if false_pos in course_text:
-                return False
-        
-        return False
+        return self.course_categories(course)['ai_ml']
     
     def is_architecture_course(self, course: Dict) -> bool:
         """Detect if a course is clearly Architecture related"""
-        course_text = f"{course.get('id', '')} {course.get('title', '')} {course.get('description', '')} {course.get('topics', '')}".lower()
-        course_dept = course.get('department', '').lower()
-        
-        # Strong Architecture indicators
-        architecture_keywords = [
-            'architecture', 'architectural', 'building design', 'architectural design',
-            'design studio', 'architectural studio', 'urban planning', 'urban design',
-            'sustainable design', 'environmental design', 'architectural history',
-            'building technology', 'construction management', 'spatial design',
-            'architectural theory', 'building materials', 'architectural drawing',
-            'site planning', 'building codes', 'architectural engineering',
-            'facade design', 'adaptive reuse', 'landscape architecture',
-            'interior design', 'space planning', 'building systems',
-            'arch', 'building', 'construction', 'structural design'
-        ]
-        
-        # Architecture department courses get highest priority
-        if course_dept in ['architecture', 'arch', 'architectural']:
-            return True
-        
-        # Must contain clear Architecture keywords
-        for keyword in architecture_keywords:
-            if keyword in course_text:
-                return True
-        
-        # Exclude false positives (courses that might mention "design" but aren't architecture)
-        false_positives = [
-            'software design', 'system design', 'algorithm design', 'database design',
-            'interface design', 'web design', 'graphic design', 'game design',
-            'circuit design', 'network design', 'programming', 'computer'
-        ]
-        
-        for false_pos in false_positives:
-            if false_pos in course_text:
-                return False
-        
-        return False
+        return self.course_categories(course)['architecture']
     
     def is_mechanical_engineering_course(self, course: Dict) -> bool:
-        """COMPREHENSIVE detection of mechanical engineering courses based on database analysis"""
-        if not course:
-            return False
-        
-        course_id = course.get('id', '').upper()
-        title = course.get('title', '').lower()
-        description = course.get('description', '').lower()
-        department = course.get('department', '').lower()
-        course_text = f"{course_id} {title} {description}".lower()
-        
-        # 1. Direct Mechanical Engineering Department
-        if department in ['mechanical engineering', 'me', 'mechanical']:
-            return True
-        
-        # 2. BME courses with mechanical content (BME302, BME321, BME351, etc.)
-        if department == 'biomedical engineering' and any(keyword in course_text for keyword in [
-            'mechanical', 'mechanics', 'biomechanical', 'fluid mechanics', 'biofluid',
-            'advanced mechanics', 'mechanical fundamentals', 'stress', 'strain'
-        ]):
-            return True
-        
-        # 3. Engineering department mechanical courses (ENGR224, ENGR225, ENGR220, etc.)
-        if department == 'engineering' and any(keyword in course_text for keyword in [
-            'welding', 'machining', 'metrology', 'fabrication', 'manufacturing',
-            'prototyping', 'materials', 'manual machining', 'cnc', 'physical metrology'
-        ]):
-            return True
-        
-        # 4. Materials Science courses (MTSE courses)
-        if department == 'materials science' or 'mtse' in course_id.lower():
-            return True
-        
-        # 5. Architecture courses with mechanical/materials content
-        if department == 'architecture' and any(keyword in course_text for keyword in [
-            'materials', 'processes', 'construction', 'structural'
-        ]):
-            return True
-        
-        # 6. Physics courses with mechanical content
-        if department == 'physics' and any(keyword in course_text for keyword in [
-            'mechanics', 'classical mechanics', 'fluid', 'thermodynamics'
-        ]):
-            return True
-        
-        # 7. Any course with strong mechanical keywords
-        mechanical_keywords = [
-            'mechanical engineering', 'mechanical', 'mechanics', 'thermodynamics', 'heat transfer',
-            'fluid mechanics', 'biofluid', 'materials science', 'manufacturing', 'machining',
-            'welding', 'fabrication', 'prototyping', 'metrology', 'cnc', 'manual machining',
-            'stress analysis', 'finite element', 'biomechanical', 'biomechanics'
-        ]
-        
-        return any(keyword in course_text for keyword in mechanical_keywords)
+        """Detect mechanical engineering courses, including related courses in other departments"""
+        return self.course_categories(course)['mechanical_engineering']
     
     def is_civil_engineering_course(self, course: Dict) -> bool:
         """Detect if a course is clearly Civil Engineering related"""
-        course_text = f"{course.get('id', '')} {course.get('title', '')} {course.get('description', '')} {course.get('topics', '')}".lower()
-        course_dept = course.get('department', '').lower()
-        
-        # Strong Civil Engineering indicators
-        ce_keywords = [
-            'civil engineering', 'structural engineering', 'construction', 'building',
-            'infrastructure', 'transportation', 'highway', 'bridge', 'concrete',
-            'steel design', 'structural analysis', 'structural design', 'foundation',
-            'geotechnical', 'soil mechanics', 'environmental engineering', 'water resources',
-            'hydraulics', 'hydrology', 'traffic engineering', 'urban planning',
-            'construction management', 'project management', 'civil design',
-            'civil systems', 'civil infrastructure', 'civil construction',
-            'civil engineering design', 'civil engineering analysis'
-        ]
-        
-        # CE department courses get highest priority
-        if course_dept in ['civil engineering', 'ce', 'civil']:
-            return True
-        
-        # Must contain clear CE keywords
-        for keyword in ce_keywords:
-            if keyword in course_text:
-                return True
-        
-        return False
+        return self.course_categories(course)['civil_engineering']
     
     def is_biomedical_engineering_course(self, course: Dict) -> bool:
         """Detect if a course is clearly Biomedical Engineering related"""
-        course_text = f"{course.get('id', '')} {course.get('title', '')} {course.get('description', '')} {course.get('topics', '')}".lower()
-        course_dept = course.get('department', '').lower()
-        
-        # Strong Biomedical Engineering indicators
-        bme_keywords = [
-            'biomedical engineering', 'biomedical', 'bioengineering', 'medical devices',
-            'biomaterials', 'tissue engineering', 'biomechanics', 'physiology',
-            'anatomy', 'medical imaging', 'biomedical signals', 'biomedical systems',
-            'biomedical instrumentation', 'biomedical sensors', 'biomedical analysis',
-            'biomedical design', 'biomedical technology', 'biomedical applications',
-            'biomedical research', 'biomedical innovation', 'biomedical devices',
-            'biomedical equipment', 'biomedical software', 'biomedical data',
-            'biomedical modeling', 'biomedical simulation', 'biomedical testing'
-        ]
-        
-        # BME department courses get highest priority
-        if course_dept in ['biomedical engineering', 'bme', 'biomedical']:
-            return True
-        
-        # Must contain clear BME keywords
-        for keyword in bme_keywords:
-            if keyword in course_text:
-                return True
-        
-        return False
+        return self.course_categories(course)['biomedical_engineering']
     
     def is_electrical_engineering_course(self, course: Dict) -> bool:
-        """COMPREHENSIVE detection of electrical engineering courses based on database analysis"""
-        if not course:
-            return False
-        
-        course_id = course.get('id', '').upper()
-        title = course.get('title', '').lower()
-        description = course.get('description', '').lower()
-        department = course.get('department', '').lower()
-        course_text = f"{course_id} {title} {description}".lower()
-        
-        # 1. Direct Electrical Engineering Department
-        if department in ['electrical engineering', 'ee', 'ece', 'electrical']:
-            return True
-        
-        # 2. BME courses with electrical content (BME210, BME301, BME333, BME372, BME373)
-        if department == 'biomedical engineering' and any(keyword in course_text for keyword in [
-            'electrical', 'electronics', 'signals', 'biomedical signals', 'processing',
-            'biomedical electronics', 'medical devices', 'electrical fundamentals'
-        ]):
-            return True
-        
-        # 3. Engineering department electrical courses (ENGR203 - Remote Sensing, ENGR320 - Prototyping)
-        if department == 'engineering' and any(keyword in course_text for keyword in [
-            'remote sensing', 'prototyping', 'electronics', 'electrical', 'sensor'
-        ]):
-            return True
-        
-        # 4. Computer Science courses with electrical/electronics content
-        if department == 'computer science' and any(keyword in course_text for keyword in [
-            'embedded', 'microprocessor', 'digital design', 'computer architecture', 'hardware'
-        ]):
-            return True
-        
-        # 5. Physics courses with electrical content
-        if department == 'physics' and any(keyword in course_text for keyword in [
-            'electricity', 'magnetism', 'electromagnetic', 'electronics', 'circuits',
-            'electrical', 'biophysics', 'radiation', 'applied physics'
-        ]):
-            return True
-        
-        # 6. Industrial Engineering courses with electronics content (IE203 - Computer Graphics)
-        if department == 'industrial engineering' and any(keyword in course_text for keyword in [
-            'computer graphics', 'electronics', 'electrical applications'
-        ]):
-            return True
-        
-        # 7. Any course with strong electrical keywords
-        electrical_keywords = [
-            'electrical engineering', 'electrical', 'electronics', 'circuits', 'circuit analysis',
-            'digital systems', 'analog systems', 'power systems', 'signal processing',
-            'biomedical signals', 'biomedical electronics', 'medical devices',
-            'electromagnetic', 'microelectronics', 'remote sensing', 'prototyping',
-            'electricity', 'magnetism', 'semiconductor', 'embedded systems'
-        ]
-        
-        return any(keyword in course_text for keyword in electrical_keywords)
+        """Detect electrical engineering courses, including related courses in other departments"""
+        return self.course_categories(course)['electrical_engineering']
     
     def is_industrial_engineering_course(self, course: Dict) -> bool:
-        """COMPREHENSIVE detection of industrial engineering courses based on database analysis"""
-        if not course:
-            return False
-        
-        course_id = course.get('id', '').upper()
-        title = course.get('title', '').lower()
-        description = course.get('description', '').lower()
-        department = course.get('department', '').lower()
-        course_text = f"{course_id} {title} {description}".lower()
-        
-        # 1. Direct Industrial Engineering Department (IE224, IE203, IE334, etc.)
-        if department in ['industrial engineering', 'ie', 'industrial']:
-            return True
-        
-        # 2. Engineering department industrial courses (ENGR301 - Data Science, ENGR225 - Metrology, etc.)
-        if department == 'engineering' and any(keyword in course_text for keyword in [
-            'data science', 'metrology', 'gis', 'geographic information', 'co-op work',
-            'work experience', 'engineering applications', 'manufacturing', 'quality'
-        ]):
-            return True
-        
-        # 3. Mathematics courses with industrial/statistics content
-        if department == 'mathematics' and any(keyword in course_text for keyword in [
-            'statistics', 'operations research', 'optimization', 'applied statistics',
-            'probability', 'data analysis', 'mathematical modeling', 'quality control'
-        ]):
-            return True
-        
-        # 4. Computer Science courses with industrial applications
-        if department == 'computer science' and any(keyword in course_text for keyword in [
-            'data science', 'operations research', 'optimization', 'systems analysis',
-            'database management', 'information systems'
-        ]):
-            return True
-        
-        # 5. Management/Business courses with industrial engineering content
-        if department in ['management', 'operations management'] and any(keyword in course_text for keyword in [
-            'operations', 'supply chain', 'logistics', 'quality', 'production', 'manufacturing'
-        ]):
-            return True
-        
-        # 6. Architecture courses with industrial content
-        if department == 'architecture' and any(keyword in course_text for keyword in [
-            'materials', 'processes', 'production', 'manufacturing'
-        ]):
-            return True
-        
-        # 7. Any course with strong industrial engineering keywords
-        industrial_keywords = [
-            'industrial engineering', 'industrial', 'operations research', 'optimization',
-            'quality control', 'quality assurance', 'manufacturing systems', 'production',
-            'supply chain', 'logistics', 'data science', 'engineering applications',
-            'statistical methods', 'applied statistics', 'engineering economy',
-            'computer graphics', 'process design', 'work experience', 'co-op'
-        ]
-        
-        return any(keyword in course_text for keyword in industrial_keywords)
+        """Detect industrial engineering courses, including related courses in other departments"""
+        return self.course_categories(course)['industrial_engineering']
     
     def is_environmental_engineering_course(self, course: Dict) -> bool:
-        """COMPREHENSIVE detection of environmental engineering courses based on database analysis"""
-        if not course:
-            return False
-        
-        course_id = course.get('id', '').upper()
-        title = course.get('title', '').lower()
-        description = course.get('description', '').lower()
-        department = course.get('department', '').lower()
-        course_text = f"{course_id} {title} {description}".lower()
-        
-        # 1. Direct Environmental Engineering Department
-        if department in ['environmental engineering', 'env', 'environmental']:
-            return True
-        
-        # 2. Chemistry courses with environmental content (CHEM360, CHEM361)
-        if department == 'chemistry' and any(keyword in course_text for keyword in [
-            'environmental', 'pollution', 'climate change', 'air pollution', 'water pollution',
-            'soil pollution', 'environmental chemistry'
-        ]):
-            return True
-        
-        # 3. STS courses with environmental content (STS360, STS362, STS363, STS364, STS382)
-        if department == 'science technology society' and any(keyword in course_text for keyword in [
-            'environmental', 'sustainability', 'environmental economics', 'environmental ethics',
-            'geographical perspectives', 'environment', 'sustainability studies', 'sustainability policy'
-        ]):
-            return True
-        
-        # 4. Architecture courses with environmental content (ARCH295, ARCH296, ARCH309, ARCH314, ARCH571)
-        if department == 'architecture' and any(keyword in course_text for keyword in [
-            'environmental', 'sustainability', 'environmental control', 'sustainable city',
-            'green building', 'environmental systems'
-        ]):
-            return True
-        
-        # 5. Biology courses with environmental content
-        if department == 'biology' and any(keyword in course_text for keyword in [
-            'environmental', 'ecology', 'conservation', 'ecosystem', 'biodiversity'
-        ]):
-            return True
-        
-        # 6. Engineering department environmental courses (ENGR203 - Remote Sensing)
-        if department == 'engineering' and any(keyword in course_text for keyword in [
-            'remote sensing', 'earth monitoring', 'environmental', 'sustainability'
-        ]):
-            return True
-        
-        # 7. Civil Engineering courses with environmental content
-        if department == 'civil engineering' and any(keyword in course_text for keyword in [
-            'environmental', 'water resources', 'environmental engineering', 'pollution'
-        ]):
-            return True
-        
-        # 8. Any course with strong environmental keywords
-        environmental_keywords = [
-            'environmental engineering', 'environmental', 'sustainability', 'environmental chemistry',
-            'air pollution', 'climate change', 'water pollution', 'soil pollution',
-            'environmental economics', 'environmental ethics', 'geographical perspectives',
-            'sustainability studies', 'sustainability policy', 'remote sensing',
-            'earth monitoring', 'ecology', 'conservation', 'green technology',
-            'renewable energy', 'environmental impact', 'sustainable city'
-        ]
-        
-        return any(keyword in course_text for keyword in environmental_keywords)
+        """Detect environmental engineering courses, including related courses in other departments"""
+        return self.course_categories(course)['environmental_engineering']
     
     def get_related_departments(self, department_filter: str, interests: List[str], 
                               specific_topics: str, career_goals: str) -> List[str]:
@@ -1303,17 +1021,17 @@ class RecommendationEngine:
         # Remove duplicates and return
         return list(set(related_depts))
     
-    def calculate_semantic_topic_score(self, course: Dict, specific_topics: str) -> float:
+    def calculate_semantic_topic_score(self, course: Dict, specific_topics: str, tfidf_similarity: float = None) -> float:
         """Enhanced semantic matching for specific topics with job description relevance"""
         if not specific_topics or not specific_topics.strip():
             return 0.5  # Neutral score if no specific topics
         
         # Get course content for matching
-        course_content = f"{course.get('title', '')} {course.get('description', '')} {course.get('topics', '')} {course.get('career_relevance', '')}"
-        course_content = self.preprocess_text(course_content)
+        course_features = self.get_course_text(course)
+        course_content = course_features['content_text']
         
         # Process user's specific topics
-        topics_text = self.preprocess_text(specific_topics)
+        topics_text = self.preprocess_query(specific_topics)
         
         if not course_content or not topics_text:
             return 0.5
@@ -1321,20 +1039,31 @@ class RecommendationEngine:
         # Multi-layered semantic matching
         score = 0.0
         
-        # 1. Direct TF-IDF similarity (40% weight)
-        try:
-            texts = [course_content, topics_text]
-            tfidf_matrix = self.vectorizer.fit_transform(texts)
-            tfidf_similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-            score += 0.4 * float(tfidf_similarity)
-        except:
-            pass
+        # 1. Direct TF-IDF similarity (40% weight) against the corpus-wide index
+        if tfidf_similarity is None:
+            tfidf_similarity = self.tfidf_similarity(self.topic_matrix, course, course_content, topics_text)
+        score += 0.4 * float(tfidf_similarity)
         
         # 2. Keyword overlap with synonyms (35% weight)
-        course_words = set(course_content.lower().split())
-        topic_words = set(topics_text.lower().split())
+        course_words = course_features['content_token_set']
+        topic_words = set(topics_text.split())
+        
+        # Expand with synonyms and related terms
+        expanded_topics = self.expand_topic_words(topic_words)
+        
+        # Calculate enhanced overlap
+        overlap = len(course_words.intersection(expanded_topics))
+        if len(expanded_topics) > 0:
+            keyword_score = min(overlap / len(expanded_topics), 1.0)
+            score += 0.35 * keyword_score
         
-        # Expand with synonyms and related terms - ENHANCED FOR MATH & ARCHITECTURE
+        # 3. Phrase matching (25% weight) - look for exact phrases
+        score += self.topic_phrase_score(specific_topics, course_content)
+        
+        return min(score, 1.0)  # Cap at 1.0
+    
+    def expand_topic_words(self, topic_words: set) -> set:
+        """Preprocessed topic words plus the synonyms and related terms used for keyword overlap"""
         expanded_topics = set(topic_words)
         for topic in topic_words:
             # Add common synonyms for key terms
@@ -1373,18 +1102,14 @@ class RecommendationEngine:
             elif 'sustain' in topic:
                 expanded_topics.update(['sustainable', 'sustainability', 'green', 'environmental', 'energy', 'efficient', 'leed'])
         
-        # Calculate enhanced overlap
-        overlap = len(course_words.intersection(expanded_topics))
-        if len(expanded_topics) > 0:
-            keyword_score = min(overlap / len(expanded_topics), 1.0)
-            score += 0.35 * keyword_score
-        
-        # 3. Phrase matching (25% weight) - look for exact phrases
+        return expanded_topics
+    
+    def topic_phrase_score(self, specific_topics: str, course_content: str) -> float:
+        """Weighted share of the multi-word topic phrases found verbatim in the course content"""
         specific_lower = specific_topics.lower()
-        course_lower = course_content.lower()
+        course_lower = course_content
         
         # Extract meaningful phrases (2+ words)
-        import re
         topic_phrases = re.findall(r'\b\w+\s+\w+(?:\s+\w+)*\b', specific_lower)
         phrase_matches = 0
         
@@ -1394,9 +1119,8 @@ class RecommendationEngine:
         
         if len(topic_phrases) > 0:
             phrase_score = min(phrase_matches / len(topic_phrases), 1.0)
-            score += 0.25 * phrase_score
-        
-        return min(score, 1.0)  # Cap at 1.0
+            return 0.25 * phrase_score
+        return 0.0
     
     def calculate_career_score(self, course: Dict, career_goals: str, is_exploring: bool = False) -> float:
         """Calculate how well a course aligns with career goals"""
@@ -1668,12 +1392,56 @@ class RecommendationEngine:
         # Check if user wants to explore new fields
         is_exploring = 'explore new fields discover interdisciplinary' in ' '.join(interests + preferred_topics)
         
-        # Get all courses
-        all_courses = self.data_manager.get_all_courses()
+        # Get all courses from the shared, read-only catalog snapshot
+        snapshot = self.data_manager.get_catalog_snapshot()
+        all_courses = snapshot.courses
         
         if not all_courses:
             return []
         
+        self.ensure_corpus_index(snapshot)
+        
+        # Scored rows for this preference profile; completed courses are kept out of the key
+        cache_key = profile_key(
+            interests, specific_topics, career_goals, preferred_topics, difficulty_preference,
+            department_filter, include_cross_dept, academic_level,
+            estimate_student_level(completed_courses, academic_level)
+        )
+        # A published entry is never modified: other threads may be reading it. New rows are
+        # scored into copies and the completed entry replaces it in one put() at the end
+        cached = self.result_cache.get(cache_key, snapshot.version)
+        if cached is None:
+            cached = {'rows': {}, 'similarities': None, 'candidates': None}
+        cached_rows = dict(cached['rows'])
+        
+        # Courses with a completed prerequisite score differently for this student alone,
+        # so they are rescored every time and never cached
+        completed_ids = set(completed_courses)
+        personal_rows = set()
+        if completed_courses:
+            satisfied = self.course_matrix.satisfied_prerequisites(completed_courses)
+            personal_rows = set(np.flatnonzero(satisfied).tolist())
+        rows_to_score = [
+            row for row, course in enumerate(all_courses)
+            if course['id'] not in completed_ids and (row in personal_rows or row not in cached_rows)
+        ]
+        
+        # Score every course against the query with one sparse product per query
+        similarities = cached['similarities']
+        if similarities is None:
+            interest_similarities = None
+            if interests + preferred_topics:
+                interest_similarities = self.corpus_similarities(
+                    self.interest_matrix, self.expand_interests(interests + preferred_topics)
+                )
+            topic_similarities = None
+            if specific_topics and specific_topics.strip():
+                topic_similarities = self.corpus_similarities(
+                    self.topic_matrix, self.preprocess_query(specific_topics)
+                )
+            similarities = (interest_similarities, topic_similarities)
+        interest_similarities, topic_similarities = similarities
+        
         # Determine which departments to include
         if include_cross_dept and department_filter:
             allowed_departments = self.get_related_departments(
@@ -1685,10 +1453,51 @@ class RecommendationEngine:
         else:
             allowed_departments = [department_filter] if department_filter else []
         
-        # Calculate scores for each course
-        recommendations = []
+        # Candidate pruning: outside interest_candidates the interest score is exactly 0, outside
+        # topic_candidates the topic score is only its phrase-match part (at most 0.25), and rows
+        # outside candidate_rows are dropped by the department filter or the relevance cut below
+        candidates = cached['candidates']
+        if candidates is None:
+            interest_candidates = topic_candidates = candidate_rows = None
+            if self.candidate_pruning and self.inverted_index is not None:
+                interest_candidates = self.interest_candidate_rows(interests + preferred_topics)
+                topic_candidates = self.topic_candidate_rows(specific_topics)
+                if department_filter:
+                    candidate_rows = self.inverted_index.rows_in_departments(allowed_departments)
+                if include_cross_dept and interest_candidates is not None and topic_candidates is not None:
+                    text_rows = interest_candidates | topic_candidates
+                    candidate_rows = text_rows if candidate_rows is None else candidate_rows & text_rows
+            candidates = (interest_candidates, topic_candidates, candidate_rows)
+        interest_candidates, topic_candidates, candidate_rows = candidates
+        
+        # Vectorized mode: score the profile-independent components for the whole catalog at once
+        level_priorities = None
+        component_scores = None
+        if self.scoring_mode == 'vectorized' and self.course_matrix is not None:
+            matrix = self.course_matrix
+            component_scores = (
+                matrix.difficulty_scores(difficulty_preference).tolist(),
+                matrix.prerequisite_scores(completed_courses).tolist(),
+                matrix.popularity_scores().tolist(),
+                matrix.level_appropriateness_scores(completed_courses, academic_level).tolist(),
+                matrix.course_level_bonuses(academic_level).tolist(),
+            )
+            if academic_level:
+                level_priorities = matrix.academic_level_priorities(academic_level).tolist()
+        
+        # Calculate scores for each course not already cached
+        personal_scores = {}
         
-        for course in all_courses:
+        for row in rows_to_score:
+            course = all_courses[row]
+            if row not in personal_rows:
+                # Stays None when one of the filters below skips the course
+                cached_rows[row] = None
+            
+            # Cannot pass the department filter or the cross-department relevance cut
+            if candidate_rows is not None and row not in candidate_rows:
+                continue
+            
             # Skip if already completed
             if course['id'] in completed_courses:
                 continue
@@ -1708,97 +1517,122 @@ class RecommendationEngine:
             
             # SMART ACADEMIC LEVEL PRIORITIZATION ALGORITHM
             # Instead of hard filtering, we'll use intelligent prioritization
+            course_priority = None
             if academic_level:
-                course_id = course.get('id', '').upper()
-                course_dept = course.get('department', '').lower()
-                course_title = course.get('title', '').lower()
-                course_level = course.get('level', '').lower()
+                if level_priorities is not None:
+                    course_priority = level_priorities[row]
+                else:
+                    course_id = course.get('id', '').upper()
+                    course_dept = course.get('department', '').lower()
+                    course_title = course.get('title', '').lower()
+                    course_level = course.get('level', '').lower()
                 
-                # Extract course number from ID (MATH101, CS101, etc.)
-                import re
-                course_num_match = re.search(r'(\d{3})', course_id)
-                course_num = 300  # Default to intermediate level
-                if course_num_match:
-                    course_num = int(course_num_match.group(1))
+                    # Extract course number from ID (MATH101, CS101, etc.)
+                    import re
+                    course_num_match = re.search(r'(\d{3})', course_id)
+                    course_num = 300  # Default to intermediate level
+                    if course_num_match:
+                        course_num = int(course_num_match.group(1))
                 
-                # Determine course academic level based on number
-                if course_num < 200:
-                    course_academic_level = 'freshman'
-                elif course_num < 300:
-                    course_academic_level = 'sophomore'
-                elif course_num < 400:
-                    course_academic_level = 'junior'
-                elif course_num < 500:
-                    course_academic_level = 'senior'
-                else:
-                    course_academic_level = 'graduate'
+                    # Determine course academic level based on number
+                    if course_num < 200:
+                        course_academic_level = 'freshman'
+                    elif course_num < 300:
+                        course_academic_level = 'sophomore'
+                    elif course_num < 400:
+                        course_academic_level = 'junior'
+                    elif course_num < 500:
+                        course_academic_level = 'senior'
+                    else:
+                        course_academic_level = 'graduate'
                 
-                # SMART PRIORITIZATION ALGORITHM
-                student_level = academic_level.lower()
+                    # SMART PRIORITIZATION ALGORITHM
+                    student_level = academic_level.lower()
                 
-                # Define level priority weights based on student level
-                if student_level == 'freshman':
-                    # Freshmen: Freshman > Sophomore > Junior > Senior > Graduate
-                    level_priority = {
-                        'freshman': 1.0,    # Perfect match
-                        'sophomore': 0.8,   # Good for advanced freshmen
-                        'junior': 0.5,      # Challenging but possible
-                        'senior': 0.2,      # Very challenging
-                        'graduate': 0.1     # Usually not recommended
-                    }
-                elif student_level == 'sophomore':
-                    # Sophomores: Sophomore > Junior > Freshman > Senior > Graduate
-                    level_priority = {
-                        'sophomore': 1.0,   # Perfect match
-                        'junior': 0.9,      # Excellent for sophomores
-                        'freshman': 0.3,    # Too basic, but some might be needed
-                        'senior': 0.6,      # Challenging but good
-                        'graduate': 0.2     # Advanced
-                    }
-                elif student_level == 'junior':
-                    # Juniors: Junior > Senior > Sophomore > Graduate > Freshman
-                    level_priority = {
-                        'junior': 1.0,      # Perfect match
-                        'senior': 0.9,      # Excellent for juniors
-                        'sophomore': 0.4,   # Some might be needed
-                        'graduate': 0.7,    # Good challenge
-                        'freshman': 0.1     # Too basic
-                    }
-                elif student_level == 'senior':
-                    # Seniors: Senior > Graduate > Junior > Sophomore > Freshman
-                    level_priority = {
-                        'senior': 1.0,      # Perfect match
-                        'graduate': 0.9,    # Excellent for seniors
-                        'junior': 0.5,      # Some might be needed
-                        'sophomore': 0.2,   # Usually too basic
-                        'freshman': 0.05    # Almost never recommended
-                    }
-                else:
-                    # Graduate or unknown: Graduate > Senior > Junior > Sophomore > Freshman
-                    level_priority = {
-                        'graduate': 1.0,    # Perfect match
-                        'senior': 0.8,      # Good
-                        'junior': 0.6,      # Acceptable
-                        'sophomore': 0.3,   # Basic
-                        'freshman': 0.1     # Very basic
-                    }
+                    # Define level priority weights based on student level
+                    if student_level == 'freshman':
+                        # Freshmen: Freshman > Sophomore > Junior > Senior > Graduate
+                        level_priority = {
+                            'freshman': 1.0,    # Perfect match
+                            'sophomore': 0.8,   # Good for advanced freshmen
+                            'junior': 0.5,      # Challenging but possible
+                            'senior': 0.2,      # Very challenging
+                            'graduate': 0.1     # Usually not recommended
+                        }
+                    elif student_level == 'sophomore':
+                        # Sophomores: Sophomore > Junior > Freshman > Senior > Graduate
+                        level_priority = {
+                            'sophomore': 1.0,   # Perfect match
+                            'junior': 0.9,      # Excellent for sophomores
+                            'freshman': 0.3,    # Too basic, but some might be needed
+                            'senior': 0.6,      # Challenging but good
+                            'graduate': 0.2     # Advanced
+                        }
+                    elif student_level == 'junior':
+                        # Juniors: Junior > Senior > Sophomore > Graduate > Freshman
+                        level_priority = {
+                            'junior': 1.0,      # Perfect match
+                            'senior': 0.9,      # Excellent for juniors
+                            'sophomore': 0.4,   # Some might be needed
+                            'graduate': 0.7,    # Good challenge
+                            'freshman': 0.1     # Too basic
+                        }
+                    elif student_level == 'senior':
+                        # Seniors: Senior > Graduate > Junior > Sophomore > Freshman
+                        level_priority = {
+                            'senior': 1.0,      # Perfect match
+                            'graduate': 0.9,    # Excellent for seniors
+                            'junior': 0.5,      # Some might be needed
+                            'sophomore': 0.2,   # Usually too basic
+                            'freshman': 0.05    # Almost never recommended
+                        }
+                    else:
+                        # Graduate or unknown: Graduate > Senior > Junior > Sophomore > Freshman
+                        level_priority = {
+                            'graduate': 1.0,    # Perfect match
+                            'senior': 0.8,      # Good
+                            'junior': 0.6,      # Acceptable
+                            'sophomore': 0.3,   # Basic
+                            'freshman': 0.1     # Very basic
+                        }
                 
-                # Get the priority weight for this course
-                course_priority = level_priority.get(course_academic_level, 0.5)
+                    # Get the priority weight for this course
+                    course_priority = level_priority.get(course_academic_level, 0.5)
                 
-                # Apply the priority as a multiplier to the final score
-                # This will be applied later in the scoring
-                course['academic_level_priority'] = course_priority
+                    # Apply the priority as a multiplier to the final score
+                    # This will be applied later in the scoring
             
             # Calculate individual scores
-            interest_score = self.calculate_interest_score(course, interests + preferred_topics)
-            semantic_topic_score = self.calculate_semantic_topic_score(course, specific_topics)
+            corpus_row = self.corpus_rows[course['id']]
+            if interest_candidates is None or row in interest_candidates:
+                interest_score = self.calculate_interest_score(
+                    course, interests + preferred_topics,
+                    interest_similarities[corpus_row] if interest_similarities is not None else None
+                )
+            else:
+                interest_score = 0.0
+            if topic_candidates is None or row in topic_candidates:
+                semantic_topic_score = self.calculate_semantic_topic_score(
+                    course, specific_topics,
+                    topic_similarities[corpus_row] if topic_similarities is not None else None
+                )
+            else:
+                semantic_topic_score = self.topic_phrase_score(
+                    specific_topics, self.get_course_text(course)['content_text']
+                )
             career_score = self.calculate_career_score(course, career_goals, is_exploring)
-            difficulty_score = self.calculate_difficulty_score(course, difficulty_preference)
-            prerequisite_score = self.calculate_prerequisite_score(course, completed_courses)
-            popularity_score = self.calculate_popularity_score(course)
-            level_appropriateness = self.calculate_level_appropriateness(course, completed_courses, academic_level)
-            course_level_bonus = self.calculate_course_level_bonus(course, academic_level)
+            if component_scores is not None:
+                difficulty_score = component_scores[0][row]
+                prerequisite_score = component_scores[1][row]
+                popularity_score = component_scores[2][row]
+                level_appropriateness = component_scores[3][row]
+                course_level_bonus = component_scores[4][row]
+            else:
+                difficulty_score = self.calculate_difficulty_score(course, difficulty_preference)
+                prerequisite_score = self.calculate_prerequisite_score(course, completed_courses)
+                popularity_score = self.calculate_popularity_score(course)
+                level_appropriateness = self.calculate_level_appropriateness(course, completed_courses, academic_level)
+                course_level_bonus = self.calculate_course_level_bonus(course, academic_level)
             
             # Smart Cross-Department Weighting with Topic Priority
             if include_cross_dept:
@@ -1986,9 +1820,9 @@ class RecommendationEngine:
                     final_score += topic_boost
             
             # INTEREST-BASED BOOSTS (lower priority when specific topics provided)
+            course_text_lower = self.get_course_text(course)['raw_text']
             for interest in interests:
                 interest_lower = interest.lower()
-                course_text_lower = f"{course.get('id', '')} {course.get('title', '')} {course.get('description', '')}".lower()
                 
                 # If user provided specific topics, reduce interest boost to let topics dominate
                 if has_specific_topics:
@@ -2281,11 +2115,8 @@ class RecommendationEngine:
                 final_score += primary_dept_boost
             
             # APPLY ACADEMIC LEVEL PRIORITY MULTIPLIER
-            if 'academic_level_priority' in course:
-                academic_priority = course['academic_level_priority']
-                final_score *= academic_priority  # Apply the priority as a multiplier
-                # Store the priority for debugging
-                course['academic_level_priority_applied'] = academic_priority
+            if course_priority is not None:
+                final_score *= course_priority  # Apply the priority as a multiplier
             
             # PRECISE INTEREST MATCHING - Extract truly relevant courses only!
             all_interests_lower = ' '.join(interests).lower()
@@ -2407,32 +2238,74 @@ class RecommendationEngine:
                 else:
                     final_score = 0.1    # Suppress art courses and non-architecture courses
             
-            # Add recommendation with detailed scoring
-            recommendation = {
-                **course,
-                'recommendation_score': round(final_score, 3),
-                'saved_count': self.data_manager.get_course_saved_count(course['id']),
-                'score_breakdown': {
-                    'interest_match': round(interest_score, 3),
-                    'semantic_topic_match': round(semantic_topic_score, 3),
-                    'career_alignment': round(career_score, 3),
-                    'difficulty_fit': round(difficulty_score, 3),
-                    'prerequisites_met': round(prerequisite_score, 3),
-                    'popularity': round(popularity_score, 3),
-                    'level_appropriateness': round(level_appropriateness, 3),
-                    'course_level_bonus': round(course_level_bonus, 3)
-                },
-                'recommendation_reason': self.generate_recommendation_reason(
-                    course, interest_score, career_score, difficulty_score, prerequisite_score
-                )
-            }
-            
-            recommendations.append(recommendation)
+            # Phase one keeps only the numbers; full payloads are built for the winners below
+            scored = (
+                round(final_score, 3), course, course_priority,
+                (interest_score, semantic_topic_score, career_score, difficulty_score,
+                 prerequisite_score, popularity_score, level_appropriateness, course_level_bonus)
+            )
+            if row in personal_rows:
+                personal_scores[row] = scored
+            else:
+                cached_rows[row] = scored
+        
+        if len(cached_rows) != len(cached['rows']) or cached['similarities'] is None:
+            self.result_cache.put(cache_key, snapshot.version,
+                                  {'rows': cached_rows, 'similarities': similarities, 'candidates': candidates})
+        
+        # Merge cached and freshly scored rows in catalog order, leaving out completed courses
+        scored_courses = []
+        for row, course in enumerate(all_courses):
+            if course['id'] in completed_ids:
+                continue
+            scored = personal_scores.get(row) if row in personal_rows else cached_rows.get(row)
+            if scored is not None:
+                scored_courses.append(scored)
+        
+        # Phase two: top-K selection. heapq.nlargest matches a stable descending sort, so ties
+        # keep catalog order exactly as sorting the whole list did
+        top_scored = heapq.nlargest(num_recommendations, scored_courses, key=lambda item: item[0])
         
-        # Sort by recommendation score and return top N
-        recommendations.sort(key=lambda x: x['recommendation_score'], reverse=True)
+        # Look up saved counts for the winners only, in one query
+        saved_counts = self.data_manager.get_course_saved_counts([course['id'] for _, course, _, _ in top_scored])
         
-        return recommendations[:num_recommendations]
+        return [
+            self.build_recommendation(course, score, scores, course_priority, saved_counts.get(course['id'], 0))
+            for score, course, course_priority, scores in top_scored
+        ]
+    
+    def build_recommendation(self, course: Dict, recommendation_score: float, scores: Tuple,
+                             course_priority: float = None, saved_count: int = 0) -> Dict:
+        """Build the full recommendation payload, with score breakdown and reason, for one course"""
+        (interest_score, semantic_topic_score, career_score, difficulty_score,
+         prerequisite_score, popularity_score, level_appropriateness, course_level_bonus) = scores
+        
+        # Add recommendation with detailed scoring
+        recommendation = {
+            **course,
+            'recommendation_score': recommendation_score,
+            'saved_count': saved_count,
+            'score_breakdown': {
+                'interest_match': round(interest_score, 3),
+                'semantic_topic_match': round(semantic_topic_score, 3),
+                'career_alignment': round(career_score, 3),
+                'difficulty_fit': round(difficulty_score, 3),
+                'prerequisites_met': round(prerequisite_score, 3),
+                'popularity': round(popularity_score, 3),
+                'level_appropriateness': round(level_appropriateness, 3),
+                'course_level_bonus': round(course_level_bonus, 3)
+            },
+            'recommendation_reason': self.generate_recommendation_reason(
+                course, interest_score, career_score, difficulty_score, prerequisite_score
+            )
+        }
+        
+        if course_priority is not None:
+            # Store the priority for debugging
+            recommendation['academic_level_priority'] = course_priority
+            recommendation['academic_level_priority_applied'] = course_priority
+        
+        return recommendation
     
     def generate_recommendation_reason(self, course: Dict, interest_score: float, 
                                      career_score: float, difficulty_score: float, 
@@ -2469,34 +2342,13 @@ class RecommendationEngine:
         return f"Recommended because it {', '.join(reasons[:3])}."
     
     def get_similar_courses(self, course_id: str, num_similar: int = 5) -> List[Dict]:
-        """Find courses similar to a given course"""
-        target_course = self.data_manager.get_course_by_id(course_id)
-        if not target_course:
+        """Find courses similar to a given course from the precomputed neighbour lists"""
+        snapshot = self.data_manager.get_catalog_snapshot()
+        if course_id not in snapshot.by_id:
             return []
         
-        all_courses = self.data_manager.get_all_courses()
-        similarities = []
+        self.ensure_corpus_index(snapshot)
+        neighbors = self.similarity_index.similar(course_id, num_similar) or []
         
-        target_text = f"{target_course.get('description', '')} {target_course.get('topics', '')}"
-        target_text = self.preprocess_text(target_text)
-        
-        for course in all_courses:
-            if course['id'] == course_id:
-                continue
-            
-            course_text = f"{course.get('description', '')} {course.get('topics', '')}"
-            course_text = self.preprocess_text(course_text)
-            
-            try:
-                texts = [target_text, course_text]
-                tfidf_matrix = self.vectorizer.fit_transform(texts)
-                similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-                similarities.append((course, similarity))
-            except:
-                similarities.append((course, 0.0))
-        
-        # Sort by similarity and return top N
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        
-        return [{'course': course, 'similarity_score': score} 
-                for course, score in similarities[:num_similar]]
\ No newline at end of file
+        return [{'course': dict(snapshot.by_id[similar_id]), 'similarity_score': score}
+                for similar_id, score in neighbors if similar_id in snapshot.by_id]
@@ -0,0 +1,137 @@
+"""
+Serialized and pre-compressed JSON bodies for catalog endpoints, per catalog version.
+
+/api/courses and /api/departments return the same document until the catalog
+changes, so each worker keeps the encoded body for the current version and
+compresses it at most once per encoding. Every version gets a strong ETag
+("courses-v12-3f9a0c1d", with an encoding suffix for compressed bodies), which
+lets a client revalidate with If-None-Match and receive a 304 without the
+catalog being loaded or serialized at all.
+
+The hex part is the cache's build token: a hash of whatever besides the
+catalog decides the bytes of a body (the JSON encoder, RESPONSE_SCHEMA and the
+deployed build). A deploy that changes any of them changes every ETag, so a
+client never gets a 304 for a body the new code would write differently.
+
+Brotli is used when the optional `brotli` package is installed; gzip is always
+available.
+"""
+
+import gzip
+import hashlib
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 9
+# Bodies smaller than this aren't worth compressing
+MIN_COMPRESS_SIZE = 1024
+# Bump when the document served by a cached endpoint changes shape
+RESPONSE_SCHEMA = 1
+
+
+def build_token(*parts: str) -> str:
+    """Short hash of the encoder, build and RESPONSE_SCHEMA, for use in ETags"""
+    key = '|'.join((f"schema{RESPONSE_SCHEMA}",) + tuple(str(part) for part in parts))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]
+
+
+def make_etag(name: str, version: int, token: str, encoding: str = 'identity') -> str:
+    """Strong ETag for one version of a document in the given content coding"""
+    suffix = '' if encoding == 'identity' else f"-{encoding}"
+    return f"{name}-v{version}-{token}{suffix}"
+
+
+def supported_encodings() -> List[str]:
+    """Content codings this process can produce, in order of preference"""
+    return (['br'] if brotli is not None else []) + ['gzip', 'identity']
+
+
+class CachedBody:
+    """One serialized document with its lazily compressed variants"""
+
+    def __init__(self, name: str, version: int, token: str, body: bytes):
+        self.name = name
+        self.version = version
+        self.token = token
+        self.encoded = {'identity': body}
+        self._lock = threading.Lock()
+
+    def etag(self, encoding: str = 'identity') -> str:
+        """Strong ETag for this version in the given content coding"""
+        return make_etag(self.name, self.version, self.token, encoding)
+
+    def body(self, encoding: str = 'identity') -> bytes:
+        """Body in the given content coding, compressed on first use"""
+        body = self.encoded.get(encoding)
+        if body is None:
+            with self._lock:
+                body = self.encoded.get(encoding)
+                if body is None:
+                    body = compress(self.encoded['identity'], encoding)
+                    self.encoded[encoding] = body
+        return body
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a body with gzip or brotli"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        # mtime=0 keeps the output identical for identical input
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unsupported content coding: {encoding}")
+
+
+class ResponseCache:
+    """Latest serialized body per endpoint, replaced when its version changes"""
+
+    def __init__(self, token: str):
+        # Every body and ETag is keyed on this token as well as the catalog version
+        self.token = token
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._bodies = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, version: int, build: Callable[[], Tuple[int, bytes]]) -> CachedBody:
+        """Cached body for this version; on a miss build() returns (version it was read at, body)"""
+        cached = self._bodies.get(name)
+        if cached is not None and cached.version == version:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        # The catalog may have changed since `version` was read; the body is tagged with its own version
+        version, body = build()
+        cached = CachedBody(name, version, self.token, body)
+        with self._lock:
+            current = self._bodies.get(name)
+            # Don't let a slow request replace a newer version another thread stored
+            if current is None or current.version <= version:
+                self._bodies[name] = cached
+        return cached
+
+    def etags(self, name: str, version: int) -> List[str]:
+        """ETags of this version in every content coding this process can send"""
+        return [make_etag(name, version, self.token, encoding) for encoding in supported_encodings()]
+
+    def negotiate(self, body_size: int, choose: Callable[[List[str]], Optional[str]]) -> str:
+        """Content coding to send, given the client's best match among the supported ones"""
+        if body_size < MIN_COMPRESS_SIZE:
+            return 'identity'
+        return choose(supported_encodings()) or 'identity'
+
+    def stats(self) -> Dict:
+        """Hit/miss/304 counters and cached body sizes"""
+        with self._lock:
+            bodies = {name: {'version': cached.version,
+                             'sizes': {encoding: len(body) for encoding, body in cached.encoded.items()}}
+                      for name, cached in self._bodies.items()}
+        return {'token': self.token, 'hits': self.hits, 'misses': self.misses, 'not_modified': self.not_modified,
+                'encodings': supported_encodings(), 'bodies': bodies}
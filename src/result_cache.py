@@ -0,0 +1,107 @@
+"""
+LRU/TTL cache for recommendation results keyed on a normalized preference profile.
+
+Entries belong to one catalog version; a version change (new courses, edits or
+new ratings) empties the cache. Completed courses are deliberately not part of
+the key: an entry maps catalog rows to their scored result for the profile, and
+RecommendationEngine rescores only the rows whose prerequisites the student has
+completed before filtering the completed courses out.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase free text and collapse runs of whitespace"""
+    return ' '.join((text or '').split()).lower()
+
+
+def profile_key(interests: List[str], specific_topics: str, career_goals: str,
+                preferred_topics: List[str], difficulty_preference: str, department_filter: str,
+                include_cross_dept: bool, academic_level: str, student_level: str) -> Tuple:
+    """Canonical cache key for a recommendation request, without the completed courses"""
+    # Interest order is kept: the interest boosts apply their penalties in list order,
+    # so the same interests in another order can rank courses differently
+    return (
+        tuple(interests),
+        normalize_text(specific_topics),
+        career_goals or '',
+        tuple(preferred_topics),
+        (difficulty_preference or '').lower(),
+        department_filter or '',
+        bool(include_cross_dept),
+        (academic_level or '').lower(),
+        student_level
+    )
+
+
+class ResultCache:
+    """Thread-safe LRU cache with a per-entry TTL, tied to one catalog version"""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple, version: int) -> Optional[Dict]:
+        """Cached entry for key under the given catalog version, or None"""
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+            item = self._entries.get(key)
+            if item is not None and time.monotonic() - item[0] > self.ttl:
+                del self._entries[key]
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key: Tuple, version: int, entry: Dict) -> None:
+        """Store an entry, evicting the least recently used one when full"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+            self._entries[key] = (time.monotonic(), entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Tuple) -> None:
+        """Drop one entry if present"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'catalog_version': self.version
+            }
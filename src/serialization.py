@@ -0,0 +1,85 @@
+"""
+JSON encoding for API responses.
+
+OrjsonProvider is a drop-in Flask JSON provider that encodes and decodes with
+orjson when it is installed and falls back to Flask's standard library
+provider otherwise. Output is the same JSON document either way (keys sorted,
+compact unless the app runs in debug mode), except that non-ASCII text is
+written as UTF-8 instead of \\u escapes.
+
+lean_recommendations() turns engine results into the compact response schema:
+only the course columns the advisor page shows, the score breakdown as a list
+whose field names are sent once per response, and no debugging duplicates.
+"""
+
+from typing import Dict, List
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Course columns kept in a lean recommendation
+LEAN_COURSE_FIELDS = (
+    'id', 'title', 'description', 'credits', 'prerequisites', 'department', 'level',
+    'difficulty_rating', 'topics', 'semester_offered', 'avg_rating'
+)
+# Order of the values in a lean recommendation's breakdown list
+SCORE_BREAKDOWN_FIELDS = (
+    'interest_match', 'semantic_topic_match', 'career_alignment', 'difficulty_fit',
+    'prerequisites_met', 'popularity', 'level_appropriateness', 'course_level_bonus'
+)
+
+
+def encoder_name(provider) -> str:
+    """Encoder a Flask JSON provider writes with, including the orjson version"""
+    if isinstance(provider, OrjsonProvider) and orjson is not None:
+        return f"orjson-{orjson.__version__}"
+    return 'json'
+
+
+def lean_recommendations(recommendations: List[Dict]) -> Dict:
+    """Compact response body for a list of full recommendation dicts"""
+    items = []
+    for recommendation in recommendations:
+        item = {field: recommendation.get(field) for field in LEAN_COURSE_FIELDS}
+        breakdown = recommendation.get('score_breakdown', {})
+        item['score'] = recommendation.get('recommendation_score')
+        item['saved_count'] = recommendation.get('saved_count', 0)
+        item['breakdown'] = [breakdown.get(field) for field in SCORE_BREAKDOWN_FIELDS]
+        item['reason'] = recommendation.get('recommendation_reason', '')
+        items.append(item)
+    return {'schema': 'lean', 'breakdown_fields': list(SCORE_BREAKDOWN_FIELDS), 'recommendations': items}
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, or the standard library when orjson is missing"""
+
+    def _options(self, indent: bool = False) -> int:
+        # Numpy scalars and arrays come straight from the scoring code
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._options(indent))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,165 @@
+"""
+Precomputed course-to-course similarity for RecommendationEngine.get_similar_courses.
+
+One TF-IDF vectorizer is fitted over the preprocessed description and topics
+of every course; cosine similarity is then a sparse matrix product, and the
+top-N neighbours of each course are kept in a dict so a lookup is constant
+time. Small catalog edits are applied incrementally against the fitted
+vocabulary: only the rows whose neighbour lists can change are recomputed.
+A full refit happens when the share of changed courses is large.
+"""
+
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import vstack
+
+# Rows of the similarity matrix computed per sparse product during a full build
+BLOCK_SIZE = 256
+
+
+def similarity_digest(courses: List[Dict]) -> str:
+    """Stable fingerprint of the text the similarity index is built from"""
+    digest = hashlib.sha1()
+    for course in courses:
+        digest.update(
+            f"{course.get('id', '')}\x1f{course.get('description', '')}\x1f{course.get('topics', '')}\x1e".encode('utf-8')
+        )
+    return digest.hexdigest()
+
+
+class SimilarityIndex:
+    """Top-N most similar courses for every course in the catalog"""
+
+    def __init__(self, top_n: int = 20, refit_ratio: float = 0.1):
+        self.top_n = top_n
+        # Refit the vectorizer instead of patching rows when more than this share changed
+        self.refit_ratio = refit_ratio
+        self.digest = None
+        self.neighbors = {}
+        self.vectorizer = None
+        self.matrix = None
+        self.ids = []
+        self.rows = {}
+        self.texts = {}
+
+    def similar(self, course_id: str, limit: int) -> Optional[List[Tuple[str, float]]]:
+        """Up to `limit` (id, score) neighbours, or None when the course isn't indexed"""
+        neighbors = self.neighbors.get(course_id)
+        if neighbors is None:
+            return None
+        if limit > len(neighbors) and self.matrix is not None and course_id in self.rows:
+            # Deeper than the precomputed list: score this one course against the catalog
+            return self._top_neighbors(self.rows[course_id], limit)
+        return neighbors[:limit]
+
+    def load(self, neighbors: Dict[str, List[Tuple[str, float]]], digest: str) -> None:
+        """Use persisted neighbour lists; a later catalog change triggers a full build"""
+        self.neighbors = neighbors
+        self.digest = digest
+        self.vectorizer = None
+        self.matrix = None
+        self.ids = []
+        self.rows = {}
+        self.texts = {}
+
+    def update(self, course_ids: List[str], texts: List[str], digest: str) -> str:
+        """Bring the index up to date with the catalog; returns 'unchanged', 'incremental' or 'rebuilt'"""
+        if digest == self.digest:
+            return 'unchanged'
+
+        new_texts = dict(zip(course_ids, texts))
+        changed = [course_id for course_id in course_ids
+                   if course_id in self.texts and self.texts[course_id] != new_texts[course_id]]
+        added = [course_id for course_id in course_ids if course_id not in self.texts]
+        removed = [course_id for course_id in self.texts if course_id not in new_texts]
+
+        touched = len(changed) + len(added) + len(removed)
+        if self.vectorizer is None or touched > self.refit_ratio * max(len(course_ids), 1):
+            self.build(course_ids, texts, digest)
+            return 'rebuilt'
+
+        self._apply_changes(course_ids, new_texts, set(changed) | set(added), set(changed) | set(removed))
+        self.digest = digest
+        return 'incremental'
+
+    def build(self, course_ids: List[str], texts: List[str], digest: str) -> None:
+        """Fit the vectorizer on every course and compute all neighbour lists"""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
+        try:
+            matrix = vectorizer.fit_transform(texts).tocsr()
+        except ValueError:
+            # Empty catalog or no usable vocabulary
+            self.load({course_id: [] for course_id in course_ids}, digest)
+            return
+
+        self.vectorizer = vectorizer
+        self.matrix = matrix
+        self.ids = list(course_ids)
+        self.rows = {course_id: row for row, course_id in enumerate(self.ids)}
+        self.texts = dict(zip(course_ids, texts))
+
+        neighbors = {}
+        transposed = matrix.T.tocsc()
+        for start in range(0, len(self.ids), BLOCK_SIZE):
+            # Rows are L2-normalized, so the sparse product is the cosine similarity
+            block = (matrix[start:start + BLOCK_SIZE] @ transposed).toarray()
+            for offset, scores in enumerate(block):
+                row = start + offset
+                neighbors[self.ids[row]] = self._select(scores, row, self.top_n)
+        self.neighbors = neighbors
+        self.digest = digest
+
+    def _apply_changes(self, course_ids: List[str], new_texts: Dict[str, str],
+                       dirty: set, stale: set) -> None:
+        """Patch the matrix for changed courses and recompute the neighbour lists they affect"""
+        dirty_ids = [course_id for course_id in course_ids if course_id in dirty]
+        dirty_vectors = self.vectorizer.transform([new_texts[course_id] for course_id in dirty_ids]).tocsr()
+        dirty_rows = {course_id: index for index, course_id in enumerate(dirty_ids)}
+
+        # Unchanged courses keep their vectors: the vocabulary and IDF weights stay fitted
+        previous = self.matrix.shape[0]
+        order = [
+            previous + dirty_rows[course_id] if course_id in dirty_rows else self.rows[course_id]
+            for course_id in course_ids
+        ]
+        self.matrix = vstack([self.matrix, dirty_vectors]).tocsr()[order]
+        self.ids = list(course_ids)
+        self.rows = {course_id: row for row, course_id in enumerate(self.ids)}
+        self.texts = new_texts
+
+        neighbors = {}
+        dirty_scores = (self.matrix @ dirty_vectors.T).toarray() if dirty_ids else None
+        for row, course_id in enumerate(self.ids):
+            current = self.neighbors.get(course_id)
+            needs_refresh = (
+                course_id in dirty
+                or current is None
+                or any(neighbor_id in stale for neighbor_id, _ in current)
+            )
+            if not needs_refresh and dirty_scores is not None:
+                # A changed or new course can only matter if it reaches the current last
+                # neighbour's score, or if the list has room left
+                full = current and len(current) >= min(self.top_n, len(self.ids) - 1)
+                floor = current[-1][1] if full else -1.0
+                for index, dirty_id in enumerate(dirty_ids):
+                    if dirty_id != course_id and dirty_scores[row, index] >= floor:
+                        needs_refresh = True
+                        break
+            neighbors[course_id] = self._top_neighbors(row, self.top_n) if needs_refresh else current
+        self.neighbors = neighbors
+
+    def _top_neighbors(self, row: int, limit: int) -> List[Tuple[str, float]]:
+        """Score one course against the whole catalog and keep the best `limit`"""
+        scores = (self.matrix @ self.matrix[row].T).toarray().ravel()
+        return self._select(scores, row, limit)
+
+    def _select(self, scores: np.ndarray, row: int, limit: int) -> List[Tuple[str, float]]:
+        """Best `limit` rows by score, excluding the course itself; ties keep catalog order"""
+        scores = scores.copy()
+        scores[row] = -np.inf
+        order = np.argsort(-scores, kind='stable')[:min(limit, len(scores) - 1)]
+        return [(self.ids[index], float(scores[index])) for index in order]
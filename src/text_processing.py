@@ -0,0 +1,57 @@
+"""
+Self-contained tokenizer for the text preprocessing in RecommendationEngine.
+
+preprocess_text strips everything but ASCII letters and whitespace before
+tokenizing, so on that input NLTK's word_tokenize (punkt + Treebank rules)
+reduces to a whitespace split plus the handful of contractions the Treebank
+tokenizer breaks apart even without an apostrophe. tokenize() reproduces that
+without the punkt model, and ENGLISH_STOPWORDS bundles NLTK's English stopword
+list so no corpus download is needed.
+"""
+
+from typing import List
+
+# NLTK's English stopword corpus, verbatim
+ENGLISH_STOPWORDS = frozenset([
+    'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you', "you're", "you've",
+    "you'll", "you'd", 'your', 'yours', 'yourself', 'yourselves', 'he', 'him', 'his',
+    'himself', 'she', "she's", 'her', 'hers', 'herself', 'it', "it's", 'its', 'itself',
+    'they', 'them', 'their', 'theirs', 'themselves', 'what', 'which', 'who', 'whom', 'this',
+    'that', "that'll", 'these', 'those', 'am', 'is', 'are', 'was', 'were', 'be', 'been',
+    'being', 'have', 'has', 'had', 'having', 'do', 'does', 'did', 'doing', 'a', 'an', 'the',
+    'and', 'but', 'if', 'or', 'because', 'as', 'until', 'while', 'of', 'at', 'by', 'for',
+    'with', 'about', 'against', 'between', 'into', 'through', 'during', 'before', 'after',
+    'above', 'below', 'to', 'from', 'up', 'down', 'in', 'out', 'on', 'off', 'over', 'under',
+    'again', 'further', 'then', 'once', 'here', 'there', 'when', 'where', 'why', 'how',
+    'all', 'any', 'both', 'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no',
+    'nor', 'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very', 's', 't', 'can',
+    'will', 'just', 'don', "don't", 'should', "should've", 'now', 'd', 'll', 'm', 'o', 're',
+    've', 'y', 'ain', 'aren', "aren't", 'couldn', "couldn't", 'didn', "didn't", 'doesn',
+    "doesn't", 'hadn', "hadn't", 'hasn', "hasn't", 'haven', "haven't", 'isn', "isn't", 'ma',
+    'mightn', "mightn't", 'mustn', "mustn't", 'needn', "needn't", 'shan', "shan't",
+    'shouldn', "shouldn't", 'wasn', "wasn't", 'weren', "weren't", 'won', "won't", 'wouldn',
+    "wouldn't"
+])
+
+# Treebank contraction rules (MacIntyreContractions.CONTRACTIONS2) that still match
+# once apostrophes are stripped
+TREEBANK_SPLITS = {
+    'cannot': ('can', 'not'),
+    'gimme': ('gim', 'me'),
+    'gonna': ('gon', 'na'),
+    'gotta': ('got', 'ta'),
+    'lemme': ('lem', 'me'),
+    'wanna': ('wan', 'na'),
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """word_tokenize equivalent for text already reduced to letters and whitespace"""
+    tokens = []
+    for word in text.split():
+        parts = TREEBANK_SPLITS.get(word)
+        if parts is None:
+            tokens.append(word)
+        else:
+            tokens.extend(parts)
+    return tokens